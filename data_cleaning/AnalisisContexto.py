@@ -3,10 +3,14 @@ identificando y documentando caracteres no ASCII en los datos,
  lo que resulta esencial para posterior limpieza y normalización de datos"""
 
 import pandas as pd
+import numpy as np
 import re
+import json
 from io import StringIO
 from collections import defaultdict
 
+from Reparacion_bytes import decodificar
+
 # ---------- UTILIDADES ----------
 
 def leer_csv_con_reemplazo(path):
@@ -20,58 +24,141 @@ def leer_csv_con_reemplazo(path):
         pd.DataFrame: DataFrame con el contenido del CSV, o None si hay un error.
     """
     try:
-        with open(path, encoding='utf-8', errors='replace') as f:
-            contenido = f.read()  # Lee el contenido del archivo
+        with open(path, 'rb') as f:
+            # Bytes inválidos como latin1 (no U+FFFD): cada artefacto conserva su identidad
+            contenido = decodificar(f.read(), respaldo='latin1')
         return pd.read_csv(StringIO(contenido))  # Carga el contenido en un DataFrame
     except Exception as e:
         print(f"Error leyendo {path}: {e}")  # Manejo de errores
         return None
 
-def extraer_contexto(texto, char, ventana=10):
+def compilar_patron(caracteres):
+    """
+    Compila un único patrón que reconoce cualquiera de los caracteres sospechosos.
+
+    Args:
+        caracteres (iterable): Caracteres (o secuencias) a reconocer.
+
+    Returns:
+        re.Pattern: Clase de caracteres si todos tienen longitud 1; si no, una
+        alternancia con las secuencias más largas primero.
+    """
+    caracteres = sorted(set(caracteres), key=lambda c: (-len(c), c))
+    if all(len(c) == 1 for c in caracteres):
+        return re.compile('[' + ''.join(re.escape(c) for c in caracteres) + ']')
+    return re.compile('|'.join(re.escape(c) for c in caracteres))
+
+def extraer_contextos_combinados(texto, patron, ventana=10):
     """
-    Extrae contextos alrededor de un carácter específico en un texto.
+    Extrae, en una sola pasada, el contexto de cada aparición de cualquier carácter
+    del patrón.
 
     Args:
         texto (str): Texto del cual extraer contextos.
-        char (str): Carácter alrededor del cual se extraerá el contexto.
+        patron (re.Pattern): Patrón combinado (ver compilar_patron).
         ventana (int): Número de caracteres a incluir antes y después del carácter.
 
     Returns:
-        list: Lista de contextos extraídos.
+        list: Pares (carácter, contexto) en orden de aparición.
     """
-    posiciones = [m.start() for m in re.finditer(re.escape(char), texto)]  # Encuentra posiciones del carácter
     contextos = []
-    for pos in posiciones:
-        inicio = max(pos - ventana, 0)  # Calcula el inicio del contexto
-        fin = min(pos + ventana + 1, len(texto))  # Calcula el fin del contexto
+    for m in patron.finditer(texto):
+        inicio = max(m.start() - ventana, 0)  # Calcula el inicio del contexto
+        fin = min(m.end() + ventana, len(texto))  # Calcula el fin del contexto
         contexto = texto[inicio:fin].replace('\n', ' ').strip()  # Extrae y limpia el contexto
-        contextos.append(contexto)  # Agrega el contexto a la lista
+        contextos.append((m.group(), contexto))  # Envía el contexto al balde de su carácter
     return contextos
 
+# Valores distintos por bloque al contar apariciones (acota la memoria de los arreglos por carácter)
+VALORES_POR_BLOQUE = 200_000
+
+def contar_apariciones(valores, frecuencias, caracteres):
+    """
+    Cuenta las apariciones de cada carácter en una lista de valores, ponderadas por
+    la frecuencia de cada valor.
+
+    Los valores se pasan a un arreglo de puntos de código (UTF-32) y se cuentan con
+    numpy, sin recorrer los valores con expresiones regulares. Las secuencias de más
+    de un carácter se cuentan con el patrón combinado.
+
+    Args:
+        valores (list): Cadenas distintas.
+        frecuencias (np.ndarray): Cantidad de filas de cada valor.
+        caracteres (iterable): Caracteres (o secuencias) a contar.
+
+    Returns:
+        dict: {carácter: apariciones} con los que aparecen al menos una vez.
+    """
+    caracteres = sorted(set(caracteres))
+    if not caracteres:
+        return {}
+    if any(len(c) != 1 for c in caracteres):
+        apariciones = pd.Series(pd.Index(valores, dtype=object).str.findall(compilar_patron(caracteres)),
+                                index=frecuencias).explode().dropna()
+        conteo = pd.Series(apariciones.index, index=apariciones.to_numpy()).groupby(level=0).sum()
+        return {char: int(conteo[char]) for char in conteo.index}
+    buscados = np.array([ord(c) for c in caracteres], dtype=np.uint32)
+    totales = np.zeros(len(buscados), dtype=np.int64)
+    for desde in range(0, len(valores), VALORES_POR_BLOQUE):
+        bloque = valores[desde:desde + VALORES_POR_BLOQUE]
+        puntos = np.frombuffer(''.join(bloque).encode('utf-32-le', 'surrogatepass'), dtype=np.uint32)
+        largos = np.fromiter(map(len, bloque), dtype=np.int64, count=len(bloque))
+        duenos = np.repeat(np.arange(len(bloque)), largos)  # Valor al que pertenece cada carácter
+        posicion = np.minimum(np.searchsorted(buscados, puntos), len(buscados) - 1)
+        coincide = buscados[posicion] == puntos
+        totales += np.bincount(posicion[coincide], weights=frecuencias[desde:desde + len(bloque)][duenos[coincide]],
+                               minlength=len(buscados)).astype(np.int64)
+    return {char: int(total) for char, total in zip(caracteres, totales) if total > 0}
+
 def recolectar_contextos(df, caracteres_sospechosos, max_ejemplos=3):
     """
     Recolecta contextos de un DataFrame para caracteres sospechosos.
 
+    Los valores distintos de cada columna se recorren en orden de primera aparición
+    y se conservan los primeros ejemplos de cada carácter, por lo que el reporte es
+    el mismo en cada ejecución. Cada valor se recorre una sola vez con un patrón
+    combinado, sin importar cuántos caracteres sospechosos haya. Cuando todos los
+    caracteres de una columna tienen sus max_ejemplos, se deja de recorrer esa columna.
+
     Args:
         df (pd.DataFrame): DataFrame del cual recolectar contextos.
         caracteres_sospechosos (set): Conjunto de caracteres a buscar en el DataFrame.
         max_ejemplos (int): Número máximo de ejemplos a recolectar por carácter.
 
     Returns:
-        dict: Diccionario con contextos recolectados.
-    """
-    contextos = defaultdict(lambda: defaultdict(set))  # Estructura para almacenar contextos
-    for col in df.select_dtypes(include='object').columns:  # Itera sobre columnas de tipo objeto
-        for valor in df[col].dropna():  # Itera sobre valores no nulos
-            if not isinstance(valor, str):
-                continue  # Solo procesa cadenas
-            for char in caracteres_sospechosos:
-                if char in valor and len(contextos[col][char]) < max_ejemplos:
-                    ejemplos = extraer_contexto(valor, char)  # Extrae contextos
-                    for ej in ejemplos:
-                        if len(contextos[col][char]) < max_ejemplos:
-                            contextos[col][char].add(ej)  # Agrega el contexto al diccionario
-    return contextos
+        tuple: (contextos, totales). contextos es {columna: {carácter: [ejemplos]}} y
+        totales es {columna: {carácter: cantidad de apariciones en la columna}}.
+    """
+    contextos = defaultdict(dict)  # Estructura para almacenar contextos
+    totales = defaultdict(dict)  # Apariciones totales de cada carácter por columna
+    if not caracteres_sospechosos:
+        return contextos, totales
+    patron = compilar_patron(caracteres_sospechosos)  # Un solo patrón para todos los caracteres
+    for col in df.select_dtypes(include=['object', 'string']).columns:  # Itera sobre columnas de texto
+        # Valores distintos (sin nulos) en orden de primera aparición y su frecuencia
+        codigos, unicos = pd.factorize(df[col])
+        frecuencias = np.bincount(codigos[codigos >= 0], minlength=len(unicos))
+        es_texto = np.array([isinstance(v, str) for v in unicos], dtype=bool)  # Solo procesa cadenas
+        unicos = pd.Index(np.asarray(unicos, dtype=object)[es_texto], dtype=object)
+        frecuencias = frecuencias[es_texto]
+
+        # Totales: conteo vectorizado por valor distinto, ponderado por su frecuencia
+        conteo = contar_apariciones(list(unicos), frecuencias, caracteres_sospechosos)
+        for char in sorted(conteo):  # Orden fijo (un set cambia entre ejecuciones)
+            totales[col][char] = conteo[char]
+            contextos[col][char] = []
+
+        saturados = 0  # Cantidad de caracteres de la columna que ya tienen todos sus ejemplos
+        for valor in unicos:
+            if saturados == len(totales[col]):
+                break  # Todos los caracteres de la columna están completos
+            for char, ej in extraer_contextos_combinados(valor, patron):
+                ejemplos = contextos[col][char]
+                if len(ejemplos) < max_ejemplos and ej not in ejemplos:
+                    ejemplos.append(ej)  # Agrega el contexto (sin repetir)
+                    if len(ejemplos) == max_ejemplos:
+                        saturados += 1
+    return contextos, totales
 
 # ---------- ARCHIVOS A ANALIZAR ----------
 
@@ -83,35 +170,83 @@ archivos = {
     "historico-nombres": "docs/historico-nombres.csv"
 }
 
+# ---------- ESCRITURA INCREMENTAL DEL REPORTE ----------
+
+def escribir_seccion(f_txt, f_jsonl, nombre_logico, contextos, totales):
+    """
+    Escribe la sección de un archivo en el reporte de texto y en el JSON lines.
+
+    Args:
+        f_txt (file): Archivo de texto del reporte, abierto para escritura.
+        f_jsonl (file): Archivo JSON lines, abierto para escritura.
+        nombre_logico (str): Nombre lógico del archivo analizado.
+        contextos (dict): Contextos por columna y carácter.
+        totales (dict): Apariciones totales por columna y carácter.
+    """
+    f_txt.write(f"\n=== Archivo: {nombre_logico} ===\n")  # Escribe el nombre del archivo
+    for columna, chars in contextos.items():
+        f_txt.write(f"\nColumna: {columna}\n")  # Escribe el nombre de la columna
+        for char, ejemplos in chars.items():
+            total = totales[columna][char]
+            f_txt.write(f"\n  Carácter: {repr(char)} ({total} apariciones)\n")  # Escribe el carácter sospechoso
+            for ej in ejemplos:
+                f_txt.write(f"    -> {ej}\n")  # Escribe los ejemplos de contexto
+            # Un registro por (archivo, columna, carácter) para etapas posteriores
+            registro = {"archivo": nombre_logico, "columna": columna,
+                        "caracter": char, "total": total, "ejemplos": list(ejemplos)}
+            f_jsonl.write(json.dumps(registro, ensure_ascii=False) + "\n")
+    # Volcar a disco: si un archivo posterior falla, esta sección ya quedó guardada
+    f_txt.flush()
+    f_jsonl.flush()
+
 # ---------- PROCESAMIENTO CON CONTEXTO ----------
 
-reporte_completo = {}  # Diccionario para almacenar el reporte final
-
-for nombre_logico, ruta in archivos.items():
-    print(f"\n📄 Procesando {ruta}...")  
-    df = leer_csv_con_reemplazo(ruta) 
-    if df is not None:
-        caracteres = set()  # Conjunto para almacenar caracteres sospechosos
-        for col in df.select_dtypes(include='object').columns:  # Itera sobre columnas de tipo objeto
-            for val in df[col].dropna():  # Itera sobre valores no nulos
-                if isinstance(val, str):
-                    encontrados = re.findall(r'[^\x00-\x7F]', val)  # Busca caracteres no ASCII
-                    caracteres.update(encontrados)  # Agrega caracteres encontrados al conjunto
-        contextos = recolectar_contextos(df, caracteres)  # Recolecta contextos
-        reporte_completo[nombre_logico] = contextos  # Almacena contextos en el reporte
-    else:
-        print(f"⚠️ No se pudo procesar {ruta}.")  # Mensaje de error si no se pudo leer el archivo
-
-# ---------- GUARDAR REPORTE DE CONTEXTOS ----------
-
-with open("docs/reporte_contextos.txt", "w", encoding="utf-8") as f:
-    for archivo, columnas in reporte_completo.items():
-        f.write(f"\n=== Archivo: {archivo} ===\n")  # Escribe el nombre del archivo
-        for columna, chars in columnas.items():
-            f.write(f"\nColumna: {columna}\n")  # Escribe el nombre de la columna
-            for char, ejemplos in chars.items():
-                f.write(f"\n  Carácter: {repr(char)}\n")  # Escribe el carácter sospechoso
-                for ej in ejemplos:
-                    f.write(f"    -> {ej}\n")  # Escribe los ejemplos de contexto
-
-print("\n✅ Contextos guardados en 'reporte_contextos.txt'. Revisá los ejemplos para decidir qué reemplazar.")
+def caracteres_no_ascii(df):
+    """
+    Reúne los caracteres no ASCII que aparecen en las columnas de texto.
+
+    Args:
+        df (pd.DataFrame): DataFrame a revisar.
+
+    Returns:
+        set: Caracteres no ASCII encontrados.
+    """
+    caracteres = set()  # Conjunto para almacenar caracteres sospechosos
+    for col in df.select_dtypes(include=['object', 'string']).columns:  # Itera sobre columnas de texto
+        for val in df[col].dropna():  # Itera sobre valores no nulos
+            if isinstance(val, str):
+                encontrados = re.findall(r'[^\x00-\x7F]', val)  # Busca caracteres no ASCII
+                caracteres.update(encontrados)  # Agrega caracteres encontrados al conjunto
+    return caracteres
+
+def generar_reporte(archivos, ruta_txt="docs/reporte_contextos.txt", ruta_jsonl="docs/reporte_contextos.jsonl"):
+    """
+    Analiza cada archivo y escribe su sección del reporte apenas termina.
+
+    En memoria solo queda el estado del archivo en curso; si un archivo falla, se
+    informa y las secciones ya escritas se conservan.
+
+    Args:
+        archivos (dict): {nombre_logico: ruta del CSV original}.
+        ruta_txt (str): Reporte de texto.
+        ruta_jsonl (str): Reporte JSON lines (un registro por archivo, columna y carácter).
+    """
+    with open(ruta_txt, "w", encoding="utf-8") as f_txt, open(ruta_jsonl, "w", encoding="utf-8") as f_jsonl:
+        for nombre_logico, ruta in archivos.items():
+            print(f"\n📄 Procesando {ruta}...")
+            try:
+                df = leer_csv_con_reemplazo(ruta)
+                if df is None:
+                    print(f"⚠️ No se pudo procesar {ruta}.")  # Mensaje de error si no se pudo leer el archivo
+                    continue
+                contextos, totales = recolectar_contextos(df, caracteres_no_ascii(df))  # Recolecta contextos
+                escribir_seccion(f_txt, f_jsonl, nombre_logico, contextos, totales)  # Guarda la sección del archivo
+            except Exception as e:
+                print(f"⚠️ Error procesando {ruta}: {e}")  # Las secciones ya escritas se conservan
+            finally:
+                df = contextos = totales = None  # Liberar el estado del archivo antes de pasar al siguiente
+
+
+if __name__ == "__main__":
+    generar_reporte(archivos)
+    print("\n✅ Contextos guardados en 'reporte_contextos.txt' y 'reporte_contextos.jsonl'. Revisá los ejemplos para decidir qué reemplazar.")
@@ -2,6 +2,8 @@ import pandas as pd
 import re
 from io import StringIO
 
+from Reparacion_bytes import decodificar
+
 # ---------- FUNCIONES BASE ----------
 
 def leer_csv_con_reemplazo(path: str) -> pd.DataFrame:
@@ -15,9 +17,10 @@ def leer_csv_con_reemplazo(path: str) -> pd.DataFrame:
         pd.DataFrame: DataFrame con el contenido del CSV, o None si hay un error.
     """
     try:
-        # Abre el archivo CSV con codificación UTF-8 y reemplaza errores de codificación.
-        with open(path, encoding='utf-8', errors='replace') as f:
-            contenido = f.read()
+        # Lee los bytes crudos: los bytes inválidos se interpretan como latin1 en lugar
+        # de convertirse en U+FFFD, así cada uno sigue siendo distinguible en el reporte.
+        with open(path, 'rb') as f:
+            contenido = decodificar(f.read(), respaldo='latin1')
         # Lee el contenido del archivo CSV en un DataFrame de pandas.
         return pd.read_csv(StringIO(contenido))
     except Exception as e:
@@ -53,7 +56,7 @@ def analizar_caracteres_invalidos(df: pd.DataFrame) -> set:
     """
     caracteres_sospechosos = set()
     # Itera sobre las columnas de tipo objeto en el DataFrame.
-    for columna in df.select_dtypes(include='object').columns:
+    for columna in df.select_dtypes(include=['object', 'string']).columns:
         # Itera sobre los valores de la columna, ignorando los valores nulos.
         for valor in df[columna].dropna():
             # Actualiza el conjunto de caracteres sospechosos con los encontrados en el valor.
@@ -1,23 +1,27 @@
+import numpy as np
 import pandas as pd
 import os
 import re
+import sys
+import json
+import argparse
+import shutil
+import tempfile
+from io import StringIO
 
-# Diccionarios de reemplazo por archivo
-REEMPLAZOS = {
-    'apellidos_provincia': {
-        'ò': 'ó', 'û': 'ü', 'ù': 'ú', 'è': 'é', 'ì': 'í'
-    },
-    'historico_nombres': {
-        'è': 'é', 'Ú': 'ú', 'É': 'é', 'à': 'á', 'ù': 'ú', 'ò': 'ó',
-        'ì': 'í', 'Ñ': 'ñ', 'Í': 'í', 'ô': 'ó', '¤': 'ñ', 'Ó': 'ó',
-        'È': 'é', 'Ü': 'ü', 'Ì': 'í', 'Ù': 'ú', 'Ò': 'ó', 'î': 'í',
-        'ê': 'é', 'û': 'ú', 'Ç': 'ç', 'ý': 'í', 'À': 'á', 'µ': 'a',
-        'Ô': 'ó', '¡': 'i', 'Î': 'í', '£´': 'ú', 'Ä': 'á', '¢': 'ó',
-        '\xa0': 'á', '\x93': 'í', 'Ê': 'e', '¨': ' ', '\x90': 'é',
-        'ÿ': 'i', 'ć': 'ó', 'ẽ': 'é', '¿': '', 'Û': 'ü', 'Ŷ': 'i',
-        'Å': 'á', '\x82': ''
-    }
-}
+from Reparacion_bytes import decodificar, reparar_archivo, tabla_desde_reglas
+
+# Módulos compartidos con los análisis (almacén binario, presupuesto de memoria).
+# Se importan desde modules/, que debe estar en la ruta de importación:
+#   PYTHONPATH=modules python data_cleaning/Reemplazo_caracteres.py
+from almacen_binario import abrir_almacen, ampliar_almacen
+# Presupuesto de memoria (variable PRESUPUESTO_MEMORIA_MB). Sin valor, cada archivo
+# se procesa completo en memoria; con valor, los que no entran se procesan por
+# bloques con el mismo resultado.
+from memoria import filas_si_no_entra, presupuesto_memoria
+
+# Reglas de reemplazo por archivo y por columna (configuración externa)
+RUTA_REGLAS = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'reglas_reemplazo.json')
 
 # Mapear nombres reales a nombres lógicos
 ARCHIVOS = {
@@ -27,40 +31,745 @@ ARCHIVOS = {
     "historico-nombres": "docs/historico-nombres.csv"
 }
 
-# Función de corrección según archivo
-def corregir_texto(texto, reemplazos):
-    if not isinstance(texto, str):
-        return texto
-    for mal, bien in reemplazos.items():
-        texto = texto.replace(mal, bien)
-    return texto
+# Columna por la que se particiona cada archivo en el modo --particionado
+PARTICIONES = {
+    "historico-nombres": "anio",
+    "apellidos_provincia": "provincia_id",
+    "apellidos_provincia_ranking": "provincia_id"
+}
 
-# Cargar, limpiar y guardar dataset
-def limpiar_archivo(nombre_logico, ruta_archivo, encoding='utf-8'):
-    print(f"Procesando: {ruta_archivo}")
+# Años por partición del histórico
+ANCHO_PARTICION_ANIOS = 10
+
+DIRECTORIO_PARTICIONES = "docs/particiones"
+
+# Agregados del histórico (por año y por nombre) que se actualizan de forma incremental
+DIRECTORIO_AGREGADOS = "docs/agregados"
+
+# Sufijo de los archivos que agregar_anios escribe antes de reemplazar a los definitivos
+SUFIJO_TEMPORAL = '.nuevo'
+
+# Columna comodín: la regla se aplica a todas las columnas de texto del archivo
+TODAS_LAS_COLUMNAS = '*'
+
+# Correctores compilados por conjunto de reglas: id(reglas) -> (reglas, corrector).
+# Se guarda también el diccionario para que su id no se reutilice mientras siga en caché.
+_COMPILADOS = {}
+
+
+def cargar_reglas(ruta=RUTA_REGLAS):
+    """
+    Carga las reglas de reemplazo y valida que los archivos existan en ARCHIVOS.
+
+    Args:
+        ruta (str): Ruta del JSON {archivo: {columna: {mal: bien}}}.
+
+    Returns:
+        dict: Reglas por nombre lógico de archivo y columna.
+    """
+    with open(ruta, encoding='utf-8') as f:
+        reglas = json.load(f)
+    desconocidos = sorted(set(reglas) - set(ARCHIVOS))
+    if desconocidos:
+        raise ValueError(f"Reglas para archivos inexistentes en ARCHIVOS: {desconocidos}")
+    return reglas
+
+
+def compilar_reglas(reemplazos):
+    """
+    Compila un conjunto de reglas en un corrector de una sola pasada.
+
+    Si todas las claves son de un carácter se usa str.translate; si hay secuencias
+    más largas, una única expresión regular con las secuencias más largas primero.
+    El resultado se guarda en caché por identidad del diccionario: las reglas
+    se cargan una vez y no se modifican, así que cada archivo y columna se
+    compila una sola vez sin recorrer las reglas en cada llamada.
+
+    Args:
+        reemplazos (dict): Reglas {mal: bien}.
+
+    Returns:
+        callable: Función texto -> texto corregido.
+    """
+    compilado = _COMPILADOS.get(id(reemplazos))
+    if compilado is not None and compilado[0] is reemplazos:
+        return compilado[1]
+    if all(len(mal) == 1 for mal in reemplazos):
+        tabla = str.maketrans(reemplazos)
+        corregir = lambda texto: texto.translate(tabla)
+    else:
+        patron = re.compile('|'.join(re.escape(mal) for mal in sorted(reemplazos, key=len, reverse=True)))
+        corregir = lambda texto: patron.sub(lambda m: reemplazos[m.group()], texto)
+    _COMPILADOS[id(reemplazos)] = (reemplazos, corregir)
+    return corregir
+
+
+REEMPLAZOS = cargar_reglas()
+
+
+def corregir_columna(serie, reemplazos):
+    """Aplica las reglas una sola vez por valor distinto de la columna."""
+    corregir = compilar_reglas(reemplazos)
+    distintos = serie.dropna().unique()
+    mapeo = {valor: corregir(valor) if isinstance(valor, str) else valor for valor in distintos}
+    return serie.map(mapeo)
+
+
+def aplicar_reglas(df, nombre_logico, reglas=None):
+    """
+    Aplica a cada columna las reglas de su archivo.
+
+    Args:
+        df (pd.DataFrame): Datos con los nombres de columna ya normalizados.
+        nombre_logico (str): Clave del archivo en ARCHIVOS.
+        reglas (dict): Reglas por archivo y columna; por defecto REEMPLAZOS.
+
+    Returns:
+        pd.DataFrame: El mismo DataFrame con las columnas corregidas.
+    """
+    reglas = REEMPLAZOS if reglas is None else reglas
+    texto = list(df.select_dtypes(include=['object', 'string']).columns)
+    for columna, reemplazos in reglas.get(nombre_logico, {}).items():
+        if not reemplazos:
+            continue
+        if columna == TODAS_LAS_COLUMNAS:
+            columnas = texto
+        elif columna in df.columns:
+            columnas = [columna]
+        else:
+            print(f"Advertencia: la columna '{columna}' de las reglas no existe en {nombre_logico}")
+            continue
+        for col in columnas:
+            df[col] = corregir_columna(df[col], reemplazos)
+    return df
+
+
+def tabla_bytes(nombre_logico, reglas=None):
+    """
+    Reglas de reparación de bytes inválidos de un archivo (todas sus columnas).
+
+    Returns:
+        dict: {bytes_invalidos: utf8_correcto}, ver Reparacion_bytes.tabla_desde_reglas.
+    """
+    reglas = REEMPLAZOS if reglas is None else reglas
+    tabla = {}
+    for reemplazos in reglas.get(nombre_logico, {}).values():
+        tabla.update(tabla_desde_reglas(reemplazos))
+    return tabla
+
+
+def leer_archivo(ruta_archivo, encoding='utf-8', columnas=None, nombre_logico=None):
+    """
+    Lee un CSV original y normaliza los nombres de columnas.
+
+    Si el archivo tiene UTF-8 inválido, se repara a nivel de bytes antes de
+    decodificar: las secuencias válidas se conservan, los bytes con regla conocida
+    se corrigen y el resto se interpreta como latin1 (como el respaldo anterior).
+    """
     try:
-        df = pd.read_csv(ruta_archivo, encoding=encoding)
+        df = pd.read_csv(ruta_archivo, encoding=encoding, usecols=columnas)
     except UnicodeDecodeError:
-        df = pd.read_csv(ruta_archivo, encoding='latin1')
-    
-    reemplazos = REEMPLAZOS.get(nombre_logico, {})
+        with open(ruta_archivo, 'rb') as f:
+            texto = decodificar(f.read(), tabla_bytes(nombre_logico), respaldo='latin1')
+        df = pd.read_csv(StringIO(texto), usecols=columnas)
 
-    if reemplazos:
-        for columna in df.select_dtypes(include=['object']).columns:
-            df[columna] = df[columna].apply(lambda x: corregir_texto(x, reemplazos))
-
-    # Normalizar nombres de columnas
+    # Normalizar nombres de columnas (antes de aplicar reglas por columna)
     df.columns = [col.replace('"', '') for col in df.columns]
+    return df
+
+
+# ---------- PROCESAMIENTO POR BLOQUES ----------
+
+def _combinar_tipos(a, b):
+    if a == b:
+        return a
+    numericos = all(pd.api.types.is_numeric_dtype(t) and not pd.api.types.is_bool_dtype(t) for t in (a, b))
+    return np.result_type(a, b) if numericos else str
+
+
+def tipos_por_bloques(ruta_archivo, filas, encoding='utf-8'):
+    """
+    Recorre el archivo una vez para obtener los tipos que pandas le daría leído completo.
+
+    Cada bloque se infiere por separado (un bloque sin nulos da int64 y otro con
+    nulos float64); los tipos se combinan como lo haría la lectura completa.
+
+    Returns:
+        dict: Tipos por columna original.
+    """
+    tipos = {}
+    for bloque in pd.read_csv(ruta_archivo, encoding=encoding, chunksize=filas):
+        for columna, tipo in bloque.dtypes.items():
+            tipos[columna] = _combinar_tipos(tipos[columna], tipo) if columna in tipos else tipo
+    return tipos
+
+
+def leer_por_bloques(ruta_archivo, filas, encoding='utf-8', nombre_logico=None):
+    """
+    Lee un CSV original por bloques con tipos consistentes y columnas normalizadas.
+
+    Con UTF-8 inválido, el archivo se repara antes a un temporal (igual que leer_archivo).
+    """
+    origen, temporal = ruta_archivo, None
+    try:
+        try:
+            tipos = tipos_por_bloques(origen, filas, encoding)
+        except UnicodeDecodeError:
+            with tempfile.NamedTemporaryFile(suffix='.csv', delete=False) as f:
+                temporal = f.name
+            reparar_archivo(ruta_archivo, temporal, tabla_bytes(nombre_logico), respaldo='latin1')
+            origen, encoding = temporal, 'utf-8'
+            tipos = tipos_por_bloques(origen, filas, encoding)
+        for bloque in pd.read_csv(origen, encoding=encoding, chunksize=filas, dtype=tipos):
+            bloque.columns = [col.replace('"', '') for col in bloque.columns]
+            yield bloque
+    finally:
+        if temporal is not None:
+            os.remove(temporal)
+
+
+def limpiar_por_bloques(nombre_logico, ruta_archivo, filas, encoding='utf-8', particionado=False):
+    """
+    Igual que limpiar_archivo, pero sin cargar el archivo completo en memoria.
+
+    Cada bloque se limpia con las mismas reglas y se agrega al CSV limpio (o a sus
+    particiones). El resultado es idéntico al de procesar el archivo completo.
+
+    Args:
+        nombre_logico (str): Clave del archivo en ARCHIVOS.
+        ruta_archivo (str): CSV original.
+        filas (int): Filas por bloque.
+        encoding (str): Codificación del archivo (con respaldo latin1).
+        particionado (bool): Escribe particiones en lugar de un único _clean.csv.
+
+    Returns:
+        str: Lo mismo que limpiar_archivo.
+    """
+    print(f"Procesando por bloques de {filas} filas: {ruta_archivo}")
+    bloques = (aplicar_reglas(bloque, nombre_logico)
+               for bloque in leer_por_bloques(ruta_archivo, filas, encoding, nombre_logico))
+    if particionado:
+        escribir_particiones_por_bloques(bloques, nombre_logico)
+        return os.path.join(DIRECTORIO_PARTICIONES, nombre_logico)
+
+    output_name = ruta_archivo.replace('.csv', '_clean.csv')
+    for i, bloque in enumerate(bloques):
+        bloque.to_csv(output_name, index=False, mode='w' if i == 0 else 'a', header=(i == 0))
+    print(f"Guardado: {output_name}\n")
+    return output_name
+
+
+# Cargar, limpiar y guardar dataset
+def limpiar_archivo(nombre_logico, ruta_archivo, encoding='utf-8', particionado=False):
+    """
+    Limpia un archivo con sus reglas y guarda el resultado.
+
+    Args:
+        nombre_logico (str): Clave del archivo en ARCHIVOS.
+        ruta_archivo (str): CSV original.
+        encoding (str): Codificación del archivo (con respaldo latin1).
+        particionado (bool): Escribe particiones en lugar de un único _clean.csv.
+
+    Returns:
+        str: Ruta del _clean.csv o, con particionado, directorio de las particiones.
+        No se devuelve el DataFrame porque, por encima del presupuesto de memoria,
+        el archivo nunca está completo en memoria (ver limpiar_por_bloques).
+    """
+    filas = filas_si_no_entra(ruta_archivo, presupuesto_memoria())
+    if filas is not None:
+        # Supera el presupuesto de memoria: mismo resultado, procesado por bloques
+        return limpiar_por_bloques(nombre_logico, ruta_archivo, filas, encoding, particionado)
+
+    print(f"Procesando: {ruta_archivo}")
+    df = leer_archivo(ruta_archivo, encoding, nombre_logico=nombre_logico)
+
+    df = aplicar_reglas(df, nombre_logico)
+
+    if particionado:
+        # Particiones comprimidas + índice en lugar de un único _clean.csv
+        escribir_particiones(df, nombre_logico)
+        return os.path.join(DIRECTORIO_PARTICIONES, nombre_logico)
 
     # Guardar CSV limpio
     output_name = ruta_archivo.replace('.csv', '_clean.csv')
     df.to_csv(output_name, index=False)
     print(f"Guardado: {output_name}\n")
 
-    return df
+    return output_name
+
+
+# ---------- SALIDA PARTICIONADA ----------
+
+def nombre_particion(columna, clave):
+    """Nombre del archivo de la partición con valor de clave `clave`."""
+    if columna == 'anio':
+        return f"anio_{clave}-{clave + ANCHO_PARTICION_ANIOS - 1}.csv.gz"
+    if columna is not None:
+        return f"{columna}_{int(clave):02d}.csv.gz"
+    return "completo.csv.gz"
+
+
+def escribir_particiones(df, nombre_logico, directorio=DIRECTORIO_PARTICIONES):
+    """
+    Guarda un dataset limpio en particiones CSV comprimidas con gzip y un índice.
+
+    El histórico se parte por rangos de ANCHO_PARTICION_ANIOS años y los datos
+    provinciales por 'provincia_id'. El índice (indice.json) registra, para cada
+    partición, su archivo, su cantidad de filas y el rango de valores que cubre,
+    para que los lectores abran solo las particiones que su consulta necesita.
+
+    Args:
+        df (pd.DataFrame): Dataset limpio.
+        nombre_logico (str): Clave del archivo en ARCHIVOS.
+        directorio (str): Directorio base de las particiones.
+
+    Returns:
+        dict: Índice escrito.
+    """
+    destino = os.path.join(directorio, nombre_logico)
+    os.makedirs(destino, exist_ok=True)
+    columna = PARTICIONES.get(nombre_logico)
+
+    particiones = [_escribir_particion(grupo, destino, columna, clave)
+                   for clave, grupo in _grupos_particion(df, columna)]
+
+    indice = {'nombre_logico': nombre_logico, 'columna': columna,
+              'columnas': list(df.columns), 'particiones': particiones}
+    _guardar_indice(indice, destino)
+    print(f"Guardado: {len(particiones)} particiones en {destino}\n")
+    return indice
+
+
+def _grupos_particion(df, columna):
+    if columna == 'anio':
+        return df.groupby((df['anio'] // ANCHO_PARTICION_ANIOS) * ANCHO_PARTICION_ANIOS, sort=True)
+    if columna is not None:
+        return df.groupby(columna, sort=True)
+    return [(None, df)]
+
+
+def _escribir_particion(grupo, destino, columna, clave, pendientes=None):
+    """Escribe una partición (ver _temporal) y devuelve su entrada del índice."""
+    archivo = nombre_particion(columna, clave)
+    grupo.to_csv(_temporal(os.path.join(destino, archivo), pendientes), index=False, compression='gzip')
+    entrada = {'archivo': archivo, 'filas': int(len(grupo))}
+    if columna is not None:
+        entrada['min'] = int(grupo[columna].min())
+        entrada['max'] = int(grupo[columna].max())
+    return entrada
+
+
+def _guardar_indice(indice, destino, pendientes=None):
+    with open(_temporal(os.path.join(destino, 'indice.json'), pendientes), 'w', encoding='utf-8') as f:
+        json.dump(indice, f, ensure_ascii=False, indent=2)
+
+
+def escribir_particiones_por_bloques(bloques, nombre_logico, directorio=DIRECTORIO_PARTICIONES):
+    """
+    Igual que escribir_particiones, pero a partir de bloques consecutivos del dataset.
+
+    Cada grupo de un bloque se agrega al final de su partición (gzip admite
+    varios miembros concatenados), así que el contenido de cada partición es el
+    mismo que con el dataset completo.
+
+    Returns:
+        dict: Índice escrito.
+    """
+    destino = os.path.join(directorio, nombre_logico)
+    os.makedirs(destino, exist_ok=True)
+    columna = PARTICIONES.get(nombre_logico)
+
+    entradas = {}
+    columnas = None
+    for bloque in bloques:
+        columnas = columnas or list(bloque.columns)
+        for clave, grupo in _grupos_particion(bloque, columna):
+            archivo = nombre_particion(columna, clave)
+            nueva = clave not in entradas
+            grupo.to_csv(os.path.join(destino, archivo), index=False, compression='gzip',
+                         mode='w' if nueva else 'a', header=nueva)
+            entrada = entradas.setdefault(clave, {'archivo': archivo, 'filas': 0})
+            entrada['filas'] += int(len(grupo))
+            if columna is not None:
+                entrada['min'] = min(entrada.get('min', int(grupo[columna].min())), int(grupo[columna].min()))
+                entrada['max'] = max(entrada.get('max', int(grupo[columna].max())), int(grupo[columna].max()))
+
+    indice = {'nombre_logico': nombre_logico, 'columna': columna, 'columnas': columnas,
+              'particiones': [entradas[clave] for clave in sorted(entradas)]}
+    _guardar_indice(indice, destino)
+    print(f"Guardado: {len(entradas)} particiones en {destino}\n")
+    return indice
+
+
+def actualizar_particiones(df_nuevo, nombre_logico, directorio=DIRECTORIO_PARTICIONES, pendientes=None):
+    """
+    Agrega filas nuevas reescribiendo solo las particiones que las reciben.
+
+    Args:
+        df_nuevo (pd.DataFrame): Filas limpias a agregar.
+        nombre_logico (str): Clave del archivo en ARCHIVOS.
+        directorio (str): Directorio base de las particiones.
+        pendientes (list): Si se indica, las particiones y el índice se escriben en
+            temporales que se confirman después (ver _temporal y _confirmar).
+
+    Returns:
+        dict: Índice actualizado, o None si el dataset no está particionado.
+    """
+    destino = os.path.join(directorio, nombre_logico)
+    ruta_indice = os.path.join(destino, 'indice.json')
+    if not os.path.exists(ruta_indice):
+        return None
+    with open(ruta_indice, encoding='utf-8') as f:
+        indice = json.load(f)
+    columna = indice['columna']
+    entradas = {entrada['archivo']: entrada for entrada in indice['particiones']}
+
+    for clave, grupo in _grupos_particion(df_nuevo[indice['columnas']], columna):
+        archivo = nombre_particion(columna, clave)
+        if archivo in entradas:
+            existente = pd.read_csv(os.path.join(destino, archivo), compression='gzip')
+            grupo = pd.concat([existente, grupo], ignore_index=True)
+        entradas[archivo] = _escribir_particion(grupo, destino, columna, clave, pendientes)
+        print(f"Partición actualizada: {archivo}")
+
+    indice['particiones'] = sorted(entradas.values(), key=lambda entrada: (entrada.get('min', 0), entrada['archivo']))
+    _guardar_indice(indice, destino, pendientes)
+    return indice
+
+
+# ---------- ACTUALIZACIÓN INCREMENTAL DEL HISTÓRICO ----------
+
+def _temporal(ruta, pendientes):
+    """
+    Ruta en la que escribir `ruta`.
+
+    Sin `pendientes` es la propia ruta. Con `pendientes` es un temporal al lado del
+    destino (mismo sistema de archivos, así que reemplazarlo es un rename atómico)
+    y el par (temporal, destino) se agrega a la lista para _confirmar o _descartar.
+    """
+    if pendientes is None:
+        return ruta
+    temporal = ruta + SUFIJO_TEMPORAL
+    pendientes.append((temporal, ruta))
+    return temporal
+
+
+def _confirmar(pendientes):
+    """Reemplaza cada destino por su temporal, en el orden en que se registraron."""
+    for temporal, ruta in pendientes:
+        if os.path.isdir(temporal):
+            # Un directorio no se puede reemplazar con os.replace si el destino existe
+            anterior = ruta + ".anterior"
+            shutil.rmtree(anterior, ignore_errors=True)
+            if os.path.exists(ruta):
+                os.replace(ruta, anterior)
+            os.replace(temporal, ruta)
+            shutil.rmtree(anterior, ignore_errors=True)
+        else:
+            os.replace(temporal, ruta)
+
+
+def _descartar(pendientes):
+    """Borra los temporales sin tocar los destinos."""
+    for temporal, _ in pendientes:
+        if os.path.isdir(temporal):
+            shutil.rmtree(temporal, ignore_errors=True)
+        elif os.path.exists(temporal):
+            os.remove(temporal)
+
+def rutas_agregados(nombre_logico="historico-nombres", directorio=DIRECTORIO_AGREGADOS):
+    """Rutas de los agregados por año y por nombre de un dataset."""
+    return (os.path.join(directorio, f"{nombre_logico}_por_anio.csv"),
+            os.path.join(directorio, f"{nombre_logico}_por_nombre.csv"))
+
+
+def calcular_agregados(df):
+    """
+    Calcula los agregados del histórico.
+
+    Args:
+        df (pd.DataFrame): Filas limpias con 'nombre', 'cantidad' y 'anio'.
+
+    Returns:
+        tuple: (por_anio, por_nombre). por_anio tiene 'anio', 'cantidad' y 'nombres';
+        por_nombre tiene 'nombre', 'cantidad', 'primer_anio' y 'ultimo_anio'.
+    """
+    por_anio = (df.groupby('anio')
+                .agg(cantidad=('cantidad', 'sum'), nombres=('nombre', 'size'))
+                .reset_index())
+    por_nombre = (df.groupby('nombre')
+                  .agg(cantidad=('cantidad', 'sum'), primer_anio=('anio', 'min'), ultimo_anio=('anio', 'max'))
+                  .reset_index())
+    return por_anio, por_nombre
+
+
+def combinar_agregados(actuales, nuevos):
+    """
+    Combina agregados existentes con los de filas nuevas sin volver a leer el histórico.
+
+    Args:
+        actuales (tuple): (por_anio, por_nombre) guardados.
+        nuevos (tuple): (por_anio, por_nombre) de las filas nuevas.
+
+    Returns:
+        tuple: (por_anio, por_nombre) actualizados.
+    """
+    por_anio = (pd.concat([actuales[0], nuevos[0]], ignore_index=True)
+                .groupby('anio', as_index=False)[['cantidad', 'nombres']].sum())
+    por_nombre = (pd.concat([actuales[1], nuevos[1]], ignore_index=True)
+                  .groupby('nombre', as_index=False)
+                  .agg(cantidad=('cantidad', 'sum'), primer_anio=('primer_anio', 'min'),
+                       ultimo_anio=('ultimo_anio', 'max')))
+    return por_anio, por_nombre
+
+
+def _agregados_iniciales(nombre_logico, ruta_limpia):
+    """
+    Calcula una vez los agregados del histórico limpio existente, bloque a bloque.
+
+    Se leen del CSV limpio si existe y, si no, de sus particiones (modo --particionado).
+
+    Returns:
+        tuple: (por_anio, por_nombre), o None si el histórico no tiene filas.
+    """
+    if os.path.exists(ruta_limpia):
+        print(f"Calculando agregados iniciales desde {ruta_limpia}")
+        filas = filas_si_no_entra(ruta_limpia, presupuesto_memoria())
+        bloques = [pd.read_csv(ruta_limpia)] if filas is None else pd.read_csv(ruta_limpia, chunksize=filas)
+    else:
+        destino = os.path.join(DIRECTORIO_PARTICIONES, nombre_logico)
+        print(f"Calculando agregados iniciales desde las particiones de {destino}")
+        with open(os.path.join(destino, 'indice.json'), encoding='utf-8') as f:
+            indice = json.load(f)
+        bloques = (pd.read_csv(os.path.join(destino, particion['archivo']), compression='gzip')
+                   for particion in indice['particiones'])
+
+    # Los agregados se pueden recombinar: se calculan bloque a bloque
+    actuales = None
+    for bloque in bloques:
+        parciales = calcular_agregados(bloque)
+        actuales = parciales if actuales is None else combinar_agregados(actuales, parciales)
+    return actuales
+
+
+def actualizar_almacen(df_nuevo, nombre_logico="historico-nombres", pendientes=None):
+    """
+    Agrega filas nuevas al almacén binario (ver modules/almacen_binario.py).
+
+    Se parte de los arreglos del propio almacén, sin volver a leer el CSV ni pasar
+    las filas existentes por pandas (ver ampliar_almacen). El almacén nuevo se
+    escribe en un directorio aparte y reemplaza al anterior al final, así que
+    quien lo tenga abierto no lee archivos a medio escribir.
+
+    Args:
+        df_nuevo (pd.DataFrame): Filas limpias a agregar.
+        nombre_logico (str): Clave del archivo en ARCHIVOS.
+        pendientes (list): Si se indica, el reemplazo se deja pendiente (ver _confirmar).
+
+    Returns:
+        bool: True si había almacén y se actualizó.
+    """
+    directorio = os.path.join("docs", f"{nombre_logico}_bin")
+    if not os.path.exists(os.path.join(directorio, "meta.json")):
+        return False
+    propios = [] if pendientes is None else pendientes
+    temporal = _temporal(directorio, propios)
+    shutil.rmtree(temporal, ignore_errors=True)
+    almacen = abrir_almacen(directorio)
+    ampliar_almacen(almacen, df_nuevo[[almacen.columna, 'cantidad', 'anio']], temporal)
+    del almacen
+    if pendientes is None:
+        _confirmar(propios)
+    print(f"Almacén binario actualizado en {directorio}")
+    return True
+
+
+def agregar_anios(ruta_nuevos, nombre_logico="historico-nombres", encoding='utf-8'):
+    """
+    Incorpora un archivo con años nuevos al histórico limpio sin reprocesarlo entero.
+
+    Las filas nuevas se limpian con las mismas reglas (REEMPLAZOS), se agregan al
+    final del CSV limpio (si el histórico tiene uno), se escriben solo en las
+    particiones afectadas (si está particionado), se suman a los agregados por
+    año y por nombre y se incorporan al almacén binario (si existe). Si los
+    agregados todavía no existen se calculan una vez desde el CSV limpio o, si no
+    hay CSV, desde las particiones.
+
+    Todo se escribe primero en temporales y los archivos definitivos se reemplazan
+    recién al final: si algo falla en el medio no queda ninguno modificado y se
+    puede volver a ejecutar sin duplicar filas. Los agregados se reemplazan
+    primero, porque son los que registran qué años ya están incorporados.
+
+    Args:
+        ruta_nuevos (str): CSV con el mismo formato que el original y solo años nuevos.
+        nombre_logico (str): Clave del archivo en ARCHIVOS.
+        encoding (str): Codificación del archivo nuevo.
+
+    Returns:
+        pd.DataFrame: Filas nuevas ya limpias.
+    """
+    ruta_limpia = ARCHIVOS[nombre_logico].replace('.csv', '_clean.csv')
+    ruta_indice = os.path.join(DIRECTORIO_PARTICIONES, nombre_logico, 'indice.json')
+    ruta_por_anio, ruta_por_nombre = rutas_agregados(nombre_logico)
+    hay_csv, hay_particiones = os.path.exists(ruta_limpia), os.path.exists(ruta_indice)
+    if not hay_csv and not hay_particiones:
+        # Sin base no se pueden detectar años repetidos y se perdería el histórico
+        raise ValueError(f"No hay histórico limpio de {nombre_logico} ({ruta_limpia} ni {ruta_indice}): "
+                         f"limpiar primero el archivo completo")
+
+    print(f"Procesando: {ruta_nuevos}")
+    nuevos = aplicar_reglas(leer_archivo(ruta_nuevos, encoding, nombre_logico=nombre_logico), nombre_logico)
+
+    if os.path.exists(ruta_por_anio) and os.path.exists(ruta_por_nombre):
+        actuales = (pd.read_csv(ruta_por_anio), pd.read_csv(ruta_por_nombre))
+    else:
+        actuales = _agregados_iniciales(nombre_logico, ruta_limpia)
+
+    if actuales is not None:
+        repetidos = sorted(int(a) for a in set(nuevos['anio'].unique()) & set(actuales[0]['anio']))
+        if repetidos:
+            raise ValueError(f"Los años {repetidos} ya están en el histórico limpio de {nombre_logico}")
+
+    if hay_csv:
+        columnas = pd.read_csv(ruta_limpia, nrows=0).columns
+    else:
+        with open(ruta_indice, encoding='utf-8') as f:
+            columnas = json.load(f)['columnas']
+    if list(columnas) != list(nuevos.columns):
+        raise ValueError(f"Columnas distintas al histórico limpio {list(columnas)}: {list(nuevos.columns)}")
+
+    agregados = calcular_agregados(nuevos)
+    if actuales is not None:
+        agregados = combinar_agregados(actuales, agregados)
+
+    pendientes = []
+    try:
+        os.makedirs(DIRECTORIO_AGREGADOS, exist_ok=True)
+        agregados[0].to_csv(_temporal(ruta_por_anio, pendientes), index=False)
+        agregados[1].to_csv(_temporal(ruta_por_nombre, pendientes), index=False)
+        if hay_csv:
+            # Se agrega a una copia: el CSV limpio no se toca hasta confirmar
+            temporal = _temporal(ruta_limpia, pendientes)
+            shutil.copyfile(ruta_limpia, temporal)
+            nuevos.to_csv(temporal, mode='a', header=False, index=False)
+        actualizar_particiones(nuevos, nombre_logico, pendientes=pendientes)
+        actualizar_almacen(nuevos, nombre_logico, pendientes)
+    except BaseException:
+        _descartar(pendientes)
+        raise
+    _confirmar(pendientes)
+
+    print(f"Agregados actualizados en {DIRECTORIO_AGREGADOS}")
+    if hay_csv:
+        print(f"Agregadas {len(nuevos)} filas a {ruta_limpia}")
+    return nuevos
+
+
+# ---------- SIMULACIÓN (DRY-RUN) ----------
+
+def calcular_impacto(df, nombre_logico, reglas=None, max_muestras=3):
+    """
+    Calcula cuántas celdas tocaría cada regla sin modificar los datos.
+
+    Cada columna se recorre una sola vez sobre sus valores distintos con un patrón
+    combinado de todas sus reglas, y los resultados se ponderan por la frecuencia
+    de cada valor.
+
+    Args:
+        df (pd.DataFrame): Datos originales con columnas normalizadas.
+        nombre_logico (str): Clave del archivo en ARCHIVOS.
+        reglas (dict): Reglas por archivo y columna; por defecto REEMPLAZOS.
+        max_muestras (int): Pares antes/después a conservar por regla.
+
+    Returns:
+        pd.DataFrame: Una fila por (columna, regla) con 'celdas', 'apariciones' y 'muestras'.
+    """
+    reglas = REEMPLAZOS if reglas is None else reglas
+    texto = list(df.select_dtypes(include=['object', 'string']).columns)
+    filas = []
+    for columna, reemplazos in reglas.get(nombre_logico, {}).items():
+        if not reemplazos:
+            continue
+        columnas = texto if columna == TODAS_LAS_COLUMNAS else [c for c in [columna] if c in df.columns]
+        corregir = compilar_reglas(reemplazos)
+        patron = re.compile('|'.join(re.escape(mal) for mal in sorted(reemplazos, key=len, reverse=True)))
+        for col in columnas:
+            frecuencias = df[col].dropna().value_counts()
+            frecuencias = frecuencias[[isinstance(v, str) for v in frecuencias.index]]
+            # Una pasada del patrón combinado por valor distinto
+            coincidencias = pd.Series(frecuencias.index.str.findall(patron), index=frecuencias.index).explode().dropna()
+            coincidencias = pd.DataFrame({'valor': coincidencias.index, 'regla': coincidencias.to_numpy()})
+            coincidencias['frecuencia'] = coincidencias['valor'].map(frecuencias)
+            apariciones = coincidencias.groupby('regla')['frecuencia'].sum()
+            por_valor = coincidencias.drop_duplicates(['valor', 'regla'])
+            celdas = por_valor.groupby('regla')['frecuencia'].sum()
+            for mal, bien in reemplazos.items():
+                valores = por_valor.loc[por_valor['regla'] == mal, 'valor'].head(max_muestras)
+                filas.append({
+                    'archivo': nombre_logico,
+                    'columna': col,
+                    'regla': mal,
+                    'reemplazo': bien,
+                    'celdas': int(celdas.get(mal, 0)),
+                    'apariciones': int(apariciones.get(mal, 0)),
+                    'muestras': [(v, corregir(v)) for v in valores]
+                })
+    return pd.DataFrame(filas, columns=['archivo', 'columna', 'regla', 'reemplazo',
+                                        'celdas', 'apariciones', 'muestras'])
+
+
+def escribir_reporte_impacto(impacto, ruta="docs/reporte_impacto_reemplazos.txt"):
+    """
+    Guarda el reporte de impacto de las reglas, de mayor a menor cantidad de celdas.
+
+    Args:
+        impacto (pd.DataFrame): Resultado de calcular_impacto (uno o varios archivos).
+        ruta (str): Ruta del reporte de texto.
+    """
+    with open(ruta, "w", encoding="utf-8") as f:
+        for (archivo, columna), grupo in impacto.groupby(['archivo', 'columna'], sort=False):
+            f.write(f"\n=== Archivo: {archivo} | Columna: {columna} ===\n")
+            for _, fila in grupo.sort_values('celdas', ascending=False, kind='stable').iterrows():
+                f.write(f"\n  Regla: {repr(fila['regla'])} -> {repr(fila['reemplazo'])}: "
+                        f"{fila['celdas']} celdas, {fila['apariciones']} apariciones\n")
+                for antes, despues in fila['muestras']:
+                    f.write(f"    {antes} -> {despues}\n")
+    print(f"Reporte de impacto guardado en {ruta}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Limpieza de caracteres de los datasets")
+    parser.add_argument('--dry-run', action='store_true',
+                        help="Solo calcula el impacto de cada regla, sin escribir los _clean.csv")
+    parser.add_argument('--particionado', action='store_true',
+                        help=f"Escribe particiones comprimidas con índice en {DIRECTORIO_PARTICIONES}")
+    parser.add_argument('--agregar', metavar='CSV',
+                        help="Agrega al histórico limpio un archivo con años nuevos (sin reprocesar el resto)")
+    parser.add_argument('archivos', nargs='*', default=list(ARCHIVOS),
+                        help="Nombres lógicos a procesar (por defecto, todos)")
+    args = parser.parse_args()
+
+    if args.agregar:
+        agregar_anios(args.agregar)
+        sys.exit(0)
+
+    if args.dry_run:
+        impactos = []
+        for nombre_logico in args.archivos:
+            columnas_reglas = set(REEMPLAZOS.get(nombre_logico, {}))
+            if not columnas_reglas:
+                continue
+            print(f"Simulando: {ARCHIVOS[nombre_logico]}")
+            # Solo se leen las columnas con reglas (salvo que haya una regla comodín)
+            usar = None if TODAS_LAS_COLUMNAS in columnas_reglas else lambda c: c.replace('"', '') in columnas_reglas
+            df = leer_archivo(ARCHIVOS[nombre_logico], columnas=usar, nombre_logico=nombre_logico)
+            impactos.append(calcular_impacto(df, nombre_logico))
+        if impactos:
+            escribir_reporte_impacto(pd.concat(impactos, ignore_index=True))
+        sys.exit(0)
 
-# Procesar todos los archivos
-dataframes_limpios = {}
-for nombre_logico, ruta_archivo in ARCHIVOS.items():
-    df = limpiar_archivo(nombre_logico, ruta_archivo)
-    dataframes_limpios[nombre_logico] = df
+    # Procesar todos los archivos
+    salidas = {}
+    for nombre_logico in args.archivos:
+        salidas[nombre_logico] = limpiar_archivo(nombre_logico, ARCHIVOS[nombre_logico],
+                                                 particionado=args.particionado)
@@ -0,0 +1,117 @@
+"""Reparación de UTF-8 inválido a nivel de bytes, antes de decodificar.
+
+Decodificar con errors='replace' convierte cada byte inválido en U+FFFD y se
+pierde cuál era; decodificar todo como latin1 rompe las secuencias UTF-8
+válidas ('ñ' pasa a 'Ã±'). Aquí el contenido crudo se decodifica como UTF-8 con
+un manejador de errores propio: las secuencias válidas las decodifica el códec
+(en C, sin pasar por Python), y solo en cada byte inválido se consulta la tabla
+de secuencias conocidas (los artefactos latin1/cp850 que las reglas de
+reemplazo corrigen, como 0xA4 -> 'ñ'); el resto de los bytes inválidos se
+interpreta con una codificación de respaldo. El resultado es UTF-8 válido."""
+
+import codecs
+import hashlib
+
+# Tamaño de los bloques al reparar un archivo completo
+TAMANO_BLOQUE = 8 * 1024 * 1024
+
+# Manejadores de errores registrados, por contenido de la tabla y respaldo
+_MANEJADORES = {}
+
+
+def tabla_desde_reglas(reemplazos):
+    """
+    Traduce reglas de reemplazo de caracteres a reglas sobre bytes inválidos.
+
+    Solo se usan las reglas cuyo texto 'mal' es representable en latin1 y contiene
+    bytes altos: son las que aparecen cuando un byte suelto se lee como latin1.
+
+    Args:
+        reemplazos (dict): {mal: bien} de reglas_reemplazo.json.
+
+    Returns:
+        dict: {bytes_invalidos: utf8_correcto}.
+    """
+    tabla = {}
+    for mal, bien in reemplazos.items():
+        try:
+            crudo = mal.encode('latin1')
+        except UnicodeEncodeError:
+            continue
+        if any(byte >= 0x80 for byte in crudo):
+            tabla[crudo] = bien.encode('utf-8')
+    return tabla
+
+
+def _manejador(tabla, respaldo):
+    """Registra (una vez) el manejador de errores del códec para una tabla y devuelve su nombre."""
+    clave = (tuple(sorted(tabla.items())), respaldo)
+    if clave not in _MANEJADORES:
+        nombre = 'reparacion_' + hashlib.sha256(repr(clave).encode('utf-8')).hexdigest()[:16]
+        conocidos = [(mal, bien.decode('utf-8')) for mal, bien in sorted(tabla.items(), key=lambda x: -len(x[0]))]
+
+        def reparar(error):
+            datos, inicio = error.object, error.start
+            for mal, bien in conocidos:
+                if datos.startswith(mal, inicio):
+                    return bien, inicio + len(mal)
+            return datos[inicio:inicio + 1].decode(respaldo), inicio + 1
+
+        codecs.register_error(nombre, reparar)
+        _MANEJADORES[clave] = nombre
+    return _MANEJADORES[clave]
+
+
+def reparar_bytes(datos, tabla=None, respaldo='cp850'):
+    """
+    Convierte un contenido con UTF-8 parcialmente inválido en UTF-8 válido.
+
+    Args:
+        datos (bytes): Contenido crudo.
+        tabla (dict): Reemplazos de secuencias inválidas conocidas (ver tabla_desde_reglas).
+        respaldo (str): Codificación de un byte para los bytes inválidos restantes.
+
+    Returns:
+        bytes: Contenido en UTF-8 válido.
+    """
+    return datos.decode('utf-8', errors=_manejador(tabla or {}, respaldo)).encode('utf-8')
+
+
+def decodificar(datos, tabla=None, respaldo='cp850'):
+    """
+    Decodifica como UTF-8 reparando los bytes inválidos (las secuencias válidas no cambian).
+
+    Args:
+        datos (bytes): Contenido crudo.
+        tabla (dict): Reemplazos de secuencias inválidas conocidas.
+        respaldo (str): Codificación de un byte para los bytes inválidos restantes.
+
+    Returns:
+        str: Texto decodificado.
+    """
+    return datos.decode('utf-8', errors=_manejador(tabla or {}, respaldo))
+
+
+def reparar_archivo(origen, destino, tabla=None, respaldo='cp850', tamano_bloque=TAMANO_BLOQUE):
+    """
+    Repara un archivo por bloques cortados en fin de línea (una secuencia UTF-8
+    nunca contiene '\\n', así que ningún corte la parte).
+
+    Args:
+        origen (str): Archivo con UTF-8 parcialmente inválido.
+        destino (str): Archivo UTF-8 válido a escribir.
+        tabla (dict): Reemplazos de secuencias inválidas conocidas.
+        respaldo (str): Codificación de un byte para los bytes inválidos restantes.
+        tamano_bloque (int): Bytes leídos por bloque.
+    """
+    with open(origen, 'rb') as entrada, open(destino, 'wb') as salida:
+        resto = b''
+        while True:
+            bloque = entrada.read(tamano_bloque)
+            if not bloque:
+                salida.write(reparar_bytes(resto, tabla, respaldo))
+                break
+            datos = resto + bloque
+            corte = datos.rfind(b'\n') + 1
+            salida.write(reparar_bytes(datos[:corte], tabla, respaldo))
+            resto = datos[corte:]
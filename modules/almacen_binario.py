@@ -0,0 +1,242 @@
+"""Almacén binario memory-mapped para historico-nombres.
+
+Formato en disco (un directorio):
+    anio.npy            int16, una posición por fila
+    cantidad.npy        int32, una posición por fila
+    nombre_codigo.npy   int32, código del nombre en el diccionario
+    filas_nombre.npy    int64, desplazamientos de las filas de cada código
+    dic_offsets.npy     int64, desplazamientos de cada nombre en dic_datos.bin
+    dic_datos.bin       nombres en UTF-8, concatenados y en orden alfabético
+    meta.json           cantidad de filas y de nombres, versión del formato
+
+Las filas se guardan ordenadas por (código, año), así que las filas de un
+nombre son un tramo contiguo. Todos los arreglos se abren con mmap: abrir el
+almacén no lee los datos, y varios procesos que lo abren comparten las mismas
+páginas del caché del sistema operativo sin copiarlas. filas() y columnas() no
+copian; a_dataframe() copia solo los códigos de la columna de nombres y
+decodifica el diccionario de una sola vez (una pasada en C, no un bucle por
+nombre), la primera vez que se lo pide."""
+
+import bisect
+import json
+import os
+import sys
+
+import numpy as np
+import pandas as pd
+
+VERSION_FORMATO = 1
+
+
+def escribir_almacen(df: pd.DataFrame, directorio: str, columna: str = 'nombre') -> None:
+    """
+    Escribe el histórico en formato binario columnar.
+
+    Args:
+        df (pd.DataFrame): Datos con columnas `columna`, 'anio' y 'cantidad'.
+        directorio (str): Directorio de destino (se crea si no existe).
+        columna (str): Columna de texto que se codifica con diccionario.
+    """
+    df = df.dropna(subset=[columna])
+    codigos, nombres = pd.factorize(df[columna], sort=True)
+    _escribir_arreglos(directorio, columna, [str(nombre) for nombre in nombres], codigos,
+                       df['anio'].to_numpy(), df['cantidad'].to_numpy())
+
+
+def ampliar_almacen(almacen: 'AlmacenHistorico', df: pd.DataFrame, directorio: str) -> None:
+    """
+    Escribe en `directorio` el contenido de `almacen` más las filas de `df`.
+
+    Las filas existentes no pasan por pandas ni se vuelven a codificar: se toman
+    los arreglos mapeados, se suman al diccionario solo los nombres nuevos y se
+    renumeran los códigos (el diccionario sigue ordenado, así que la renumeración
+    es monótona). Las filas de cada nombre tienen que quedar contiguas, así que
+    los arreglos se reescriben completos: no alcanza con agregar al final.
+
+    Args:
+        almacen (AlmacenHistorico): Almacén abierto de origen.
+        df (pd.DataFrame): Filas nuevas con la columna del almacén, 'anio' y 'cantidad'.
+        directorio (str): Directorio de destino (distinto del de origen).
+    """
+    columna = almacen.columna
+    df = df.dropna(subset=[columna])
+    anteriores = almacen.nombres.todos()
+    nombres = sorted(set(anteriores).union(df[columna].astype(str)))
+    posiciones = pd.Index(nombres)
+    remapeo = posiciones.get_indexer(anteriores)
+    codigos = np.concatenate([remapeo[np.asarray(almacen.codigo)],
+                              posiciones.get_indexer(df[columna].astype(str))])
+    _escribir_arreglos(directorio, columna, nombres, codigos,
+                       np.concatenate([almacen.anio, df['anio'].to_numpy().astype(np.int16)]),
+                       np.concatenate([almacen.cantidad, df['cantidad'].to_numpy().astype(np.int32)]))
+
+
+def _escribir_arreglos(directorio: str, columna: str, nombres: list, codigos: np.ndarray,
+                       anio: np.ndarray, cantidad: np.ndarray) -> None:
+    """Ordena las filas por (código, año) y guarda los arreglos, el diccionario y meta.json."""
+    os.makedirs(directorio, exist_ok=True)
+    orden = np.lexsort((anio, codigos))
+    codigos = np.asarray(codigos)[orden].astype(np.int32)
+
+    np.save(os.path.join(directorio, 'anio.npy'), np.asarray(anio)[orden].astype(np.int16))
+    np.save(os.path.join(directorio, 'cantidad.npy'), np.asarray(cantidad)[orden].astype(np.int32))
+    np.save(os.path.join(directorio, 'nombre_codigo.npy'), codigos)
+    np.save(os.path.join(directorio, 'filas_nombre.npy'),
+            np.searchsorted(codigos, np.arange(len(nombres) + 1)).astype(np.int64))
+
+    codificados = [nombre.encode('utf-8') for nombre in nombres]
+    offsets = np.zeros(len(codificados) + 1, dtype=np.int64)
+    np.cumsum([len(b) for b in codificados], out=offsets[1:])
+    np.save(os.path.join(directorio, 'dic_offsets.npy'), offsets)
+    with open(os.path.join(directorio, 'dic_datos.bin'), 'wb') as f:
+        f.write(b''.join(codificados))
+
+    with open(os.path.join(directorio, 'meta.json'), 'w', encoding='utf-8') as f:
+        json.dump({'version': VERSION_FORMATO, 'columna': columna,
+                   'filas': int(len(codigos)), 'nombres': int(len(nombres))}, f)
+
+
+class _DiccionarioMapeado:
+    """Secuencia ordenada de cadenas leída bajo demanda desde un blob mapeado."""
+
+    def __init__(self, offsets: np.ndarray, datos: np.ndarray):
+        self._offsets = offsets
+        self._datos = datos
+        self._decodificados = None
+
+    def __len__(self) -> int:
+        return len(self._offsets) - 1
+
+    def __getitem__(self, i: int) -> str:
+        inicio, fin = self._offsets[i], self._offsets[i + 1]
+        return bytes(self._datos[inicio:fin]).decode('utf-8')
+
+    def todos(self) -> list:
+        """
+        Decodifica el diccionario completo (se calcula una vez y se reutiliza).
+
+        Se intercala un byte nulo entre los nombres con np.insert y se separa el texto
+        decodificado: todo el trabajo por nombre queda en C.
+
+        Returns:
+            list: Nombres en orden de código.
+        """
+        if self._decodificados is None:
+            if len(self) == 0:
+                self._decodificados = []
+            else:
+                separados = np.insert(np.asarray(self._datos), np.asarray(self._offsets[1:-1]), 0)
+                self._decodificados = separados.tobytes().decode('utf-8').split('\0')
+                if len(self._decodificados) != len(self):
+                    # Algún nombre contiene un byte nulo: se decodifica de a uno
+                    self._decodificados = [self[i] for i in range(len(self))]
+        return self._decodificados
+
+
+class AlmacenHistorico:
+    """
+    Vista de solo lectura sobre un almacén escrito con escribir_almacen.
+
+    Args:
+        directorio (str): Directorio del almacén.
+    """
+
+    def __init__(self, directorio: str):
+        with open(os.path.join(directorio, 'meta.json'), encoding='utf-8') as f:
+            self.meta = json.load(f)
+        if self.meta.get('version') != VERSION_FORMATO:
+            raise ValueError(f"Versión de almacén no soportada: {self.meta.get('version')}")
+        self.columna = self.meta['columna']
+
+        def cargar(nombre):
+            return np.load(os.path.join(directorio, nombre), mmap_mode='r')
+
+        self.anio = cargar('anio.npy')
+        self.cantidad = cargar('cantidad.npy')
+        self.codigo = cargar('nombre_codigo.npy')
+        self._filas_nombre = cargar('filas_nombre.npy')
+        ruta_datos = os.path.join(directorio, 'dic_datos.bin')
+        datos = (np.memmap(ruta_datos, dtype=np.uint8, mode='r') if os.path.getsize(ruta_datos) > 0
+                 else np.zeros(0, dtype=np.uint8))
+        self.nombres = _DiccionarioMapeado(cargar('dic_offsets.npy'), datos)
+
+    def __len__(self) -> int:
+        return self.meta['filas']
+
+    def codigo_de(self, nombre: str) -> int:
+        """
+        Busca el código de un nombre por búsqueda binaria en el diccionario ordenado.
+
+        Returns:
+            int: Código del nombre, o -1 si no está en el diccionario.
+        """
+        i = bisect.bisect_left(self.nombres, nombre)
+        return i if i < len(self.nombres) and self.nombres[i] == nombre else -1
+
+    def filas(self, nombre: str) -> pd.DataFrame:
+        """
+        Devuelve las filas de un nombre (tramo contiguo, sin recorrer el resto).
+
+        Args:
+            nombre (str): Valor exacto de la columna codificada.
+
+        Returns:
+            pd.DataFrame: Columnas 'anio' y 'cantidad' ordenadas por año.
+        """
+        codigo = self.codigo_de(nombre)
+        if codigo < 0:
+            return pd.DataFrame({'anio': pd.Series(dtype=np.int16), 'cantidad': pd.Series(dtype=np.int32)})
+        desde, hasta = self._filas_nombre[codigo], self._filas_nombre[codigo + 1]
+        return pd.DataFrame({'anio': self.anio[desde:hasta], 'cantidad': self.cantidad[desde:hasta]})
+
+    def columnas(self) -> dict:
+        """
+        Arreglos del almacén tal como están mapeados, sin copiar nada.
+
+        Returns:
+            dict: 'codigo', 'cantidad' y 'anio' (memmap de solo lectura, una posición por
+            fila, ordenadas por código y año) y 'nombres' (código -> texto, bajo demanda).
+        """
+        return {'codigo': self.codigo, 'cantidad': self.cantidad, 'anio': self.anio, 'nombres': self.nombres}
+
+    def a_dataframe(self) -> pd.DataFrame:
+        """
+        Materializa el almacén completo como DataFrame (nombre categórico).
+
+        'cantidad' y 'anio' quedan sobre los arreglos mapeados, sin copia. La columna
+        de nombres sí se construye en memoria: el diccionario se decodifica una vez por
+        almacén abierto (ver _DiccionarioMapeado.todos) y se copian los códigos a un
+        Categorical (4 bytes o menos por fila). Para leer sin copias, usar columnas()
+        o filas().
+
+        Returns:
+            pd.DataFrame: Columnas `columna`, 'cantidad' y 'anio'.
+        """
+        categorias = self.nombres.todos()
+        return pd.DataFrame({
+            self.columna: pd.Categorical.from_codes(np.asarray(self.codigo), categories=categorias),
+            'cantidad': self.cantidad,
+            'anio': self.anio
+        }, copy=False)
+
+
+def abrir_almacen(directorio: str) -> AlmacenHistorico:
+    """
+    Abre un almacén binario con mmap; el costo no depende del tamaño del archivo.
+
+    Args:
+        directorio (str): Directorio del almacén.
+
+    Returns:
+        AlmacenHistorico: Vista de solo lectura compartible entre procesos.
+    """
+    return AlmacenHistorico(directorio)
+
+
+if __name__ == "__main__":
+    # Uso: python modules/almacen_binario.py [csv_limpio] [directorio_destino]
+    origen = sys.argv[1] if len(sys.argv) > 1 else 'docs/historico-nombres_clean.csv'
+    destino = sys.argv[2] if len(sys.argv) > 2 else 'docs/historico-nombres_bin'
+    print(f"Convirtiendo {origen} a formato binario...")
+    escribir_almacen(pd.read_csv(origen), destino)
+    print(f"Almacén guardado en {destino}")
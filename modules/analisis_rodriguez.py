@@ -1,89 +1,184 @@
 import pandas as pd
-from bokeh.plotting import figure, output_file, save
-from bokeh.models import (HoverTool, ColumnDataSource, Span, Label,
-                         LabelSet, ColorBar, LinearColorMapper,NumeralTickFormatter)
-from bokeh.layouts import column, row, gridplot
-from bokeh.transform import factor_cmap, transform, linear_cmap
-from bokeh.palettes import Viridis256, RdYlGn
-from bokeh.models import GeoJSONDataSource
 import warnings
 import os
-import geopandas as gpd
-from bokeh.io import export_png
+import sys
+# bokeh y geopandas se importan dentro de cada análisis (ver registro_analisis.py)
+from generaciones import AgregadorGeneraciones, GENERACIONES
+from unicidad import estimar_matriz_unicidad, poblacion_por_provincia
+from indice_nombres import IndiceDifuso
+from variantes import agregar_clave, grafias_canonicas, resolver_clave
+from carga_datos import cargar_agrupado, cargar_dataset
+from provincias import agregar_provincia_id, provincia_id_de
+from ranking_provincias import ranking_por_provincia, validar_ranking
+from tabla_rankings import obtener_tabla_rankings
+from trayectorias import MatrizTrayectorias
+from tendencias import RUTA_TENDENCIAS, calcular_tendencias
+from decimacion import agrupar_otros, decimar_serie
+from cache_graficos import CacheGraficos, huella_archivo
+from registro_analisis import RegistroAnalisis
 warnings.filterwarnings('ignore')
 
-# Verificar y crear el directorio
-if not os.path.exists("visualizaciones"):
-    os.makedirs("visualizaciones")
-    print("Directorio 'visualizaciones' creado.")
+# Gráficos ya generados con los mismos datos y parámetros (ver cache_graficos.py);
+# el manifiesto se lee recién al ejecutar el primer gráfico
+cache_graficos = CacheGraficos()
+
+# Análisis disponibles, con los paquetes pesados que cada uno necesita. Los datos
+# que usan se declaran como preparaciones: se calculan recién cuando los requiere
+# el primer análisis seleccionado y quedan como variables globales de este módulo
+registro = RegistroAnalisis(variables=globals())
+
+# --------------------------------------
+# Preparación de datos
+# --------------------------------------
+# (almacén binario, particiones comprimidas o CSV limpio, según lo disponible)
+# Los datasets grandes se cargan con sus variantes ortográficas (tildes, mayúsculas,
+# mojibake) ya unificadas; si superan PRESUPUESTO_MEMORIA_MB se agrupan por bloques
+
+# Variables que publican las preparaciones de abajo (None hasta que un análisis las requiere)
+historico_nombres = apellidos_provincia = apellidos_pais = apellidos_provincia_ranking = None
+indice_apellidos = indice_nombres = clave_rodriguez = clave_joaquin = None
+rodriguez_pais = rodriguez_provincias = rodriguez_ranking_provincias = ranking_provincias = None
+joaquin_historico = joaquin_por_provincia = None
+agregador_generaciones = tabla_rankings = trayectorias = tendencias_nombres = None
+
+
+@registro.preparacion('historico_nombres')
+def preparar_historico_nombres():
+    print("Cargando historico-nombres limpio...")
+    return cargar_agrupado('historico-nombres', 'nombre', ['anio'], ruta_mapeo='docs/variantes_nombre.csv')
+
+
+@registro.preparacion('apellidos_provincia')
+def preparar_apellidos_provincia():
+    print("Cargando apellidos por provincia limpios...")
+    return cargar_agrupado('apellidos_provincia', 'apellido', ['provincia_id', 'provincia_nombre'],
+                           ruta_mapeo='docs/variantes_apellido.csv')
+
+
+@registro.preparacion('apellidos_pais')
+def preparar_apellidos_pais():
+    return agregar_clave(cargar_dataset('apellidos_pais'), 'apellido')
+
+
+@registro.preparacion('apellidos_provincia_ranking')
+def preparar_apellidos_provincia_ranking():
+    return agregar_clave(cargar_dataset('apellidos_provincia_ranking'), 'apellido')
+
 
-# Cargar datos limpios
-print("Cargando datos limpios...")
-apellidos_provincia = pd.read_csv('docs/apellidos_cantidad_personas_provincia_clean.csv')
-apellidos_pais = pd.read_csv('docs/apellidos_mas_frecuentes_pais_clean.csv')
-apellidos_provincia_ranking = pd.read_csv('docs/apellidos_mas_frecuentes_provincia_clean.csv')
-historico_nombres = pd.read_csv('docs/historico-nombres_clean.csv')
+# Índices de búsqueda difusa sobre los valores canónicos (toleran tildes, errores y mojibake)
+@registro.preparacion('indice_apellidos', requiere=('apellidos_provincia',))
+def preparar_indice_apellidos():
+    return IndiceDifuso(apellidos_provincia['apellido'], apellidos_provincia['cantidad'])
+
+
+@registro.preparacion('indice_nombres', requiere=('historico_nombres',))
+def preparar_indice_nombres():
+    return IndiceDifuso(historico_nombres['nombre'], historico_nombres['cantidad'])
 
-# Preparar datos relevantes para el análisis
-print("Preparando datasets específicos para el análisis...")
 
 # Buscar el apellido Rodriguez
-rodriguez_pais = apellidos_pais[apellidos_pais['apellido'].str.lower() == 'rodriguez']
-if len(rodriguez_pais) == 0:
-    rodriguez_pais = apellidos_pais[apellidos_pais['apellido'].str.lower() == 'rodríguez']
+@registro.preparacion('clave_rodriguez', requiere=('indice_apellidos',))
+def preparar_clave_rodriguez():
+    return resolver_clave('Rodríguez', indice_apellidos)
+
+
+@registro.preparacion('rodriguez_pais', requiere=('apellidos_pais', 'clave_rodriguez'))
+def preparar_rodriguez_pais():
+    rodriguez = apellidos_pais[apellidos_pais['apellido_clave'] == clave_rodriguez]
+    print(f"Datos de apellido Rodríguez a nivel país: {len(rodriguez)} registros")
+    return rodriguez
+
 
-rodriguez_provincias = apellidos_provincia[apellidos_provincia['apellido'].str.lower() == 'rodriguez']
-if len(rodriguez_provincias) == 0:
-    rodriguez_provincias = apellidos_provincia[apellidos_provincia['apellido'].str.lower() == 'rodríguez']
+@registro.preparacion('rodriguez_ranking_provincias', requiere=('apellidos_provincia_ranking', 'clave_rodriguez'))
+def preparar_rodriguez_ranking_provincias():
+    rodriguez = apellidos_provincia_ranking[apellidos_provincia_ranking['apellido_clave'] == clave_rodriguez]
+    print(f"Datos de ranking de Rodríguez por provincia: {len(rodriguez)} registros")
+    return rodriguez
 
-rodriguez_provincias = rodriguez_provincias.groupby('provincia_nombre').agg({'cantidad': 'sum'}).reset_index()
 
-rodriguez_ranking_provincias = apellidos_provincia_ranking[apellidos_provincia_ranking['apellido'].str.lower() == 'rodriguez']
-if len(rodriguez_ranking_provincias) == 0:
-    rodriguez_ranking_provincias = apellidos_provincia_ranking[apellidos_provincia_ranking['apellido'].str.lower() == 'rodríguez']
+# Ranking por provincia calculado desde las cantidades (cualquier k), contrastado con el publicado
+@registro.preparacion('ranking_provincias', requiere=('apellidos_provincia', 'apellidos_provincia_ranking'))
+def preparar_ranking_provincias():
+    ranking = agregar_clave(ranking_por_provincia(apellidos_provincia, k=50), 'apellido')
+    validacion = validar_ranking(ranking, apellidos_provincia_ranking)
+    print(f"Ranking calculado igual al publicado en {int(validacion['orden_identico'].sum())}"
+          f"/{len(validacion)} provincias")
+    return ranking
+
 
 # Buscar el nombre Joaquin
-joaquin_historico = historico_nombres[historico_nombres['nombre'].str.lower() == 'joaquin']
-if len(joaquin_historico) == 0:
-    joaquin_historico = historico_nombres[historico_nombres['nombre'].str.lower() == 'joaquín']
+@registro.preparacion('clave_joaquin', requiere=('indice_nombres',))
+def preparar_clave_joaquin():
+    return resolver_clave('Joaquín', indice_nombres)
 
-# Imprimir las columnas de joaquin_historico para verificar
-print("Columnas de joaquin_historico:", joaquin_historico.columns)
 
-# Chequeo de que la columna 'provincia_nombre' existe
-if 'provincia_nombre' in joaquin_historico.columns:
+@registro.preparacion('joaquin_historico', requiere=('historico_nombres', 'clave_joaquin'))
+def preparar_joaquin_historico():
+    joaquin = historico_nombres[historico_nombres['nombre_clave'] == clave_joaquin]
+    print(f"Datos históricos del nombre Joaquín: {len(joaquin)} registros")
+    # Ordenar datos históricos por año
+    return joaquin.sort_values('anio') if 'anio' in joaquin.columns else joaquin
 
 
-# Creacion de un DataFrame que contenga la cantidad de 'Joaquin' por provincia
-    joaquin_por_provincia = joaquin_historico.groupby('provincia_nombre')['cantidad'].sum().reset_index()
-    joaquin_por_provincia.rename(columns={'cantidad': 'cantidad_joaquin'}, inplace=True)
-else:
+# Cantidad de 'Joaquin' por provincia (el histórico de nombres no tiene provincia: queda vacía)
+@registro.preparacion('joaquin_por_provincia', requiere=('joaquin_historico',))
+def preparar_joaquin_por_provincia():
+    if 'provincia_nombre' in joaquin_historico.columns:
+        por_provincia = joaquin_historico.groupby('provincia_id')['cantidad'].sum().reset_index()
+        return por_provincia.rename(columns={'cantidad': 'cantidad_joaquin'})
     print("Error: 'provincia_nombre' no se encuentra en joaquin_historico.")
-    joaquin_por_provincia = pd.DataFrame(columns=['provincia_nombre', 'cantidad_joaquin'])
+    return pd.DataFrame({'provincia_id': pd.Series(dtype='int64'),
+                         'cantidad_joaquin': pd.Series(dtype='int64')})
 
-# Combinar este DataFrame con rodriguez_provincias
-rodriguez_provincias = rodriguez_provincias.merge(joaquin_por_provincia, on='provincia_nombre', how='left')
 
-# Ordenar datos históricos por año
-if 'anio' in joaquin_historico.columns:
-    joaquin_historico = joaquin_historico.sort_values('anio')
-    
-# Imprimir información básica para verificar
-print(f"\nDatos de apellido Rodríguez a nivel país: {len(rodriguez_pais)} registros")
-print(f"Datos de apellido Rodríguez por provincia: {len(rodriguez_provincias)} registros")
-print(f"Datos de ranking de Rodríguez por provincia: {len(rodriguez_ranking_provincias)} registros")
-print(f"Datos históricos del nombre Joaquín: {len(joaquin_historico)} registros")
+@registro.preparacion('rodriguez_provincias',
+                      requiere=('apellidos_provincia', 'clave_rodriguez', 'joaquin_por_provincia'))
+def preparar_rodriguez_provincias():
+    rodriguez = apellidos_provincia[apellidos_provincia['apellido_clave'] == clave_rodriguez]
+    rodriguez = rodriguez.groupby(['provincia_id', 'provincia_nombre']).agg({'cantidad': 'sum'}).reset_index()
+    # Combinar con la cantidad de Joaquín por provincia (unión por clave entera de provincia)
+    rodriguez = rodriguez.merge(joaquin_por_provincia, on='provincia_id', how='left')
+    print(f"Datos de apellido Rodríguez por provincia: {len(rodriguez)} registros")
+    return rodriguez
+
 
+# Agregador generacional sobre todos los nombres (un binning por esquema, cacheado)
+@registro.preparacion('agregador_generaciones', requiere=('historico_nombres',))
+def preparar_agregador_generaciones():
+    return AgregadorGeneraciones(historico_nombres)
 
 
-#En este punto, los DataFrames rodriguez_pais, rodriguez_provincias y joaquin_historico están preparados para su análisis. Se pueden utilizar en las siguientes funciones para generar visualizaciones y análisis específicos.
+# Puesto anual de todos los nombres (un solo rank agrupado por año, ver tabla_rankings.py);
+# se reutiliza docs/rankings_nombres.npz si se calculó con este mismo histórico
+@registro.preparacion('tabla_rankings', requiere=('historico_nombres',))
+def preparar_tabla_rankings():
+    return obtener_tabla_rankings(historico_nombres)
+
+
+# Curvas de participación anual de todos los nombres, para buscar trayectorias parecidas
+@registro.preparacion('trayectorias', requiere=('tabla_rankings',))
+def preparar_trayectorias():
+    return MatrizTrayectorias.desde_tabla(tabla_rankings)
+
+
+# Tendencia y años de cambio de todos los nombres (mínimos cuadrados y rectas por tramos en lote)
+@registro.preparacion('tendencias_nombres', requiere=('trayectorias',))
+def preparar_tendencias_nombres():
+    return calcular_tendencias(trayectorias)
 
 
 # --------------------------------------
 # 1. Posicionamiento nacional del apellido Rodríguez
 # --------------------------------------
 
+@registro.registrar('posicionamiento_nacional', dependencias=('bokeh',),
+                    descripcion="Ranking nacional del apellido Rodríguez",
+                    requiere=('apellidos_pais', 'rodriguez_pais'))
+@cache_graficos.grafico("visualizaciones/rodriguez_ranking_nacional.html",
+                        entradas=lambda: (rodriguez_pais, apellidos_pais))
 def analizar_posicionamiento_nacional():
+    from bokeh.models import ColumnDataSource, HoverTool, LabelSet
+    from bokeh.plotting import figure, output_file, save
     print("\n1. Analizando posicionamiento nacional del apellido Rodríguez...")
     
     if len(rodriguez_pais) == 0:
@@ -171,7 +266,14 @@ def analizar_posicionamiento_nacional():
 # 2. Distribución geográfica del apellido Rodríguez
 # --------------------------------------
 
+@registro.registrar('distribucion_provincias', dependencias=('bokeh',),
+                    descripcion="Rodríguez por provincia (barras)",
+                    requiere=('rodriguez_provincias',))
+@cache_graficos.grafico("visualizaciones/rodriguez_distribucion_geografica.html",
+                        entradas=lambda: (rodriguez_provincias,))
 def crear_mapa_distribucion():
+    from bokeh.models import ColumnDataSource, HoverTool
+    from bokeh.plotting import figure, output_file, save
     print("\n2. Analizando distribución geográfica del apellido Rodríguez...")
     
     if len(rodriguez_provincias) == 0:
@@ -180,6 +282,7 @@ def crear_mapa_distribucion():
     
     # Agrupar y eliminar duplicados
     provincias_ordenadas = rodriguez_provincias.drop_duplicates(subset='provincia_nombre').sort_values('cantidad', ascending=False)
+    provincias_ordenadas = agrupar_otros(provincias_ordenadas, 'provincia_nombre', 'cantidad')
     
     # Crear una nueva columna de colores alternados
     provincias_ordenadas['color'] = ["#C70039" if i % 2 == 0 else "#1F77B4" for i in range(len(provincias_ordenadas))]
@@ -244,7 +347,14 @@ def crear_mapa_distribucion():
 # 3. Comparativa entre provincias
 # --------------------------------------
 
+@registro.registrar('comparativa_provincias', dependencias=('bokeh',),
+                    descripcion="Provincias con mayor y menor presencia de Rodríguez",
+                    requiere=('rodriguez_provincias',))
+@cache_graficos.grafico("visualizaciones/rodriguez_comparativa_provincias_prueba.html",
+                        entradas=lambda: (rodriguez_provincias,))
 def comparar_provincias():
+    from bokeh.models import ColumnDataSource, HoverTool, LabelSet, NumeralTickFormatter
+    from bokeh.plotting import figure, output_file, save
     print("\nComparando presencia del apellido Rodríguez entre provincias...")
     
     if len(rodriguez_provincias) == 0:
@@ -328,13 +438,20 @@ def comparar_provincias():
 # 4. Análisis específico de Córdoba
 # --------------------------------------
 
+@registro.registrar('cordoba', dependencias=('bokeh',),
+                    descripcion="Rodríguez en Córdoba frente al resto",
+                    requiere=('clave_rodriguez', 'ranking_provincias', 'rodriguez_provincias',
+                              'rodriguez_ranking_provincias'))
+@cache_graficos.grafico("visualizaciones/rodriguez_analisis_cordoba.html",
+                        entradas=lambda: (rodriguez_provincias, rodriguez_ranking_provincias,
+                                          ranking_provincias[ranking_provincias['apellido_clave'] == clave_rodriguez]))
 def analizar_cordoba():
+    from bokeh.models import ColumnDataSource, HoverTool, Label, Span
+    from bokeh.plotting import figure, output_file, save
     print("\n4. Analizando presencia del apellido Rodríguez en Córdoba...")
     
     # Obtener datos de Córdoba
-    cordoba_datos = rodriguez_provincias[rodriguez_provincias['provincia_nombre'].str.lower() == 'córdoba']
-    if len(cordoba_datos) == 0:
-        cordoba_datos = rodriguez_provincias[rodriguez_provincias['provincia_nombre'].str.lower() == 'cordoba']
+    cordoba_datos = rodriguez_provincias[rodriguez_provincias['provincia_id'] == provincia_id_de('Córdoba')]
     
     if len(cordoba_datos) == 0:
         print("No se encontraron datos para Córdoba")
@@ -342,13 +459,14 @@ def analizar_cordoba():
     
     cantidad_cordoba = cordoba_datos['cantidad'].values[0]
     
-    # Obtener ranking en Córdoba
+    # Obtener ranking en Córdoba (si no figura en el ranking publicado, usar el calculado)
     cordoba_ranking = rodriguez_ranking_provincias[
-        rodriguez_ranking_provincias['provincia_nombre'].str.lower() == 'córdoba'
+        rodriguez_ranking_provincias['provincia_id'] == provincia_id_de('Córdoba')
     ]
     if len(cordoba_ranking) == 0:
-        cordoba_ranking = rodriguez_ranking_provincias[
-            rodriguez_ranking_provincias['provincia_nombre'].str.lower() == 'cordoba'
+        cordoba_ranking = ranking_provincias[
+            (ranking_provincias['provincia_id'] == provincia_id_de('Córdoba')) &
+            (ranking_provincias['apellido_clave'] == clave_rodriguez)
         ]
     
     if len(cordoba_ranking) == 0:
@@ -363,9 +481,9 @@ def analizar_cordoba():
     ratio = cantidad_cordoba / promedio_nacional
     
     # Crear visualización comparativa
-    provincias = rodriguez_provincias.drop_duplicates(subset='provincia_nombre').copy()
+    provincias = rodriguez_provincias.drop_duplicates(subset='provincia_nombre').sort_values('cantidad', ascending=False)
+    provincias = agrupar_otros(provincias, 'provincia_nombre', 'cantidad', conservar=['Córdoba'])
     provincias['es_cordoba'] = provincias['provincia_nombre'].str.lower().isin(['córdoba', 'cordoba'])
-    provincias = provincias.sort_values('cantidad', ascending=False)
     
     # Crear colores para las barras
     provincias['color'] = ['#FF5733' if es_cordoba else '#1F77B4' for es_cordoba in provincias['es_cordoba']]
@@ -417,18 +535,27 @@ def analizar_cordoba():
 # 5. Evolución histórica del nombre Joaquín
 # --------------------------------------
 
+@registro.registrar('evolucion_historica', dependencias=('bokeh',),
+                    descripcion="Evolución, puesto y trayectorias parecidas de Joaquín",
+                    requiere=('historico_nombres', 'clave_joaquin', 'joaquin_historico', 'tabla_rankings',
+                              'trayectorias'))
+@cache_graficos.grafico("visualizaciones/joaquin_evolucion_historica.html",
+                        entradas=lambda: (len(joaquin_historico), tabla_rankings.historial(clave_joaquin),
+                                          trayectorias.nombres, trayectorias.matriz))
 def analizar_evolucion_historica():
+    from bokeh.models import ColumnDataSource, HoverTool
+    from bokeh.plotting import figure, output_file, save
     print("\n6. Analizando evolución histórica del nombre Joaquín...")
     
     if len(joaquin_historico) == 0:
         print("No se encontraron datos históricos del nombre Joaquín")
         return "No hay datos suficientes para el análisis de evolución histórica"
     
-    # Agrupar por año y sumar
-    joaquin_por_anio = joaquin_historico.groupby('anio')['cantidad'].sum().reset_index()
+    # Cantidad, puesto entre todos los nombres y participación por año (consulta a la tabla)
+    joaquin_por_anio = tabla_rankings.historial(clave_joaquin)
     
-    # Crear gráfico interactivo
-    source = ColumnDataSource(joaquin_por_anio)
+    # Crear gráfico interactivo (serie reducida si supera el presupuesto de puntos)
+    source = ColumnDataSource(decimar_serie(joaquin_por_anio, 'anio', 'cantidad'))
     
     p = figure(width=1080, height=600, 
               title="Evolución Histórica del Nombre Joaquín",
@@ -465,7 +592,9 @@ def analizar_evolucion_historica():
     # Agregar información interactiva
     hover = HoverTool(renderers=[circles], tooltips=[
         ("Año", "@anio"),
-        ("Nacimientos", "@cantidad")
+        ("Nacimientos", "@cantidad"),
+        ("Puesto", "@ranking"),
+        ("Participación", "@participacion{0.000}%")
     ])
     p.add_tools(hover)
     
@@ -480,13 +609,36 @@ def analizar_evolucion_historica():
     anio_max = joaquin_por_anio['anio'].max()
     cantidad_min = joaquin_por_anio['cantidad'].min()
     cantidad_max = joaquin_por_anio['cantidad'].max()
+    mejor = joaquin_por_anio.loc[joaquin_por_anio['ranking'].idxmin()]
+
+    # Nombres con una curva de popularidad parecida (correlación sobre la participación anual)
+    parecidos = trayectorias.similares(clave_joaquin, cantidad=5) if trayectorias.fila_de(clave_joaquin) >= 0 \
+        else pd.DataFrame(columns=['nombre', 'correlacion'])
+    # La matriz está indexada por clave ('joaquin'): se muestra la grafía canónica del grupo
+    canonicos = grafias_canonicas(historico_nombres, 'nombre')
+    parecidos['nombre'] = parecidos['nombre'].map(canonicos).fillna(parecidos['nombre'])
+    for _, fila in parecidos.iterrows():
+        print(f"  Trayectoria parecida: {fila['nombre']} (correlación {fila['correlacion']:.2f})")
+
+    return f"Entre {anio_min} y {anio_max} el nombre Joaquín tuvo entre {cantidad_min:,} y {cantidad_max:,} " \
+           f"nacimientos por año; su mejor puesto fue el {int(mejor['ranking'])} en {int(mejor['anio'])} " \
+           f"({mejor['participacion']:.3f}% de los nacimientos). Nombres con una evolución parecida: " \
+           f"{', '.join(parecidos['nombre']) or 'ninguno'}."
 
     
 # --------------------------------------
 # 6. Picos de popularidad del nombre Joaquin
 # --------------------------------------
 
+@registro.registrar('picos_popularidad', dependencias=('bokeh',),
+                    descripcion="Picos, caídas y cambios de nivel de Joaquín",
+                    requiere=('clave_joaquin', 'joaquin_historico', 'tendencias_nombres'))
+@cache_graficos.grafico("visualizaciones/joaquin_picos_popularidad.html",
+                        entradas=lambda: (joaquin_historico,
+                                          tendencias_nombres[tendencias_nombres['nombre'] == clave_joaquin]))
 def identificar_picos_popularidad():
+    from bokeh.models import ColumnDataSource, HoverTool, Span
+    from bokeh.plotting import figure, output_file, save
     print("\n7. Identificando picos de popularidad del nombre Joaquín...")
     
     if len(joaquin_historico) == 0:
@@ -506,7 +658,7 @@ def identificar_picos_popularidad():
     caidas = joaquin_por_anio[joaquin_por_anio['cambio_porcentual'] < -15].copy()
     
     # Crear visualización de picos y caídas
-    source_completo = ColumnDataSource(joaquin_por_anio)
+    source_completo = ColumnDataSource(decimar_serie(joaquin_por_anio, 'anio', 'cantidad'))
     source_picos = ColumnDataSource(picos)
     source_caidas = ColumnDataSource(caidas)
     
@@ -586,6 +738,14 @@ def identificar_picos_popularidad():
     ])
     p.add_tools(hover_nacimiento)
     
+    # Marcar los cambios detectados por la segmentación en rectas (más robustos que el umbral del 15%)
+    tendencia_joaquin = tendencias_nombres[tendencias_nombres['nombre'] == clave_joaquin]
+    anios_cambio = [int(a) for a in tendencia_joaquin['anios_cambio'].iloc[0].split(';') if a] \
+        if len(tendencia_joaquin) else []
+    for anio in anios_cambio:
+        p.add_layout(Span(location=anio, dimension='height', line_color='orange',
+                          line_dash='dashed', line_width=2))
+    
     # Configuración
     p.legend.location = "top_left"
     p.legend.click_policy = "hide"
@@ -612,51 +772,47 @@ def identificar_picos_popularidad():
     else:
         caida_info = "No se identificaron caídas significativas de popularidad."
     
-    return f"{pico_info} {caida_info}"
+    if len(tendencia_joaquin):
+        fila = tendencia_joaquin.iloc[0]
+        tendencia_info = f"La tendencia de largo plazo es {fila['tendencia']} " \
+                         f"({fila['pendiente_relativa']:+.2f}% por año)"
+        tendencia_info += f" y cambia de nivel en {', '.join(map(str, anios_cambio))}." if anios_cambio \
+            else " sin cambios de nivel significativos."
+    else:
+        tendencia_info = ""
+    
+    return f"{pico_info} {caida_info} {tendencia_info}".strip()
+
+
+@registro.registrar('tendencias', dependencias=(),
+                    descripcion="Tabla de tendencias y años de cambio de todos los nombres",
+                    requiere=('tendencias_nombres',))
+def guardar_tendencias():
+    print("\nGuardando tendencias de todos los nombres...")
+    tendencias_nombres.to_csv(RUTA_TENDENCIAS, index=False)
+    return f"Tendencias de {len(tendencias_nombres)} nombres guardadas en {RUTA_TENDENCIAS}"
 
 # --------------------------------------
 # 7. Comparativa generacional del nombre Joaquín
 # --------------------------------------
 
-def analizar_generaciones():
+@registro.registrar('generaciones', dependencias=('bokeh',),
+                    descripcion="Joaquín por generación",
+                    requiere=('agregador_generaciones', 'clave_joaquin', 'joaquin_historico'))
+@cache_graficos.grafico("visualizaciones/joaquin_analisis_generacional.html",
+                        entradas=lambda: (joaquin_historico,))
+def analizar_generaciones(generaciones=GENERACIONES):
+    from bokeh.models import ColumnDataSource, HoverTool
+    from bokeh.plotting import figure, output_file, save
     print("\n9. Analizando popularidad del nombre Joaquín por generaciones...")
     
     if len(joaquin_historico) == 0:
         print("No se encontraron datos históricos del nombre Joaquín")
         return "No hay datos suficientes para el análisis generacional"
     
-    # Definir rangos generacionales (aproximados)
-    generaciones = {
-        '1928-1945': (1928, 1945),
-        '1946-1964': (1946, 1964),
-        '1965-1980': (1965, 1980),
-        '1981-1996': (1981, 1996),
-        '1997-2012': (1997, 2012),
-        '2013- Actualidad': (2013, 2030)
-    }
-    
-    # Preparar datos para el análisis generacional
-    datos_generacionales = []
-    
-    for gen_nombre, (inicio, fin) in generaciones.items():
-        # Filtrar datos para mi generación
-        gen_data = joaquin_historico[
-            (joaquin_historico['anio'] >= inicio) & 
-            (joaquin_historico['anio'] <= fin)
-        ]
-        
-        if len(gen_data) > 0:
-            total = gen_data['cantidad'].sum()
-            promedio_anual = total / (fin - inicio + 1)
-            datos_generacionales.append({
-                'generacion': gen_nombre,
-                'total': total,
-                'promedio_anual': promedio_anual,
-                'periodo': f"{inicio}-{fin}"
-            })
-    
-    # Convertir a DataFrame
-    df_generaciones = pd.DataFrame(datos_generacionales)
+    # Agregación generacional con un único binning sobre 'anio' (cacheada por esquema)
+    df_generaciones = agregador_generaciones.por_nombre(clave_joaquin, generaciones)
+    df_generaciones = df_generaciones[['generacion', 'total', 'promedio_anual', 'periodo']]
     
     # Agregar una columna de colores
     df_generaciones['color'] = ["#1F77B4" if i % 2 == 0 else "#C70039" for i in range(len(df_generaciones))]
@@ -728,7 +884,16 @@ def analizar_generaciones():
 # Variable global para almacenar la estimación
 estimacion_joaquin_rodriguez = 0
 
+@registro.registrar('unicidad', dependencias=('bokeh',),
+                    descripcion="Estimación de personas llamadas Joaquín Rodríguez",
+                    requiere=('historico_nombres', 'joaquin_historico', 'rodriguez_pais'))
+@cache_graficos.grafico("visualizaciones/joaquin_unicidad_combinacion.html",
+                        entradas=lambda: (rodriguez_pais, joaquin_historico,
+                                          historico_nombres.groupby('anio')['cantidad'].sum()),
+                        globales=('estimacion_joaquin_rodriguez',))
 def estimar_unicidad_combinacion():
+    from bokeh.models import ColumnDataSource, HoverTool, NumeralTickFormatter
+    from bokeh.plotting import figure, output_file, save
     global estimacion_joaquin_rodriguez
     print("\n10. Estimando unicidad de la combinación Joaquín Rodríguez...")
     
@@ -832,10 +997,48 @@ def estimar_unicidad_combinacion():
     # Retornar un resumen de la estimación
     return f"Se estima que hay aproximadamente {estimacion_joaquin_rodriguez:.0f} personas llamadas Joaquín Rodríguez en Argentina."
 
+@registro.registrar('unicidad_combinaciones', dependencias=(),
+                    descripcion="Tabla de combinaciones nombre y apellido más frecuentes",
+                    requiere=('apellidos_pais', 'apellidos_provincia', 'apellidos_provincia_ranking',
+                              'historico_nombres'))
+def estimar_unicidad_combinaciones(top_n=20, top_m=100, anio_desde=None, anio_hasta=None, top_k=20):
+    """
+    Estima la cantidad de personas para las combinaciones más frecuentes entre los
+    N apellidos y M nombres principales, a nivel nacional y por provincia.
+
+    Retorna:
+    --------
+    str
+        Resumen con la combinación más frecuente a nivel nacional
+    """
+    print("\n11. Estimando unicidad de las combinaciones nombre y apellido más frecuentes...")
+
+    combinaciones = estimar_matriz_unicidad(
+        apellidos_pais, apellidos_provincia_ranking, historico_nombres,
+        top_n=top_n, top_m=top_m, anio_desde=anio_desde, anio_hasta=anio_hasta,
+        top_k=top_k, poblaciones_provincia=poblacion_por_provincia(apellidos_provincia)
+    )
+
+    if len(combinaciones) == 0:
+        return "No hay datos suficientes para estimar la unicidad de las combinaciones"
+
+    combinaciones.to_csv("visualizaciones/unicidad_combinaciones.csv", index=False)
+    print("Tabla guardada en visualizaciones/unicidad_combinaciones.csv")
+
+    mas_frecuente = combinaciones[combinaciones['provincia_id'] == 0].iloc[0]
+    return f"La combinación más frecuente es {mas_frecuente['nombre'].title()} {mas_frecuente['apellido']}, "\
+           f"con aproximadamente {mas_frecuente['estimacion']:.0f} personas en Argentina."
+
 # --------------------------------------
 # 9. Generar mapa interactivo de distribución
 # --------------------------------------
 
+@registro.registrar('mapa_argentina', dependencias=('bokeh', 'geopandas'),
+                    descripcion="Mapa de Rodríguez por provincia",
+                    requiere=('unicidad', 'joaquin_historico', 'rodriguez_provincias'))
+@cache_graficos.grafico("visualizaciones/mapa_rodriguez_provincias.html",
+                        entradas=lambda: (rodriguez_provincias, joaquin_historico, estimacion_joaquin_rodriguez,
+                                          huella_archivo("shapefiles/gadm41_ARG_1.shp")))
 def generar_mapa_distribucion_argentina():
     """
     Genera un mapa de calor de Argentina con la distribución de Rodríguez, Joaquín y la combinación.
@@ -848,6 +1051,10 @@ def generar_mapa_distribucion_argentina():
     str
         Mensaje con la ruta de los archivos guardados
     """
+    import geopandas as gpd
+    from bokeh.models import ColorBar, GeoJSONDataSource, HoverTool, LinearColorMapper
+    from bokeh.palettes import RdYlGn
+    from bokeh.plotting import figure, output_file, save
     print("\nGenerando mapa de calor de distribución en Argentina...")
     
     # Usar los datasets globales ya cargados
@@ -860,12 +1067,13 @@ def generar_mapa_distribucion_argentina():
     # Preparar datos de Joaquín por provincia
     if 'provincia_nombre' in joaquin_historico.columns:
         # Si ya tenemos los datos por provincia, los agrupamos
-        joaquin_por_provincia = joaquin_historico.groupby('provincia_nombre')['cantidad'].sum().reset_index()
+        joaquin_por_provincia = joaquin_historico.groupby('provincia_id')['cantidad'].sum().reset_index()
         joaquin_por_provincia.rename(columns={'cantidad': 'cantidad_joaquin'}, inplace=True)
     else:
         # Si no tenemos datos por provincia, creamos un DataFrame vacío con la estructura correcta
         print("No se encontraron datos del nombre Joaquín por provincia.")
-        joaquin_por_provincia = pd.DataFrame(columns=['provincia_nombre', 'cantidad_joaquin'])
+        joaquin_por_provincia = pd.DataFrame({'provincia_id': pd.Series(dtype='int64'),
+                                              'cantidad_joaquin': pd.Series(dtype='int64')})
     
     try:
         # Cargar el archivo de shapefile de Argentina
@@ -875,43 +1083,17 @@ def generar_mapa_distribucion_argentina():
         print(f"Error al cargar el shapefile: {e}")
         return "Error al cargar el shapefile de Argentina."
     
-    # Renombrar columnas para facilitar la unión
-    if 'NAME_1' in argentina_map.columns:
-        argentina_map = argentina_map.rename(columns={'NAME_1': 'provincia_nombre'})
-    
-    # Normalizar nombres de provincias para unir correctamente los DataFrames
-    def normalizar_nombre(nombre):
-        if not isinstance(nombre, str):
-            return ""
-        
-        # Mapeo de nombres que podrían variar
-        mapeo = {
-            'Ciudad Autónoma de Buenos Aires': 'Ciudad de Buenos Aires',
-            'CABA': 'Ciudad de Buenos Aires',
-            'Tierra del Fuego': 'Tierra del Fuego, Antártida e Islas del Atlántico Sur',
-            'Santiago Del Estero': 'Santiago del Estero'
-        }
-        
-        if nombre in mapeo:
-            return mapeo[nombre]
-            
-        # Normalización general
-        return nombre.lower().strip().replace(' ', '_')
-    
-    # Aplicar normalización a todos los datasets
-    argentina_map['provincia_norm'] = argentina_map['provincia_nombre'].apply(normalizar_nombre)
-    rodriguez_provincias['provincia_norm'] = rodriguez_provincias['provincia_nombre'].apply(normalizar_nombre)
-    
-    if len(joaquin_por_provincia) > 0 and 'provincia_nombre' in joaquin_por_provincia.columns:
-        joaquin_por_provincia['provincia_norm'] = joaquin_por_provincia['provincia_nombre'].apply(normalizar_nombre)
+    # Clave entera de provincia (GID_1/NAME_1 -> provincia_id) y nombre de los datasets
+    argentina_map = agregar_provincia_id(argentina_map)
     
     # Unir datos de Rodríguez con el mapa
-    merged_rodriguez = argentina_map.merge(rodriguez_provincias, on='provincia_norm', how='left')
+    merged_rodriguez = argentina_map.merge(rodriguez_provincias.drop(columns='provincia_nombre'),
+                                           on='provincia_id', how='left')
     merged_rodriguez['cantidad'] = merged_rodriguez['cantidad'].fillna(0)
     
     # Unir datos de Joaquín con el mapa
-    if len(joaquin_por_provincia) > 0 and 'provincia_norm' in joaquin_por_provincia.columns:
-        merged_joaquin = argentina_map.merge(joaquin_por_provincia, on='provincia_norm', how='left')
+    if len(joaquin_por_provincia) > 0:
+        merged_joaquin = argentina_map.merge(joaquin_por_provincia, on='provincia_id', how='left')
         merged_joaquin['cantidad_joaquin'] = merged_joaquin['cantidad_joaquin'].fillna(0)
     else:
         # Si no hay datos de Joaquín por provincia, usar el mismo DataFrame de base
@@ -934,10 +1116,6 @@ def generar_mapa_distribucion_argentina():
         # Si no tenemos estimación global, hacemos una aproximación basada en los datos disponibles
         merged_combinacion['estimacion_joaquin_rodriguez'] = merged_rodriguez['cantidad'] * 0.01
     
-    # Asegúrate de que la columna 'provincia_nombre' esté en merged_rodriguez
-    if 'provincia_nombre' not in merged_rodriguez.columns:
-        merged_rodriguez['provincia_nombre'] = merged_rodriguez['provincia_norm']  # O la columna que corresponda
-
     # Convertir a GeoJSON para Bokeh
     geo_source_rodriguez = GeoJSONDataSource(geojson=merged_rodriguez.to_json())
     geo_source_joaquin = GeoJSONDataSource(geojson=merged_joaquin.to_json())
@@ -1015,13 +1193,29 @@ def generar_mapa_distribucion_argentina():
     return "Mapa generado correctamente basado en datos reales."
 
 
-# Llamadas a las funciones
-print(analizar_posicionamiento_nacional())
-print(crear_mapa_distribucion())
-print(comparar_provincias())
-print(analizar_cordoba())
-print(analizar_evolucion_historica())
-print(identificar_picos_popularidad())
-print(analizar_generaciones())
-print(estimar_unicidad_combinacion())
-print(generar_mapa_distribucion_argentina())
\ No newline at end of file
+# --------------------------------------
+# Ejecución
+# --------------------------------------
+
+# Los argumentos se leen antes de cargar los datos: --help y --listar responden al instante
+parser = registro.crear_parser("Análisis del apellido Rodríguez y del nombre Joaquín")
+args = parser.parse_args()
+if args.listar:
+    print(registro.listar())
+    sys.exit(0)
+seleccion = registro.seleccionar(args.solo, args.omitir)
+
+# Verificar y crear el directorio
+if not os.path.exists("visualizaciones"):
+    os.makedirs("visualizaciones")
+    print("Directorio 'visualizaciones' creado.")
+
+# Ejecutar los análisis seleccionados (cada uno calcula antes los datos que requiere)
+registro.ejecutar(seleccion)
+
+# Resumen del caché de gráficos
+print(cache_graficos.reporte())
+
+if registro.fallidos:
+    print(f"\nFallaron: {', '.join(registro.fallidos)}")
+    sys.exit(1)
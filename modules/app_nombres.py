@@ -0,0 +1,183 @@
+"""Aplicación interactiva de Bokeh para explorar nombres y apellidos.
+
+Uso (desde la raíz del repositorio):
+    bokeh serve --show modules/app_nombres.py
+
+Los datasets limpios y los índices se cargan una sola vez por proceso del
+servidor (servicio_compartido, en servicio_nombres.py) y todas las sesiones los
+comparten. Al cambiar el nombre o el apellido no se regenera ningún archivo:
+se consultan los agregados ya calculados, pasando por el caché LRU del
+servicio, y se reemplazan los datos de los ColumnDataSource de las figuras
+existentes, que Bokeh envía al navegador por el websocket de la sesión."""
+
+import json
+import os
+import time
+
+import pandas as pd
+from bokeh.io import curdoc
+from bokeh.layouts import column, row
+from bokeh.models import ColumnDataSource, Div, HoverTool, TextInput
+from bokeh.plotting import figure
+
+from decimacion import decimar_serie
+from generaciones import GENERACIONES
+from provincias import tabla_provincias
+from servicio_nombres import servicio_compartido
+
+# Las rutas de los datasets son relativas a la raíz del repositorio; se resuelven
+# contra RAIZ en lugar de cambiar el directorio de trabajo, que es global al proceso
+# y lo comparten todos los hilos del servidor de Bokeh
+RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+NOMBRE_INICIAL = 'Joaquín'
+APELLIDO_INICIAL = 'Rodríguez'
+CANTIDAD_SIMILARES = 8
+
+COLUMNAS_EVOLUCION = ['anio', 'cantidad', 'ranking', 'participacion']
+COLUMNAS_GENERACIONES = ['generacion', 'total', 'promedio_anual']
+COLUMNAS_APELLIDO = ['provincia_nombre', 'cantidad', 'porcentaje_provincia']
+
+
+servicio = servicio_compartido(raiz=RAIZ)
+
+
+def consultar(ruta: str, **parametros) -> dict:
+    """Consulta el servicio compartido (con su caché LRU) y devuelve la respuesta decodificada."""
+    return json.loads(servicio.consultar(ruta, {clave: str(valor) for clave, valor in parametros.items()}))
+
+
+def _columnas(datos: pd.DataFrame, columnas: list) -> dict:
+    return {columna: datos[columna].to_numpy() for columna in columnas}
+
+
+def _ajustar_titulo(p):
+    p.title.text_font_size = "16pt"
+    p.title.align = "center"
+    p.xaxis.axis_label_text_font_style = "bold"
+    p.yaxis.axis_label_text_font_style = "bold"
+
+
+# --------------------------------------
+# Figuras (se crean una vez; los callbacks solo cambian sus datos)
+# --------------------------------------
+
+fuente_evolucion = ColumnDataSource(data={columna: [] for columna in COLUMNAS_EVOLUCION})
+fuente_generaciones = ColumnDataSource(data={columna: [] for columna in COLUMNAS_GENERACIONES})
+fuente_apellido = ColumnDataSource(data={columna: [] for columna in COLUMNAS_APELLIDO})
+
+fig_evolucion = figure(width=900, height=400, x_axis_label="Año", y_axis_label="Cantidad de Nacimientos",
+                       toolbar_location="right")
+fig_evolucion.line('anio', 'cantidad', source=fuente_evolucion, line_width=2, line_color='#1F77B4')
+puntos_evolucion = fig_evolucion.scatter('anio', 'cantidad', source=fuente_evolucion, size=6,
+                                         color='#C70039', fill_alpha=0.4)
+fig_evolucion.add_tools(HoverTool(renderers=[puntos_evolucion], tooltips=[
+    ("Año", "@anio"),
+    ("Nacimientos", "@cantidad"),
+    ("Puesto", "@ranking"),
+    ("Participación", "@participacion{0.000}%")
+]))
+_ajustar_titulo(fig_evolucion)
+
+fig_generaciones = figure(x_range=list(GENERACIONES), width=600, height=400,
+                          x_axis_label="Generación", y_axis_label="Total de Nacimientos",
+                          toolbar_location="right")
+fig_generaciones.vbar(x='generacion', top='total', width=0.6, source=fuente_generaciones,
+                      fill_color='#1F77B4', line_color='white')
+fig_generaciones.add_tools(HoverTool(tooltips=[
+    ("Generación", "@generacion"),
+    ("Nacimientos", "@total{0,0}"),
+    ("Promedio anual", "@promedio_anual{0,0}")
+]))
+_ajustar_titulo(fig_generaciones)
+
+fig_apellido = figure(x_range=list(tabla_provincias()['provincia_nombre']), width=900, height=450,
+                      x_axis_label="Provincia", y_axis_label="Cantidad de personas",
+                      toolbar_location="right")
+fig_apellido.vbar(x='provincia_nombre', top='cantidad', width=0.8, source=fuente_apellido,
+                  fill_color='#C70039', line_color='white')
+fig_apellido.xaxis.major_label_orientation = 3.14 / 4
+fig_apellido.add_tools(HoverTool(tooltips=[
+    ("Provincia", "@provincia_nombre"),
+    ("Personas", "@cantidad{0,0}"),
+    ("% de la provincia", "@porcentaje_provincia{0.000}%")
+]))
+_ajustar_titulo(fig_apellido)
+
+entrada_nombre = TextInput(title="Nombre", value=NOMBRE_INICIAL)
+entrada_apellido = TextInput(title="Apellido", value=APELLIDO_INICIAL)
+estado = Div(text="")
+similares = Div(text="", width=300)
+unicidad = Div(text="", width=600)
+
+
+# --------------------------------------
+# Callbacks
+# --------------------------------------
+
+def actualizar_unicidad():
+    try:
+        estimacion = consultar('/unicidad', nombre=entrada_nombre.value, apellido=entrada_apellido.value)
+    except ValueError as e:
+        unicidad.text = f"<i>{e}</i>"
+        return
+    unicidad.text = (f"<b>{estimacion['nombre']} {estimacion['apellido']}</b>: "
+                     f"aproximadamente {estimacion['estimacion']:,.0f} personas en Argentina.")
+
+
+def actualizar_nombre(attr, anterior, nuevo):
+    inicio = time.perf_counter()
+    try:
+        evolucion = consultar('/evolucion', nombre=nuevo)
+        generaciones = consultar('/generaciones', nombre=nuevo)
+    except ValueError as e:
+        estado.text = f"<i>{e}</i>"
+        return
+
+    serie = pd.DataFrame(evolucion['serie'], columns=COLUMNAS_EVOLUCION)
+    fuente_evolucion.data = _columnas(decimar_serie(serie, 'anio', 'cantidad'), COLUMNAS_EVOLUCION)
+    fig_evolucion.title.text = f"Evolución Histórica del Nombre {evolucion['nombre']}"
+    fuente_generaciones.data = _columnas(pd.DataFrame(generaciones['generaciones'], columns=COLUMNAS_GENERACIONES),
+                                         COLUMNAS_GENERACIONES)
+    fig_generaciones.title.text = f"{evolucion['nombre']} por Generación"
+
+    try:
+        parecidos = consultar('/similares', nombre=nuevo, cantidad=CANTIDAD_SIMILARES)['similares']
+        similares.text = "<b>Trayectorias parecidas</b><br>" + "<br>".join(
+            f"{fila['nombre']} ({fila['correlacion']:.2f})" for fila in parecidos)
+    except ValueError as e:
+        similares.text = f"<i>{e}</i>"
+
+    actualizar_unicidad()
+    estado.text = f"Actualizado en {(time.perf_counter() - inicio) * 1000:.0f} ms"
+
+
+def actualizar_apellido(attr, anterior, nuevo):
+    inicio = time.perf_counter()
+    try:
+        distribucion = consultar('/apellido', apellido=nuevo)
+    except ValueError as e:
+        estado.text = f"<i>{e}</i>"
+        return
+
+    fuente_apellido.data = _columnas(pd.DataFrame(distribucion['provincias'], columns=COLUMNAS_APELLIDO),
+                                     COLUMNAS_APELLIDO)
+    fig_apellido.title.text = f"Distribución del Apellido {distribucion['apellido']} por Provincia"
+    actualizar_unicidad()
+    estado.text = f"Actualizado en {(time.perf_counter() - inicio) * 1000:.0f} ms"
+
+
+entrada_nombre.on_change('value', actualizar_nombre)
+entrada_apellido.on_change('value', actualizar_apellido)
+
+# Estado inicial
+actualizar_nombre('value', None, entrada_nombre.value)
+actualizar_apellido('value', None, entrada_apellido.value)
+
+curdoc().add_root(column(
+    row(entrada_nombre, entrada_apellido, estado),
+    row(fig_evolucion, similares),
+    row(fig_generaciones, unicidad),
+    fig_apellido
+))
+curdoc().title = "Nombres y apellidos de Argentina"
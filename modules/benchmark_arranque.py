@@ -0,0 +1,139 @@
+"""Mide el costo de arranque de los scripts de análisis.
+
+Cada medición se hace en un intérprete nuevo (subproceso), así que incluye la
+importación completa de los paquetes, y se repite para tomar la mediana:
+
+- Importaciones: el encabezado que tenían analisis_rodriguez.py y prueba.py
+  (pandas, todo bokeh, geopandas y export_png) frente al encabezado actual,
+  que deja bokeh y geopandas para cuando se ejecuta un análisis que los usa;
+  y, por separado, lo que agrega importar bokeh (análisis con gráficos) y
+  geopandas (el mapa).
+- Arranque: `--help` y `--listar` de los dos scripts, que ya no cargan datos
+  ni importan bokeh ni geopandas.
+
+La mejora solo se puede medir con bokeh y geopandas instalados: sin ellos el
+encabezado anterior no se puede importar, no hay referencia y el benchmark lo
+avisa en lugar de mostrar una comparación.
+
+Uso (desde la raíz del repositorio):
+    python modules/benchmark_arranque.py [--repeticiones 5]
+"""
+
+import argparse
+import ast
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+DIRECTORIO_MODULOS = os.path.dirname(os.path.abspath(__file__))
+
+# Encabezado de importaciones previo a la carga diferida
+IMPORTACIONES_ANTERIORES = """
+import pandas as pd
+from bokeh.plotting import figure, output_file, save
+from bokeh.models import (HoverTool, ColumnDataSource, Span, Label,
+                         LabelSet, ColorBar, LinearColorMapper,NumeralTickFormatter)
+from bokeh.layouts import column, row, gridplot
+from bokeh.transform import factor_cmap, transform, linear_cmap
+from bokeh.palettes import Viridis256, RdYlGn
+from bokeh.models import GeoJSONDataSource
+import geopandas as gpd
+from bokeh.io import export_png
+"""
+
+# Lo que se importa recién al ejecutar un análisis con gráficos o el mapa
+IMPORTACIONES_GRAFICOS = """
+from bokeh.models import ColumnDataSource, HoverTool, Label, LabelSet, NumeralTickFormatter, Span
+from bokeh.plotting import figure, output_file, save
+"""
+IMPORTACIONES_MAPA = """
+import geopandas as gpd
+from bokeh.models import ColorBar, GeoJSONDataSource, HoverTool, LinearColorMapper
+from bokeh.palettes import RdYlGn
+"""
+
+
+def importaciones_de(ruta: str) -> str:
+    """
+    Extrae las importaciones de nivel superior de un script (su encabezado actual).
+
+    Args:
+        ruta (str): Script de Python.
+
+    Returns:
+        str: Código con solo las sentencias import.
+    """
+    with open(ruta, encoding='utf-8') as f:
+        arbol = ast.parse(f.read())
+    return "\n".join(ast.unparse(nodo) for nodo in arbol.body if isinstance(nodo, (ast.Import, ast.ImportFrom)))
+
+
+def _entorno() -> dict:
+    entorno = dict(os.environ)
+    entorno['PYTHONPATH'] = os.pathsep.join(filter(None, [DIRECTORIO_MODULOS, entorno.get('PYTHONPATH')]))
+    return entorno
+
+
+def medir(argumentos: list, repeticiones: int) -> tuple:
+    """
+    Ejecuta un comando de Python en subprocesos nuevos y mide su duración.
+
+    Args:
+        argumentos (list): Argumentos para el intérprete (p. ej. ['-c', código]).
+        repeticiones (int): Cantidad de ejecuciones.
+
+    Returns:
+        tuple: (mediana en segundos, None) o (None, último renglón del error) si falla.
+    """
+    tiempos = []
+    for _ in range(repeticiones):
+        inicio = time.perf_counter()
+        proceso = subprocess.run([sys.executable, *argumentos], capture_output=True, text=True, env=_entorno())
+        tiempos.append(time.perf_counter() - inicio)
+        if proceso.returncode != 0:
+            error = (proceso.stderr.strip().splitlines() or ['error desconocido'])[-1]
+            return None, error
+    return statistics.median(tiempos), None
+
+
+def _fila(etiqueta: str, resultado: tuple, referencia: float = None) -> str:
+    segundos, error = resultado
+    if segundos is None:
+        return f"{etiqueta:<52} no disponible ({error})"
+    comparacion = f"  ({referencia / segundos:.1f}x más rápido)" if referencia and segundos < referencia else ''
+    return f"{etiqueta:<52} {segundos * 1000:8.0f} ms{comparacion}"
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark de importación y arranque de los análisis")
+    parser.add_argument('--repeticiones', type=int, default=5, help="Ejecuciones por medición (mediana)")
+    args = parser.parse_args()
+    n = args.repeticiones
+
+    print(f"Mediana de {n} ejecuciones en intérpretes nuevos\n")
+    base = medir(['-c', 'pass'], n)
+    actuales_codigo = importaciones_de(os.path.join(DIRECTORIO_MODULOS, 'analisis_rodriguez.py'))
+    anteriores = medir(['-c', IMPORTACIONES_ANTERIORES], n)
+    actuales = medir(['-c', actuales_codigo], n)
+    referencia = anteriores[0]
+
+    print("Importaciones")
+    print(_fila("  intérprete vacío", base))
+    print(_fila("  encabezado anterior (bokeh + geopandas)", anteriores))
+    print(_fila("  encabezado actual de analisis_rodriguez.py", actuales, referencia))
+    print(_fila("  actual + bokeh (análisis sin mapa)",
+                medir(['-c', actuales_codigo + IMPORTACIONES_GRAFICOS], n), referencia))
+    print(_fila("  actual + bokeh + geopandas (mapa)",
+                medir(['-c', actuales_codigo + IMPORTACIONES_GRAFICOS + IMPORTACIONES_MAPA], n), referencia))
+
+    if referencia is None:
+        print("\nSin bokeh y geopandas instalados no hay referencia: los tiempos de abajo son absolutos "
+              "y la mejora respecto del encabezado anterior no queda verificada en este entorno.")
+
+    print("\nArranque de los scripts (sin cargar datos)")
+    for script in ('analisis_rodriguez.py', 'prueba.py'):
+        ruta = os.path.join(DIRECTORIO_MODULOS, script)
+        for opcion in ('--help', '--listar'):
+            print(_fila(f"  {script} {opcion}", medir([ruta, opcion], n), referencia))
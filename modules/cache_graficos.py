@@ -0,0 +1,197 @@
+"""Caché de gráficos: no reconstruir los HTML cuyos datos y parámetros no cambiaron.
+
+Cada función de análisis que guarda un gráfico se decora con
+CacheGraficos.grafico, indicando el archivo que genera y una función que
+devuelve el recorte de datos que usa. Antes de ejecutarla se calcula una
+huella (SHA-256) de ese recorte, de los argumentos (con sus valores por
+defecto) y del código fuente de la función. Si el manifiesto registra la misma
+huella para el archivo y el archivo existe, no se construye la figura ni se
+llama a save(): se devuelve el resultado guardado de la ejecución anterior.
+
+El manifiesto es un JSON en visualizaciones/. Los cambios en módulos auxiliares
+que la función importa no alteran la huella: para forzar la reconstrucción de
+todo, borrar el manifiesto o definir CACHE_GRAFICOS=0."""
+
+import hashlib
+import inspect
+import json
+import os
+from functools import wraps
+
+import numpy as np
+import pandas as pd
+
+RUTA_MANIFIESTO = 'visualizaciones/manifiesto_graficos.json'
+VERSION_MANIFIESTO = 1
+
+
+def _actualizar(sha, valor) -> None:
+    if isinstance(valor, (pd.DataFrame, pd.Series)):
+        sha.update(repr((type(valor).__name__, valor.shape,
+                         list(valor.columns) if isinstance(valor, pd.DataFrame) else valor.name,
+                         [str(t) for t in (valor.dtypes if isinstance(valor, pd.DataFrame) else [valor.dtype])]
+                         )).encode('utf-8'))
+        try:
+            sha.update(pd.util.hash_pandas_object(valor, index=False).to_numpy().tobytes())
+        except TypeError:
+            # Celdas no hasheables (listas, diccionarios): se usa su representación
+            sha.update(valor.to_json(orient='split', index=False).encode('utf-8'))
+    elif isinstance(valor, np.ndarray):
+        sha.update(repr((valor.dtype.str, valor.shape)).encode('utf-8'))
+        sha.update(np.ascontiguousarray(valor).tobytes())
+    elif isinstance(valor, dict):
+        sha.update(b'{')
+        for clave in sorted(valor, key=repr):
+            _actualizar(sha, clave)
+            _actualizar(sha, valor[clave])
+        sha.update(b'}')
+    elif isinstance(valor, (list, tuple)):
+        sha.update(b'[')
+        for elemento in valor:
+            _actualizar(sha, elemento)
+        sha.update(b']')
+    else:
+        sha.update(repr(valor).encode('utf-8'))
+    sha.update(b'|')
+
+
+def huella(*partes) -> str:
+    """
+    Calcula una huella estable de datos y parámetros.
+
+    Args:
+        *partes: DataFrames, Series, arreglos, diccionarios, listas o valores simples.
+
+    Returns:
+        str: Hash SHA-256 en hexadecimal.
+    """
+    sha = hashlib.sha256()
+    for parte in partes:
+        _actualizar(sha, parte)
+    return sha.hexdigest()
+
+
+def huella_archivo(ruta: str) -> tuple:
+    """
+    Identifica la versión de un archivo de entrada por tamaño y fecha de modificación.
+
+    Returns:
+        tuple: (ruta, tamaño, mtime en ns), o (ruta, None, None) si no existe.
+    """
+    if not os.path.exists(ruta):
+        return ruta, None, None
+    estado = os.stat(ruta)
+    return ruta, estado.st_size, estado.st_mtime_ns
+
+
+def _mtime(ruta: str):
+    return os.stat(ruta).st_mtime_ns if os.path.exists(ruta) else None
+
+
+def _nativo(valor):
+    # Valores de numpy en el manifiesto JSON
+    return valor.item() if hasattr(valor, 'item') else str(valor)
+
+
+class CacheGraficos:
+    """
+    Registro de los gráficos generados y de la huella de sus entradas.
+
+    Args:
+        ruta_manifiesto (str): Archivo JSON del manifiesto.
+        activo (bool): Si es False se reconstruye todo (el manifiesto se actualiza igual);
+            por defecto depende de la variable de entorno CACHE_GRAFICOS.
+
+    Crear la instancia no toca el disco: el manifiesto se lee la primera vez que se
+    ejecuta un gráfico decorado, así los scripts pueden decorar sus funciones al
+    definirlas y responder --help o --listar sin leer ni crear archivos.
+    """
+
+    def __init__(self, ruta_manifiesto: str = RUTA_MANIFIESTO, activo: bool = None):
+        self.ruta_manifiesto = ruta_manifiesto
+        self.activo = os.environ.get('CACHE_GRAFICOS', '1') != '0' if activo is None else activo
+        self.reconstruidos = []
+        self.reutilizados = []
+        self._graficos = None
+
+    def _manifiesto(self) -> dict:
+        # Gráficos registrados, leídos del manifiesto en el primer uso
+        if self._graficos is None:
+            self._graficos = {}
+            if os.path.exists(self.ruta_manifiesto):
+                with open(self.ruta_manifiesto, encoding='utf-8') as f:
+                    manifiesto = json.load(f)
+                if manifiesto.get('version') == VERSION_MANIFIESTO:
+                    self._graficos = manifiesto['graficos']
+        return self._graficos
+
+    def _guardar(self) -> None:
+        directorio = os.path.dirname(self.ruta_manifiesto)
+        if directorio:
+            os.makedirs(directorio, exist_ok=True)
+        temporal = self.ruta_manifiesto + '.tmp'
+        with open(temporal, 'w', encoding='utf-8') as f:
+            json.dump({'version': VERSION_MANIFIESTO, 'graficos': self._manifiesto()}, f,
+                      ensure_ascii=False, indent=2, default=_nativo)
+        os.replace(temporal, self.ruta_manifiesto)
+
+    def grafico(self, salida: str, entradas=None, globales: tuple = ()):
+        """
+        Decorador para una función de análisis que guarda un gráfico en `salida`.
+
+        Args:
+            salida (str): Archivo que genera la función.
+            entradas (callable): Sin argumentos; devuelve una tupla con los datos que usa
+                la función (se evalúa en cada llamada, así que ve los datos vigentes).
+            globales (tuple): Nombres de variables globales que la función asigna; se
+                guardan en el manifiesto y se restauran cuando el gráfico se reutiliza.
+
+        Returns:
+            callable: Decorador.
+        """
+        def decorador(funcion):
+            firma = inspect.signature(funcion)
+            codigo = inspect.getsource(funcion)
+
+            @wraps(funcion)
+            def envoltura(*args, **kwargs):
+                argumentos = firma.bind(*args, **kwargs)
+                argumentos.apply_defaults()
+                clave = huella(codigo, dict(argumentos.arguments), tuple(entradas()) if entradas else ())
+
+                registro = self._manifiesto().get(salida)
+                if self.activo and registro and registro['huella'] == clave and os.path.exists(salida):
+                    funcion.__globals__.update(registro['globales'])
+                    self.reutilizados.append(salida)
+                    print(f"Sin cambios en los datos: se reutiliza {salida}")
+                    return registro['resultado']
+
+                antes = _mtime(salida)
+                resultado = funcion(*args, **kwargs)
+                # Solo se registra si la función escribió el archivo (no en los caminos sin datos)
+                if _mtime(salida) is not None and _mtime(salida) != antes:
+                    self._manifiesto()[salida] = {
+                        'huella': clave,
+                        'resultado': resultado,
+                        'globales': {nombre: funcion.__globals__[nombre] for nombre in globales}
+                    }
+                    self._guardar()
+                self.reconstruidos.append(salida)
+                return resultado
+
+            return envoltura
+
+        return decorador
+
+    def reporte(self) -> str:
+        """
+        Resume qué gráficos se reconstruyeron y cuáles se reutilizaron en esta ejecución.
+
+        Returns:
+            str: Reporte en texto.
+        """
+        lineas = [f"Gráficos reconstruidos: {len(self.reconstruidos)}"]
+        lineas += [f"  - {salida}" for salida in self.reconstruidos]
+        lineas.append(f"Gráficos reutilizados: {len(self.reutilizados)}")
+        lineas += [f"  - {salida}" for salida in self.reutilizados]
+        return "\n".join(lineas)
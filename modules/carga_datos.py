@@ -0,0 +1,373 @@
+"""Carga de los datasets limpios para los análisis.
+
+Cada dataset se lee desde la representación más eficiente disponible:
+el almacén binario mapeado (solo historico-nombres), las particiones
+comprimidas con índice (docs/particiones) o el CSV limpio completo. Con
+particiones, solo se abren las que pueden contener filas de la consulta.
+El almacén y las particiones se usan solo si no son más viejos que el CSV
+limpio: si se volvió a limpiar sin regenerarlos, se lee el CSV.
+
+Las rutas son relativas a la raíz del repositorio. Las funciones de carga
+aceptan `raiz` para resolverlas contra otro directorio sin cambiar el
+directorio de trabajo del proceso (p. ej. desde el servidor de Bokeh).
+
+Para consultas de un solo nombre sin caché, filtrar_nombre_csv recorre el CSV
+por bloques de bytes, descarta con una expresión regular binaria las líneas
+que no pueden contener el nombre y parsea solo las candidatas. cargar_nombre
+lo usa sobre historico-nombres y se puede llamar desde la línea de comandos:
+    python modules/carga_datos.py Joaquín [--desde 1990] [--hasta 2015]
+analisis_rodriguez.py y servicio_nombres.py no lo usan: sus puestos, tendencias
+y trayectorias se calculan sobre todos los nombres, así que cargan el histórico
+completo una vez y filtran cada nombre en memoria."""
+
+import gzip
+import json
+import os
+import re
+from io import BytesIO
+
+import pandas as pd
+
+from almacen_binario import abrir_almacen
+from indice_nombres import normalizar_clave
+from memoria import FACTOR_EXPANSION, filas_por_bloque, presupuesto_memoria
+from variantes import agrupar_variantes, agrupar_variantes_por_bloques
+
+DIRECTORIO_PARTICIONES = 'docs/particiones'
+DIRECTORIO_ALMACEN = 'docs/historico-nombres_bin'
+
+# Nombre lógico -> CSV limpio (mismas claves que ARCHIVOS en Reemplazo_caracteres.py)
+ARCHIVOS_LIMPIOS = {
+    'apellidos_provincia': 'docs/apellidos_cantidad_personas_provincia_clean.csv',
+    'apellidos_pais': 'docs/apellidos_mas_frecuentes_pais_clean.csv',
+    'apellidos_provincia_ranking': 'docs/apellidos_mas_frecuentes_provincia_clean.csv',
+    'historico-nombres': 'docs/historico-nombres_clean.csv'
+}
+
+
+def leer_indice(nombre_logico: str, directorio: str = DIRECTORIO_PARTICIONES) -> dict:
+    """
+    Lee el índice de particiones de un dataset.
+
+    Returns:
+        dict: Índice escrito por escribir_particiones, o None si no existe.
+    """
+    ruta = os.path.join(directorio, nombre_logico, 'indice.json')
+    if not os.path.exists(ruta):
+        return None
+    with open(ruta, encoding='utf-8') as f:
+        return json.load(f)
+
+
+def _filtrar(df: pd.DataFrame, anio_desde: int = None, anio_hasta: int = None,
+             provincias: list = None) -> pd.DataFrame:
+    if anio_desde is not None:
+        df = df[df['anio'] >= anio_desde]
+    if anio_hasta is not None:
+        df = df[df['anio'] <= anio_hasta]
+    if provincias is not None:
+        df = df[df['provincia_id'].isin(provincias)]
+    return df
+
+
+def leer_particiones(nombre_logico: str, anio_desde: int = None, anio_hasta: int = None,
+                     provincias: list = None, directorio: str = DIRECTORIO_PARTICIONES) -> pd.DataFrame:
+    """
+    Lee solo las particiones que pueden contener filas de la consulta.
+
+    Args:
+        nombre_logico (str): Clave del dataset (por ejemplo 'historico-nombres').
+        anio_desde (int): Primer año requerido (datasets particionados por 'anio').
+        anio_hasta (int): Último año requerido.
+        provincias (list): 'provincia_id' requeridos (datasets provinciales).
+        directorio (str): Directorio base de las particiones.
+
+    Returns:
+        pd.DataFrame: Filas de las particiones seleccionadas, filtradas exactamente.
+    """
+    indice = leer_indice(nombre_logico, directorio)
+    if indice is None:
+        raise FileNotFoundError(f"No hay particiones para {nombre_logico} en {directorio}")
+
+    columna = indice['columna']
+    seleccion = []
+    for particion in indice['particiones']:
+        if columna == 'anio':
+            if anio_desde is not None and particion['max'] < anio_desde:
+                continue
+            if anio_hasta is not None and particion['min'] > anio_hasta:
+                continue
+        elif columna == 'provincia_id' and provincias is not None:
+            if not any(particion['min'] <= p <= particion['max'] for p in provincias):
+                continue
+        seleccion.append(os.path.join(directorio, nombre_logico, particion['archivo']))
+
+    if not seleccion:
+        return pd.DataFrame(columns=indice['columnas'])
+    df = pd.concat([pd.read_csv(ruta, compression='gzip') for ruta in seleccion], ignore_index=True)
+    return _filtrar(df, anio_desde, anio_hasta, provincias)
+
+
+def _vigente(ruta: str, nombre_logico: str, raiz: str = '') -> bool:
+    # Una representación derivada vale si no es más vieja que el CSV limpio (si existe)
+    csv = os.path.join(raiz, ARCHIVOS_LIMPIOS[nombre_logico])
+    if not os.path.exists(csv) or os.path.getmtime(ruta) >= os.path.getmtime(csv):
+        return True
+    print(f"Aviso: {ruta} es anterior a {csv}; se usa el CSV limpio")
+    return False
+
+
+def _particiones_vigentes(nombre_logico: str, directorio: str, raiz: str = '') -> bool:
+    indice = os.path.join(raiz, directorio, nombre_logico, 'indice.json')
+    return os.path.exists(indice) and _vigente(indice, nombre_logico, raiz)
+
+
+def fuente_dataset(nombre_logico: str, directorio: str = DIRECTORIO_PARTICIONES, raiz: str = '') -> str:
+    """
+    Elige la representación de un dataset que se va a leer.
+
+    Args:
+        nombre_logico (str): Clave del dataset en ARCHIVOS_LIMPIOS.
+        directorio (str): Directorio base de las particiones.
+        raiz (str): Directorio contra el que se resuelven las rutas relativas.
+
+    Returns:
+        str: 'almacen', 'particiones' o 'csv'.
+    """
+    meta = os.path.join(raiz, DIRECTORIO_ALMACEN, 'meta.json')
+    if nombre_logico == 'historico-nombres' and os.path.exists(meta) and _vigente(meta, nombre_logico, raiz):
+        return 'almacen'
+    return 'particiones' if _particiones_vigentes(nombre_logico, directorio, raiz) else 'csv'
+
+
+def cargar_dataset(nombre_logico: str, anio_desde: int = None, anio_hasta: int = None,
+                   provincias: list = None, raiz: str = '') -> pd.DataFrame:
+    """
+    Carga un dataset limpio desde la fuente más eficiente disponible (ver fuente_dataset).
+
+    Args:
+        nombre_logico (str): Clave del dataset en ARCHIVOS_LIMPIOS.
+        anio_desde (int): Primer año requerido (solo historico-nombres).
+        anio_hasta (int): Último año requerido (solo historico-nombres).
+        provincias (list): 'provincia_id' requeridos (solo datasets provinciales).
+        raiz (str): Directorio contra el que se resuelven las rutas relativas.
+
+    Returns:
+        pd.DataFrame: Dataset (o la parte pedida).
+    """
+    fuente = fuente_dataset(nombre_logico, raiz=raiz)
+    if fuente == 'almacen':
+        # Almacén binario mapeado en memoria (ver almacen_binario.py): apertura inmediata
+        almacen = abrir_almacen(os.path.join(raiz, DIRECTORIO_ALMACEN))
+        return _filtrar(almacen.a_dataframe(), anio_desde, anio_hasta)
+    if fuente == 'particiones':
+        return leer_particiones(nombre_logico, anio_desde, anio_hasta, provincias,
+                                os.path.join(raiz, DIRECTORIO_PARTICIONES))
+    return _filtrar(pd.read_csv(os.path.join(raiz, ARCHIVOS_LIMPIOS[nombre_logico])),
+                    anio_desde, anio_hasta, provincias)
+
+
+# Relación aproximada entre el tamaño descomprimido y el comprimido de una partición
+COMPRESION_ESTIMADA = 4
+
+
+def _rutas_dataset(nombre_logico: str, directorio: str = DIRECTORIO_PARTICIONES, raiz: str = '') -> list:
+    if _particiones_vigentes(nombre_logico, directorio, raiz):
+        directorio = os.path.join(raiz, directorio)
+        indice = leer_indice(nombre_logico, directorio)
+        return [os.path.join(directorio, nombre_logico, p['archivo']) for p in indice['particiones']]
+    return [os.path.join(raiz, ARCHIVOS_LIMPIOS[nombre_logico])]
+
+
+def memoria_dataset(nombre_logico: str, raiz: str = '') -> int:
+    """
+    Memoria aproximada que ocupa un dataset completo cargado en pandas.
+
+    Returns:
+        int: Bytes estimados (0 si está en el almacén binario, que se abre con mmap).
+    """
+    if fuente_dataset(nombre_logico, raiz=raiz) == 'almacen':
+        return 0
+    total = 0
+    for ruta in _rutas_dataset(nombre_logico, raiz=raiz):
+        factor = COMPRESION_ESTIMADA if ruta.endswith('.gz') else 1
+        total += os.path.getsize(ruta) * factor * FACTOR_EXPANSION
+    return total
+
+
+def bloques_dataset(nombre_logico: str, presupuesto: int, raiz: str = ''):
+    """
+    Recorre un dataset limpio por bloques de filas, en el mismo orden que cargar_dataset.
+
+    Args:
+        nombre_logico (str): Clave del dataset en ARCHIVOS_LIMPIOS.
+        presupuesto (int): Presupuesto de memoria en bytes (define el tamaño de bloque).
+        raiz (str): Directorio contra el que se resuelven las rutas relativas.
+
+    Yields:
+        pd.DataFrame: Bloques consecutivos del dataset.
+    """
+    for ruta in _rutas_dataset(nombre_logico, raiz=raiz):
+        yield from pd.read_csv(ruta, chunksize=filas_por_bloque(ruta, presupuesto))
+
+
+def cargar_agrupado(nombre_logico: str, columna: str, por: list = None, ruta_mapeo: str = None,
+                    raiz: str = '') -> pd.DataFrame:
+    """
+    Carga un dataset con sus variantes ortográficas agrupadas (ver variantes.py).
+
+    Si hay presupuesto de memoria (PRESUPUESTO_MEMORIA_MB) y el dataset no entra,
+    se agrupa por bloques volcando parciales a disco, sin cargarlo completo. El
+    resultado es idéntico en los dos modos.
+
+    Args:
+        nombre_logico (str): Clave del dataset en ARCHIVOS_LIMPIOS.
+        columna (str): Columna de nombres o apellidos.
+        por (list): Otras columnas que se conservan en la agrupación.
+        ruta_mapeo (str): Si se indica, guarda allí el mapeo variante -> canónico.
+        raiz (str): Directorio contra el que se resuelven las rutas de los datasets.
+
+    Returns:
+        pd.DataFrame: Resultado de agrupar_variantes.
+    """
+    presupuesto = presupuesto_memoria()
+    if presupuesto is None or memoria_dataset(nombre_logico, raiz) <= presupuesto:
+        return agrupar_variantes(cargar_dataset(nombre_logico, raiz=raiz), columna, por, ruta_mapeo)
+    print(f"{nombre_logico} supera el presupuesto de memoria: agrupando por bloques")
+    return agrupar_variantes_por_bloques(lambda: bloques_dataset(nombre_logico, presupuesto, raiz),
+                                         columna, por, ruta_mapeo, presupuesto // 2)
+
+
+# Tamaño de los bloques leídos por el filtro en streaming
+TAMANO_BLOQUE = 8 * 1024 * 1024
+
+# Entre dos caracteres de la clave puede haber cualquier cosa que normalizar_clave
+# elimina: signos ('Maria-Jose'), apóstrofos, marcas combinantes o una coma dentro
+# de un valor entre comillas
+_SEPARADOR = rb"[^a-z0-9\n]*"
+
+
+def patron_prefiltro(clave: str) -> re.Pattern:
+    """
+    Expresión regular sobre bytes que acepta toda línea cuyo valor pueda
+    normalizarse a `clave`.
+
+    Se aplica sobre el bloque pasado a minúsculas con bytes.lower() (que solo
+    cambia letras ASCII y conserva las posiciones). Cada letra ASCII de la clave
+    acepta esa letra o una secuencia no ASCII (tildes, mojibake), los espacios
+    aceptan cualquier separador y entre dos caracteres se admiten los signos que
+    la normalización descarta. El patrón empieza con una clase de caracteres
+    simple para que la búsqueda salte rápido entre posiciones. Puede dar falsos
+    positivos, que se descartan luego con la clave exacta.
+
+    Args:
+        clave (str): Clave normalizada (ver normalizar_clave).
+
+    Returns:
+        re.Pattern: Patrón compilado sobre bytes en minúsculas.
+    """
+    partes = []
+    for char in clave:
+        if char == ' ':
+            partes.append(rb"[^a-z0-9\n]+")
+        elif char.isascii() and char.isalpha():
+            partes.append(rb"[" + re.escape(char.encode('ascii')) + rb"\x80-\xff][\x80-\xff]{0,3}")
+        elif char.isascii():
+            partes.append(re.escape(char.encode('ascii')))
+        else:
+            partes.append(rb"[\x80-\xff]{1,4}")
+    return re.compile(_SEPARADOR.join(partes))
+
+
+def _abrir_binario(ruta: str):
+    return gzip.open(ruta, 'rb') if ruta.endswith('.gz') else open(ruta, 'rb')
+
+
+def filtrar_nombre_csv(ruta: str, nombre: str, columna: str = 'nombre',
+                       tamano_bloque: int = TAMANO_BLOQUE) -> pd.DataFrame:
+    """
+    Devuelve las filas de un nombre leyendo el CSV en streaming.
+
+    El archivo se lee por bloques de bytes; en cada bloque (en minúsculas) se
+    buscan coincidencias del prefiltro binario y solo se conservan las líneas que
+    las contienen. Esas
+    líneas se parsean con pandas y se filtran por la clave normalizada exacta. La
+    memoria queda acotada por el tamaño del bloque más el del resultado.
+
+    Args:
+        ruta (str): CSV limpio (puede estar comprimido con gzip).
+        nombre (str): Nombre buscado, con o sin tildes.
+        columna (str): Columna del nombre.
+        tamano_bloque (int): Bytes leídos por bloque.
+
+    Returns:
+        pd.DataFrame: Filas cuyo valor en `columna` tiene la misma clave que `nombre`.
+    """
+    clave = normalizar_clave(nombre)
+    patron = patron_prefiltro(clave)
+    candidatas = []
+    with _abrir_binario(ruta) as f:
+        encabezado = f.readline()
+        resto = b''
+        while True:
+            bloque = f.read(tamano_bloque)
+            if not bloque:
+                datos, resto = resto, b''
+            else:
+                datos = resto + bloque
+                corte = datos.rfind(b'\n') + 1
+                datos, resto = datos[:corte], datos[corte:]
+            fin_anterior = 0
+            for m in patron.finditer(datos.lower()):
+                if m.start() < fin_anterior:
+                    continue  # Otra coincidencia dentro de una línea ya conservada
+                inicio = datos.rfind(b'\n', 0, m.start()) + 1
+                fin = datos.find(b'\n', m.end())
+                fin = len(datos) if fin < 0 else fin + 1
+                candidatas.append(datos[inicio:fin])
+                fin_anterior = fin
+            if not bloque:
+                break
+
+    if not candidatas:
+        return pd.read_csv(BytesIO(encabezado)).iloc[0:0]
+    contenido = encabezado + b''.join(linea if linea.endswith(b'\n') else linea + b'\n' for linea in candidatas)
+    df = pd.read_csv(BytesIO(contenido))
+    return df[df[columna].map(normalizar_clave) == clave].reset_index(drop=True)
+
+
+def cargar_nombre(nombre: str, anio_desde: int = None, anio_hasta: int = None, raiz: str = '') -> pd.DataFrame:
+    """
+    Filas de historico-nombres de un solo nombre (todas sus grafías), sin cargar
+    el dataset completo en memoria. Recorre las particiones si son la fuente
+    vigente (ver fuente_dataset) y si no el CSV limpio.
+
+    Args:
+        nombre (str): Nombre buscado.
+        anio_desde (int): Primer año requerido.
+        anio_hasta (int): Último año requerido.
+        raiz (str): Directorio contra el que se resuelven las rutas relativas.
+
+    Returns:
+        pd.DataFrame: Filas del nombre.
+    """
+    partes = [filtrar_nombre_csv(ruta, nombre) for ruta in _rutas_dataset('historico-nombres', raiz=raiz)]
+    return _filtrar(pd.concat(partes, ignore_index=True), anio_desde, anio_hasta)
+
+
+if __name__ == "__main__":
+    # Consulta en frío de un nombre: python modules/carga_datos.py Joaquín [--desde 1990]
+    import argparse
+    import time
+
+    parser = argparse.ArgumentParser(description="Filas de un nombre en historico-nombres sin cargar el dataset")
+    parser.add_argument('nombre')
+    parser.add_argument('--desde', type=int, help="Primer año")
+    parser.add_argument('--hasta', type=int, help="Último año")
+    args = parser.parse_args()
+
+    inicio = time.perf_counter()
+    filas = cargar_nombre(args.nombre, args.desde, args.hasta)
+    print(filas.sort_values('anio').to_string(index=False))
+    print(f"\n{len(filas)} filas ({', '.join(sorted(filas['nombre'].unique()))}) "
+          f"en {time.perf_counter() - inicio:.2f} s")
@@ -0,0 +1,109 @@
+"""Reducción de puntos antes de pasar los datos a los gráficos de Bokeh.
+
+Bokeh serializa cada fila del ColumnDataSource dentro del HTML, así que una
+serie larga o muchas categorías agrandan el archivo y hacen lento el dibujo en
+el navegador. Las dos funciones de este módulo no hacen nada por debajo del
+presupuesto y, por encima, acotan la cantidad de puntos:
+
+- decimar_serie: Largest-Triangle-Three-Buckets (LTTB). Divide la serie en
+  tantos tramos como puntos permitidos y en cada tramo conserva el punto que
+  forma el triángulo de mayor área con el punto elegido antes y el promedio
+  del tramo siguiente; mantiene picos, caídas y la forma de la curva.
+- agrupar_otros: barras categóricas; conserva las k de mayor valor (más las
+  que se pidan explícitamente) y suma el resto en una barra "Otros".
+
+Los presupuestos por defecto se pueden cambiar con las variables de entorno
+PRESUPUESTO_PUNTOS y PRESUPUESTO_CATEGORIAS."""
+
+import os
+
+import numpy as np
+import pandas as pd
+
+PRESUPUESTO_PUNTOS = int(os.environ.get('PRESUPUESTO_PUNTOS', 2000))
+PRESUPUESTO_CATEGORIAS = int(os.environ.get('PRESUPUESTO_CATEGORIAS', 30))
+
+ETIQUETA_OTROS = 'Otros'
+
+
+def lttb(x: np.ndarray, y: np.ndarray, puntos: int) -> np.ndarray:
+    """
+    Elige los índices a conservar con Largest-Triangle-Three-Buckets.
+
+    Args:
+        x (np.ndarray): Abscisas, crecientes.
+        y (np.ndarray): Ordenadas.
+        puntos (int): Cantidad de puntos a conservar (al menos 3).
+
+    Returns:
+        np.ndarray: Índices elegidos, crecientes; incluye el primero y el último.
+    """
+    n = len(x)
+    if puntos >= n or puntos < 3:
+        return np.arange(n)
+    x = np.asarray(x, dtype=np.float64)
+    y = np.asarray(y, dtype=np.float64)
+    # Tramos del interior (el primer y el último punto se conservan siempre)
+    limites = np.linspace(1, n - 1, puntos - 1).astype(np.int64)
+    elegidos = np.empty(puntos, dtype=np.int64)
+    elegidos[0], elegidos[-1] = 0, n - 1
+    anterior = 0
+    for i in range(puntos - 2):
+        desde, hasta = limites[i], limites[i + 1]
+        siguiente_desde, siguiente_hasta = hasta, (limites[i + 2] if i + 2 < len(limites) else n)
+        media_x = x[siguiente_desde:siguiente_hasta].mean()
+        media_y = y[siguiente_desde:siguiente_hasta].mean()
+        # Área (duplicada) del triángulo anterior - candidato - promedio del tramo siguiente
+        areas = np.abs((x[anterior] - media_x) * (y[desde:hasta] - y[anterior])
+                       - (x[anterior] - x[desde:hasta]) * (media_y - y[anterior]))
+        anterior = desde + int(areas.argmax())
+        elegidos[i + 1] = anterior
+    return elegidos
+
+
+def decimar_serie(df: pd.DataFrame, x: str, y: str, presupuesto: int = None) -> pd.DataFrame:
+    """
+    Reduce una serie a lo sumo a `presupuesto` filas conservando su forma.
+
+    Args:
+        df (pd.DataFrame): Serie ordenada por `x`.
+        x (str): Columna de abscisas (p. ej. 'anio').
+        y (str): Columna de ordenadas (p. ej. 'cantidad').
+        presupuesto (int): Puntos máximos; por defecto PRESUPUESTO_PUNTOS.
+
+    Returns:
+        pd.DataFrame: El mismo DataFrame si entra en el presupuesto; si no, las filas elegidas.
+    """
+    presupuesto = PRESUPUESTO_PUNTOS if presupuesto is None else presupuesto
+    if len(df) <= presupuesto:
+        return df
+    return df.iloc[lttb(df[x].to_numpy(), df[y].to_numpy(), presupuesto)]
+
+
+def agrupar_otros(df: pd.DataFrame, categoria: str, valores, presupuesto: int = None,
+                  conservar=(), etiqueta: str = ETIQUETA_OTROS) -> pd.DataFrame:
+    """
+    Limita un gráfico de barras a `presupuesto` barras sumando el resto en "Otros".
+
+    Args:
+        df (pd.DataFrame): Una fila por categoría.
+        categoria (str): Columna con el nombre de la categoría.
+        valores (str | list): Columna(s) numéricas; se suman en "Otros" y la primera ordena.
+        presupuesto (int): Barras máximas (incluida "Otros"); por defecto PRESUPUESTO_CATEGORIAS.
+        conservar (iterable): Categorías que se muestran aunque no estén entre las mayores.
+        etiqueta (str): Nombre de la barra que agrupa el resto.
+
+    Returns:
+        pd.DataFrame: El mismo DataFrame si entra en el presupuesto; si no, las filas
+        conservadas en su orden original y una fila final `etiqueta` (las demás columnas vacías).
+    """
+    presupuesto = PRESUPUESTO_CATEGORIAS if presupuesto is None else presupuesto
+    if len(df) <= presupuesto:
+        return df
+    valores = [valores] if isinstance(valores, str) else list(valores)
+    forzadas = df[categoria].isin(list(conservar))
+    libres = max(presupuesto - 1 - int(forzadas.sum()), 0)
+    mayores = df.loc[~forzadas, valores[0]].nlargest(libres).index
+    quedan = forzadas | df.index.isin(mayores)
+    otros = pd.DataFrame([{categoria: etiqueta, **{v: df.loc[~quedan, v].sum() for v in valores}}])
+    return pd.concat([df[quedan], otros], ignore_index=True)
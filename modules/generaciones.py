@@ -0,0 +1,151 @@
+"""Agregación generacional de nombres mediante un único binning sobre 'anio'.
+
+En lugar de construir una máscara booleana por generación, se asigna a cada fila
+el índice de su generación con una sola búsqueda binaria (np.searchsorted) y se
+agrupa una vez por nombre y generación. El resultado para todos los nombres se
+guarda en caché por esquema de generaciones, de modo que consultar otro nombre
+o repetir un esquema ya calculado no vuelve a recorrer el histórico."""
+
+import numpy as np
+import pandas as pd
+
+# Rangos generacionales por defecto (aproximados), inclusivos en ambos extremos
+GENERACIONES = {
+    '1928-1945': (1928, 1945),
+    '1946-1964': (1946, 1964),
+    '1965-1980': (1965, 1980),
+    '1981-1996': (1981, 1996),
+    '1997-2012': (1997, 2012),
+    '2013- Actualidad': (2013, 2030)
+}
+
+
+def generaciones_desde_cortes(cortes: list, etiquetas: list = None) -> dict:
+    """
+    Construye un esquema de generaciones a partir de los bordes de cada tramo.
+
+    Args:
+        cortes (list): Años de inicio de cada generación más un borde final
+            exclusivo, por ejemplo [1928, 1946, 1965, 2031].
+        etiquetas (list): Nombres de cada generación. Por defecto 'inicio-fin'.
+
+    Returns:
+        dict: Esquema {etiqueta: (inicio, fin)} con extremos inclusivos.
+    """
+    cortes = sorted(int(c) for c in cortes)
+    if len(cortes) < 2:
+        raise ValueError("Se necesitan al menos dos cortes para definir una generación")
+    tramos = [(inicio, fin - 1) for inicio, fin in zip(cortes[:-1], cortes[1:])]
+    if etiquetas is None:
+        etiquetas = [f"{inicio}-{fin}" for inicio, fin in tramos]
+    if len(etiquetas) != len(tramos):
+        raise ValueError("La cantidad de etiquetas no coincide con la cantidad de tramos")
+    return dict(zip(etiquetas, tramos))
+
+
+def _clave_esquema(generaciones: dict) -> tuple:
+    """Clave hashable e independiente del orden de inserción para un esquema."""
+    return tuple(sorted((int(inicio), int(fin), str(etiqueta))
+                        for etiqueta, (inicio, fin) in generaciones.items()))
+
+
+class AgregadorGeneraciones:
+    """
+    Agrega la cantidad de nacimientos por nombre y generación.
+
+    Args:
+        historico (pd.DataFrame): Datos con columnas 'nombre', 'anio' y 'cantidad'.
+        columna_clave (str): Columna por la que se agrupan los nombres. Si no
+            existe se deriva de 'nombre' pasado a minúsculas.
+    """
+
+    def __init__(self, historico: pd.DataFrame, columna_clave: str = 'nombre_clave'):
+        if columna_clave in historico.columns:
+            claves = historico[columna_clave]
+        else:
+            claves = historico['nombre'].str.lower()
+        # Codificar los nombres una sola vez; los esquemas trabajan sobre enteros
+        self._codigos, nombres = pd.factorize(claves)
+        self._nombres = pd.Index(nombres)
+        self._anios = historico['anio'].to_numpy()
+        self._cantidades = historico['cantidad'].to_numpy()
+        self._cache = {}
+
+    def tabla(self, generaciones: dict = None) -> pd.DataFrame:
+        """
+        Devuelve la tabla de todos los nombres por generación para un esquema.
+
+        Args:
+            generaciones (dict): Esquema {etiqueta: (inicio, fin)}. Los tramos
+                no deben solaparse; los años fuera de todo tramo se descartan.
+
+        Returns:
+            pd.DataFrame: Columnas 'nombre', 'generacion', 'inicio', 'fin',
+            'total' y 'promedio_anual', ordenada por nombre e inicio.
+        """
+        generaciones = GENERACIONES if generaciones is None else generaciones
+        return self._resultado(generaciones)[0]
+
+    def _resultado(self, generaciones: dict) -> tuple:
+        clave = _clave_esquema(generaciones)
+        if clave not in self._cache:
+            self._cache[clave] = self._agregar(clave)
+        return self._cache[clave]
+
+    def _agregar(self, clave: tuple) -> tuple:
+        inicios = np.array([inicio for inicio, _, _ in clave])
+        fines = np.array([fin for _, fin, _ in clave])
+        etiquetas = [etiqueta for _, _, etiqueta in clave]
+        if np.any(inicios[1:] <= fines[:-1]):
+            raise ValueError("Los rangos generacionales no deben solaparse")
+
+        # Un único binning: índice de la última generación que empieza antes del año
+        indice = np.searchsorted(inicios, self._anios, side='right') - 1
+        validos = (indice >= 0) & (self._codigos >= 0)
+        validos[validos] = self._anios[validos] <= fines[indice[validos]]
+
+        agrupado = (
+            pd.DataFrame({
+                'codigo': self._codigos[validos],
+                'gen': indice[validos],
+                'total': self._cantidades[validos]
+            })
+            .groupby(['codigo', 'gen'], sort=True)['total']
+            .sum()
+            .reset_index()
+        )
+
+        codigos = agrupado['codigo'].to_numpy()
+        gen = agrupado['gen'].to_numpy()
+        resultado = pd.DataFrame({
+            'nombre': self._nombres.to_numpy()[codigos],
+            'generacion': np.array(etiquetas, dtype=object)[gen],
+            'inicio': inicios[gen],
+            'fin': fines[gen],
+            'total': agrupado['total'].to_numpy()
+        })
+        resultado['promedio_anual'] = resultado['total'] / (resultado['fin'] - resultado['inicio'] + 1)
+        # Las filas quedan ordenadas por código: cada nombre es un tramo contiguo
+        return resultado, codigos
+
+    def por_nombre(self, nombre: str, generaciones: dict = None) -> pd.DataFrame:
+        """
+        Devuelve la agregación generacional de un único nombre.
+
+        Args:
+            nombre (str): Clave del nombre buscado (en el formato de la columna clave).
+            generaciones (dict): Esquema de generaciones; por defecto GENERACIONES.
+
+        Returns:
+            pd.DataFrame: Filas de la tabla del esquema correspondientes al nombre,
+            con la columna 'periodo' en formato 'inicio-fin'.
+        """
+        generaciones = GENERACIONES if generaciones is None else generaciones
+        tabla, codigos = self._resultado(generaciones)
+        if nombre not in self._nombres:
+            return tabla.iloc[0:0].drop(columns='nombre').assign(periodo=pd.Series(dtype=object))
+        codigo = self._nombres.get_loc(nombre)
+        desde, hasta = np.searchsorted(codigos, [codigo, codigo + 1])
+        datos = tabla.iloc[desde:hasta].drop(columns='nombre').reset_index(drop=True)
+        datos['periodo'] = datos['inicio'].astype(str) + '-' + datos['fin'].astype(str)
+        return datos
@@ -0,0 +1,320 @@
+"""Índice de búsqueda difusa sobre los vocabularios de nombres y apellidos.
+
+Las consultas se normalizan (mojibake, tildes, mayúsculas, signos) y se buscan
+primero por coincidencia exacta de la clave normalizada; si no hay, se eligen
+pocos candidatos y se ordenan por distancia de edición. Los candidatos salen
+de filtros que no pierden coincidencias dentro de la distancia pedida:
+
+- Consultas largas: una clave a distancia <= d comparte al menos T - 3d de
+  los T trigramas de la consulta (cada edición toca a lo sumo 3), así que se
+  cuentan los trigramas compartidos con un bincount sobre las listas.
+- Consultas cortas (T <= 3d, el conteo no descarta nada): borrados
+  simétricos. Si dos claves están a distancia <= d, borrando a lo sumo d
+  caracteres de cada una se llega a una cadena común; se indexan los borrados
+  de las claves cortas y se buscan los de la consulta. Ese índice se arma la
+  primera vez que se lo necesita.
+
+Los candidatos se verifican todos juntos con distancias_lote, una distancia
+de edición vectorizada sobre las claves codificadas como matriz de enteros.
+
+El índice se construye una sola vez sobre los valores distintos de la columna."""
+
+import re
+import unicodedata
+from collections import defaultdict
+
+import numpy as np
+import pandas as pd
+
+
+def _tabla_mojibake() -> dict:
+    """
+    Caracteres que aparecen cuando texto en cp850 se leyó como latin1.
+
+    Solo se reparan los bytes 0x80-0xBF cuyo carácter latin1 no es una letra
+    (por ejemplo '¤', '¢', '\\xa0') y cuya lectura cp850 sí lo es ('ñ', 'ó', 'á').
+    """
+    tabla = {}
+    for byte in range(0x80, 0xC0):
+        latin1 = bytes([byte]).decode('latin1')
+        cp850 = bytes([byte]).decode('cp850')
+        if (not latin1.isalpha() or latin1 == 'µ') and cp850.isalpha():
+            tabla[latin1] = cp850
+    return tabla
+
+
+REPARACIONES_MOJIBAKE = str.maketrans(_tabla_mojibake())
+
+# Apóstrofos y acentos sueltos (D´Angelo, D'Angelo) se eliminan antes de quitar tildes
+_PATRON_APOSTROFOS = re.compile(r"[´'`’]")
+# Todo lo que no sea letra, dígito o espacio se descarta de la clave
+_PATRON_SIGNOS = re.compile(r"[^\w ]+")
+_PATRON_ESPACIOS = re.compile(r"\s+")
+
+
+def normalizar_clave(texto: str) -> str:
+    """
+    Convierte un nombre o apellido en su clave canónica de comparación.
+
+    Repara mojibake (doble codificación UTF-8 y cp850 leído como latin1), pasa a
+    minúsculas, elimina tildes y diéresis conservando la 'ñ', y descarta signos.
+
+    Args:
+        texto (str): Valor a normalizar.
+
+    Returns:
+        str: Clave normalizada, o cadena vacía si el valor no es texto.
+    """
+    if not isinstance(texto, str):
+        return ""
+    if 'Ã' in texto or 'Â' in texto:
+        try:
+            texto = texto.encode('latin1').decode('utf-8')
+        except (UnicodeEncodeError, UnicodeDecodeError):
+            pass
+    texto = _PATRON_APOSTROFOS.sub('', texto.translate(REPARACIONES_MOJIBAKE)).lower().replace('ñ', '\0')
+    texto = ''.join(c for c in unicodedata.normalize('NFKD', texto) if not unicodedata.combining(c))
+    texto = _PATRON_SIGNOS.sub('', texto.replace('\0', 'ñ')).replace('_', '')
+    return _PATRON_ESPACIOS.sub(' ', texto).strip()
+
+
+# Borrados simétricos: distancia máxima cubierta y largo máximo de las claves indexadas
+# (alcanza para toda consulta con T <= 3 * DISTANCIA_BORRADOS trigramas, es decir de
+# hasta 4 caracteres, más DISTANCIA_BORRADOS inserciones)
+DISTANCIA_BORRADOS = 2
+LARGO_BORRADOS = 6
+
+
+def _borrados(clave: str, distancia: int) -> set:
+    # La clave y todas las cadenas que se obtienen borrando hasta `distancia` caracteres
+    nivel, todos = {clave}, {clave}
+    for _ in range(distancia):
+        nivel = {c[:i] + c[i + 1:] for c in nivel for i in range(len(c))}
+        todos |= nivel
+    return todos
+
+
+def _trigramas(clave: str) -> set:
+    relleno = f"  {clave} "
+    return {relleno[i:i + 3] for i in range(len(relleno) - 2)}
+
+
+def distancia_edicion(a: str, b: str, maximo: int = None) -> int:
+    """
+    Distancia de Levenshtein entre dos cadenas, con corte opcional.
+
+    Args:
+        a (str): Primera cadena.
+        b (str): Segunda cadena.
+        maximo (int): Si la distancia supera este valor se devuelve maximo + 1.
+
+    Returns:
+        int: Cantidad mínima de inserciones, borrados y sustituciones.
+    """
+    if len(a) < len(b):
+        a, b = b, a
+    if maximo is not None and len(a) - len(b) > maximo:
+        return maximo + 1
+    anterior = list(range(len(b) + 1))
+    for i, ca in enumerate(a, 1):
+        actual = [i]
+        izquierda = i
+        for j, cb in enumerate(b, 1):
+            valor = anterior[j - 1] + (ca != cb)
+            if anterior[j] + 1 < valor:
+                valor = anterior[j] + 1
+            if izquierda + 1 < valor:
+                valor = izquierda + 1
+            actual.append(valor)
+            izquierda = valor
+        if maximo is not None and min(actual) > maximo:
+            return maximo + 1
+        anterior = actual
+    return anterior[-1]
+
+
+def distancias_lote(consulta: str, claves: np.ndarray, longitudes: np.ndarray) -> np.ndarray:
+    """
+    Distancia de Levenshtein de una consulta a muchas claves a la vez.
+
+    Recorre la consulta carácter por carácter; cada fila de la programación dinámica
+    se calcula para todas las claves con operaciones de numpy. La cadena de
+    inserciones de una fila, cur[j] = min(tmp[j], cur[j - 1] + 1), se resuelve sin
+    bucle como j + mínimo acumulado de (tmp[k] - k).
+
+    Args:
+        consulta (str): Cadena de referencia.
+        claves (np.ndarray): Claves codificadas (una por fila, ord de cada carácter,
+            rellenas con 0 a la derecha).
+        longitudes (np.ndarray): Largo real de cada clave.
+
+    Returns:
+        np.ndarray: Distancia de la consulta a cada clave.
+    """
+    if not len(claves):
+        return np.zeros(0, dtype=np.int64)
+    columnas = int(longitudes.max())
+    claves = claves[:, :columnas]
+    posiciones = np.arange(columnas + 1)
+    fila = np.broadcast_to(posiciones, (len(claves), columnas + 1))
+    for i, caracter in enumerate(consulta, 1):
+        tmp = np.empty_like(fila)
+        tmp[:, 0] = i
+        np.minimum(fila[:, :-1] + (claves != ord(caracter)), fila[:, 1:] + 1, out=tmp[:, 1:])
+        fila = np.minimum.accumulate(tmp - posiciones, axis=1) + posiciones
+    return fila[np.arange(len(claves)), longitudes]
+
+
+class IndiceDifuso:
+    """
+    Índice de búsqueda aproximada sobre un vocabulario de nombres o apellidos.
+
+    Args:
+        valores (pd.Series): Valores de la columna (se usan los distintos).
+        pesos (pd.Series): Frecuencia de cada fila (por ejemplo 'cantidad'); se usa
+            para elegir la grafía canónica de cada clave y desempatar resultados.
+    """
+
+    def __init__(self, valores: pd.Series, pesos: pd.Series = None):
+        if pesos is None:
+            pesos = pd.Series(1, index=valores.index)
+        frecuencias = pesos.groupby(valores).sum()
+
+        claves = frecuencias.index.map(normalizar_clave)
+        tabla = pd.DataFrame({'valor': frecuencias.index, 'clave': claves,
+                              'peso': frecuencias.to_numpy()})
+        tabla = tabla[tabla['clave'] != '']
+
+        # Grafía canónica: la variante más frecuente de cada clave
+        tabla = tabla.sort_values(['clave', 'peso'], ascending=[True, False], kind='stable')
+        claves, inicios = np.unique(tabla['clave'].to_numpy(dtype=object), return_index=True)
+        valores = tabla['valor'].to_numpy(dtype=object)
+        self._claves = list(claves)
+        self._canonicos = valores[inicios]
+        self._pesos = np.add.reduceat(tabla['peso'].to_numpy(), inicios) if len(inicios) else np.array([])
+        self._longitudes = np.array([len(clave) for clave in self._claves], dtype=np.int32)
+        self._variantes = dict(zip(self._claves, np.split(valores, inicios[1:])))
+        self._id_por_clave = {clave: i for i, clave in enumerate(self._claves)}
+
+        listas = defaultdict(list)
+        for i, clave in enumerate(self._claves):
+            for trigrama in _trigramas(clave):
+                listas[trigrama].append(i)
+        self._postings = {t: np.array(ids, dtype=np.int32) for t, ids in listas.items()}
+        self._indice_borrados = None
+        self._matriz_claves = None
+
+    def _candidatos_borrados(self, clave: str, max_distancia: int) -> np.ndarray:
+        # Claves cortas que comparten algún borrado con la consulta (se construye en el primer uso)
+        if self._indice_borrados is None:
+            listas = defaultdict(list)
+            for i in np.flatnonzero(self._longitudes <= LARGO_BORRADOS):
+                for borrado in _borrados(self._claves[i], DISTANCIA_BORRADOS):
+                    listas[borrado].append(i)
+            self._indice_borrados = dict(listas)
+        ids = {i for borrado in _borrados(clave, max_distancia) for i in self._indice_borrados.get(borrado, ())}
+        return np.fromiter(ids, dtype=np.int64, count=len(ids))
+
+    def _codificadas(self, ids: np.ndarray) -> np.ndarray:
+        # Claves como matriz de códigos (se construye en el primer uso)
+        if self._matriz_claves is None:
+            largo = int(self._longitudes.max()) if len(self._claves) else 0
+            self._matriz_claves = np.zeros((len(self._claves), largo), dtype=np.uint32)
+            for i, clave in enumerate(self._claves):
+                self._matriz_claves[i, :len(clave)] = [ord(c) for c in clave]
+        return self._matriz_claves[ids]
+
+    def __len__(self) -> int:
+        return len(self._claves)
+
+    def buscar(self, consulta: str, limite: int = 5, max_distancia: int = 2,
+               max_candidatos: int = None) -> list:
+        """
+        Devuelve las mejores coincidencias canónicas para una consulta.
+
+        Args:
+            consulta (str): Texto ingresado, con o sin tildes, errores o mojibake.
+            limite (int): Cantidad máxima de resultados.
+            max_distancia (int): Distancia de edición máxima aceptada.
+            max_candidatos (int): Si se indica, solo se evalúan con distancia los candidatos
+                que más trigramas comparten; es más rápido pero puede perder coincidencias
+                dentro de max_distancia. Por defecto se evalúan todos los que pasan los
+                filtros (que no pierden coincidencias).
+
+        Returns:
+            list: Tuplas (valor_canonico, distancia) ordenadas por distancia y frecuencia.
+        """
+        clave = normalizar_clave(consulta)
+        if not clave:
+            return []
+
+        exacto = self._id_por_clave.get(clave)
+        if exacto is not None and limite == 1:
+            return [(self._canonicos[exacto], 0)]
+
+        # Una clave a distancia <= d comparte al menos T - 3d de los T trigramas de la consulta
+        trigramas_consulta = _trigramas(clave)
+        minimo = len(trigramas_consulta) - 3 * max_distancia
+        if minimo > 0:
+            listas = [self._postings[t] for t in trigramas_consulta if t in self._postings]
+            if len(listas) < minimo:
+                return [(self._canonicos[exacto], 0)] if exacto is not None else []
+            compartidos = np.bincount(np.concatenate(listas), minlength=len(self._claves))
+            ids = np.flatnonzero(compartidos >= minimo)
+            conteos = compartidos[ids]
+        elif max_distancia <= DISTANCIA_BORRADOS and len(clave) + max_distancia <= LARGO_BORRADOS:
+            # Consulta corta: una clave cercana puede no compartir ningún trigrama
+            ids = self._candidatos_borrados(clave, max_distancia)
+            conteos = np.zeros(len(ids), dtype=np.int64)
+        else:
+            # Consulta con muchos trigramas repetidos o distancia grande: se evalúan
+            # todas las claves de longitud compatible
+            ids = np.flatnonzero(np.abs(self._longitudes - len(clave)) <= max_distancia)
+            conteos = np.zeros(len(ids), dtype=np.int64)
+        diferencia = np.abs(self._longitudes[ids] - len(clave))
+        cercanos = diferencia <= max_distancia
+        ids, conteos, diferencia = ids[cercanos], conteos[cercanos], diferencia[cercanos]
+        if max_candidatos is not None and len(ids) > max_candidatos:
+            # Más trigramas compartidos primero; a igualdad, longitud más parecida
+            puntaje = conteos * (max_distancia + 1) - diferencia
+            ids = ids[np.argpartition(-puntaje, max_candidatos - 1)[:max_candidatos]]
+
+        if exacto is not None and not np.any(ids == exacto):
+            ids = np.append(ids, exacto)
+        distancias = distancias_lote(clave, self._codificadas(ids), self._longitudes[ids])
+        aceptados = distancias <= max_distancia
+        ids, distancias = ids[aceptados], distancias[aceptados]
+        # Menor distancia primero; a igualdad, mayor frecuencia y después orden de clave
+        orden = np.lexsort((ids, -self._pesos[ids], distancias))[:limite]
+        return [(self._canonicos[i], int(d)) for i, d in zip(ids[orden], distancias[orden])]
+
+    def variantes(self, canonico: str) -> list:
+        """
+        Devuelve todas las grafías originales que comparten clave con un valor.
+
+        Args:
+            canonico (str): Valor devuelto por buscar() o cualquier grafía del vocabulario.
+
+        Returns:
+            list: Valores tal como aparecen en los datos.
+        """
+        return list(self._variantes.get(normalizar_clave(canonico), ()))
+
+
+def filtrar_por_valor(df: pd.DataFrame, columna: str, consulta: str, indice: IndiceDifuso) -> pd.DataFrame:
+    """
+    Filtra las filas cuyo valor corresponde a la mejor coincidencia de la consulta.
+
+    Args:
+        df (pd.DataFrame): Datos a filtrar.
+        columna (str): Columna sobre la que se construyó el índice.
+        consulta (str): Nombre o apellido buscado.
+        indice (IndiceDifuso): Índice construido sobre la columna.
+
+    Returns:
+        pd.DataFrame: Filas de todas las grafías de la mejor coincidencia.
+    """
+    coincidencias = indice.buscar(consulta, limite=1)
+    if not coincidencias:
+        return df.iloc[0:0]
+    return df[df[columna].isin(indice.variantes(coincidencias[0][0]))]
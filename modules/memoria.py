@@ -0,0 +1,174 @@
+"""Presupuesto de memoria y agregación por bloques con volcado a disco.
+
+El presupuesto se fija con la variable de entorno PRESUPUESTO_MEMORIA_MB (la
+misma que usa data_cleaning/Reemplazo_caracteres.py). Sin ella todo se procesa
+en memoria como siempre. Con ella, los cargadores comparan el tamaño estimado
+de cada dataset contra el presupuesto y, si no entra, lo recorren por bloques:
+los agregados parciales se acumulan en AcumuladorParcial, que los vuelca a
+archivos temporales repartidos por hash de la clave cuando superan el
+presupuesto y los combina partición por partición al final."""
+
+import gzip
+import os
+import shutil
+import tempfile
+
+import numpy as np
+import pandas as pd
+
+VARIABLE_PRESUPUESTO = 'PRESUPUESTO_MEMORIA_MB'
+
+# Un CSV ocupa en pandas varias veces su tamaño en disco (cadenas como objetos)
+FACTOR_EXPANSION = 5
+
+# Bytes que se leen para estimar el largo medio de una línea
+MUESTRA_BYTES = 1024 * 1024
+
+
+def presupuesto_memoria() -> int:
+    """
+    Lee el presupuesto de memoria configurado.
+
+    Returns:
+        int: Presupuesto en bytes, o None si no está configurado.
+    """
+    valor = os.environ.get(VARIABLE_PRESUPUESTO)
+    if not valor:
+        return None
+    try:
+        return int(float(valor) * 1024 * 1024)
+    except ValueError:
+        raise ValueError(f"{VARIABLE_PRESUPUESTO} debe ser un número de MB, no {valor!r}") from None
+
+
+def filas_por_bloque(ruta: str, presupuesto: int) -> int:
+    """
+    Cantidad de filas por bloque para que cada bloque ocupe una fracción del presupuesto.
+
+    Args:
+        ruta (str): CSV a recorrer (puede estar comprimido con gzip).
+        presupuesto (int): Presupuesto en bytes.
+
+    Returns:
+        int: Filas por bloque (al menos 1000).
+    """
+    with (gzip.open(ruta, 'rb') if ruta.endswith('.gz') else open(ruta, 'rb')) as f:
+        muestra = f.read(MUESTRA_BYTES)
+    largo_linea = len(muestra) / max(muestra.count(b'\n'), 1)
+    # Un cuarto del presupuesto por bloque: el resto queda para los agregados parciales
+    return max(1000, int(presupuesto / 4 / (largo_linea * FACTOR_EXPANSION)))
+
+
+def filas_si_no_entra(ruta: str, presupuesto: int) -> int:
+    """
+    Filas por bloque para un archivo que se procesaría completo en memoria.
+
+    Args:
+        ruta (str): CSV sin comprimir.
+        presupuesto (int): Presupuesto en bytes, o None.
+
+    Returns:
+        int: Filas por bloque (ver filas_por_bloque), o None si no hay presupuesto
+        o el archivo completo entra en él.
+    """
+    if presupuesto is None or os.path.getsize(ruta) * FACTOR_EXPANSION <= presupuesto:
+        return None
+    return filas_por_bloque(ruta, presupuesto)
+
+
+class AcumuladorParcial:
+    """
+    Agregación agrupada sobre bloques, con volcado a disco al superar el presupuesto.
+
+    Las agregaciones tienen que poder recombinarse sobre resultados parciales
+    ('sum', 'min', 'max'). El resultado es el mismo que agrupar todos los bloques
+    concatenados, salvo el orden de las filas.
+
+    Args:
+        claves (list): Columnas de agrupación.
+        agregaciones (dict): {columna: función} para DataFrame.agg.
+        presupuesto (int): Bytes de parciales en memoria antes de volcarlos; None = nunca.
+        particiones (int): Archivos por volcado (reparto por hash de la clave).
+    """
+
+    def __init__(self, claves: list, agregaciones: dict, presupuesto: int = None, particiones: int = 16):
+        self.claves = list(claves)
+        self.agregaciones = dict(agregaciones)
+        self.presupuesto = presupuesto
+        self.particiones = particiones
+        self._parciales = []
+        self._bytes = 0
+        self._directorio = None
+        self._volcados = 0
+
+    def _combinar(self, partes: list) -> pd.DataFrame:
+        datos = pd.concat(partes, ignore_index=True) if len(partes) > 1 else partes[0]
+        return (datos.groupby(self.claves, sort=False, observed=True)
+                .agg(self.agregaciones)
+                .reset_index())
+
+    def agregar(self, bloque: pd.DataFrame) -> None:
+        """Agrega un bloque de filas."""
+        parcial = self._combinar([bloque[self.claves + list(self.agregaciones)]])
+        self._parciales.append(parcial)
+        self._bytes += int(parcial.memory_usage(deep=True).sum())
+        if self.presupuesto is not None and self._bytes > self.presupuesto:
+            self._volcar()
+
+    def _volcar(self) -> None:
+        if not self._parciales:
+            return
+        if self._directorio is None:
+            self._directorio = tempfile.mkdtemp(prefix='agregados_')
+        datos = self._combinar(self._parciales)
+        destinos = pd.util.hash_pandas_object(datos[self.claves], index=False).to_numpy() % self.particiones
+        for particion in range(self.particiones):
+            parte = datos[destinos == particion]
+            if len(parte):
+                parte.to_pickle(os.path.join(self._directorio, f"{particion}_{self._volcados}.pkl"))
+        self._volcados += 1
+        self._parciales = []
+        self._bytes = 0
+
+    def resultado(self) -> pd.DataFrame:
+        """
+        Combina todos los parciales (en memoria y volcados) y borra los temporales.
+
+        Returns:
+            pd.DataFrame: Claves y columnas agregadas.
+        """
+        if self._directorio is None:
+            if not self._parciales:
+                return pd.DataFrame(columns=self.claves + list(self.agregaciones))
+            return self._combinar(self._parciales)
+        try:
+            self._volcar()
+            resultados = []
+            # Cada clave cae siempre en la misma partición: se combinan de a una
+            for particion in range(self.particiones):
+                partes = [pd.read_pickle(os.path.join(self._directorio, f"{particion}_{i}.pkl"))
+                          for i in range(self._volcados)
+                          if os.path.exists(os.path.join(self._directorio, f"{particion}_{i}.pkl"))]
+                if partes:
+                    resultados.append(self._combinar(partes))
+            return pd.concat(resultados, ignore_index=True)
+        finally:
+            shutil.rmtree(self._directorio, ignore_errors=True)
+            self._directorio = None
+            self._volcados = 0
+
+
+def numerar_bloques(bloques):
+    """
+    Agrega a cada bloque la columna '_orden' con la posición global de sus filas.
+
+    Args:
+        bloques (iterable): Bloques de un mismo dataset, en orden.
+
+    Yields:
+        pd.DataFrame: Bloque con la columna '_orden'.
+    """
+    desplazamiento = 0
+    for bloque in bloques:
+        yield bloque.assign(_orden=np.arange(desplazamiento, desplazamiento + len(bloque)))
+        desplazamiento += len(bloque)
@@ -0,0 +1,109 @@
+"""Dimensión de provincias: una clave entera para datasets y shapefile.
+
+Los datasets del repositorio traen 'provincia_id' (código INDEC) y el nombre
+con su propia grafía ('Ciudad Autónoma de Buenos Aires', 'Tierra del Fuego');
+el shapefile GADM trae 'GID_1' y 'NAME_1' ('Ciudad de Buenos Aires'). La tabla
+de este módulo relaciona todo con 'provincia_id', de modo que los cruces son
+uniones por enteros en lugar de comparaciones de cadenas normalizadas. Se
+construye una sola vez y queda en caché."""
+
+from functools import lru_cache
+
+import pandas as pd
+
+from indice_nombres import normalizar_clave
+
+# (provincia_id INDEC, nombre en los datasets, GID_1 y NAME_1 del shapefile GADM)
+PROVINCIAS = [
+    (2, 'Ciudad Autónoma de Buenos Aires', 'ARG.5_1', 'Ciudad de Buenos Aires'),
+    (6, 'Buenos Aires', 'ARG.1_1', 'Buenos Aires'),
+    (10, 'Catamarca', 'ARG.2_1', 'Catamarca'),
+    (14, 'Córdoba', 'ARG.6_1', 'Córdoba'),
+    (18, 'Corrientes', 'ARG.7_1', 'Corrientes'),
+    (22, 'Chaco', 'ARG.3_1', 'Chaco'),
+    (26, 'Chubut', 'ARG.4_1', 'Chubut'),
+    (30, 'Entre Ríos', 'ARG.8_1', 'Entre Ríos'),
+    (34, 'Formosa', 'ARG.9_1', 'Formosa'),
+    (38, 'Jujuy', 'ARG.10_1', 'Jujuy'),
+    (42, 'La Pampa', 'ARG.11_1', 'La Pampa'),
+    (46, 'La Rioja', 'ARG.12_1', 'La Rioja'),
+    (50, 'Mendoza', 'ARG.13_1', 'Mendoza'),
+    (54, 'Misiones', 'ARG.14_1', 'Misiones'),
+    (58, 'Neuquén', 'ARG.15_1', 'Neuquén'),
+    (62, 'Río Negro', 'ARG.16_1', 'Río Negro'),
+    (66, 'Salta', 'ARG.17_1', 'Salta'),
+    (70, 'San Juan', 'ARG.18_1', 'San Juan'),
+    (74, 'San Luis', 'ARG.19_1', 'San Luis'),
+    (78, 'Santa Cruz', 'ARG.20_1', 'Santa Cruz'),
+    (82, 'Santa Fe', 'ARG.21_1', 'Santa Fe'),
+    (86, 'Santiago del Estero', 'ARG.22_1', 'Santiago del Estero'),
+    (90, 'Tucumán', 'ARG.24_1', 'Tucumán'),
+    (94, 'Tierra del Fuego', 'ARG.23_1', 'Tierra del Fuego'),
+]
+
+# Otras grafías conocidas de las provincias con nombres largos o abreviados
+ALIAS = {
+    'CABA': 2,
+    'Capital Federal': 2,
+    'Tierra del Fuego, Antártida e Islas del Atlántico Sur': 94,
+}
+
+
+@lru_cache(maxsize=None)
+def tabla_provincias() -> pd.DataFrame:
+    """
+    Tabla de dimensión de provincias.
+
+    Returns:
+        pd.DataFrame: Columnas 'provincia_id', 'provincia_nombre', 'GID_1' y 'NAME_1',
+        una fila por provincia. No modificar: la misma instancia se reutiliza.
+    """
+    return pd.DataFrame(PROVINCIAS, columns=['provincia_id', 'provincia_nombre', 'GID_1', 'NAME_1'])
+
+
+@lru_cache(maxsize=None)
+def _id_por_clave() -> dict:
+    ids = {}
+    for provincia_id, nombre, _, nombre_gadm in PROVINCIAS:
+        ids[normalizar_clave(nombre)] = provincia_id
+        ids[normalizar_clave(nombre_gadm)] = provincia_id
+    for alias, provincia_id in ALIAS.items():
+        ids[normalizar_clave(alias)] = provincia_id
+    return ids
+
+
+def provincia_id_de(nombre: str) -> int:
+    """
+    Devuelve el 'provincia_id' de cualquier grafía conocida de una provincia.
+
+    Args:
+        nombre (str): Nombre de la provincia, con o sin tildes.
+
+    Returns:
+        int: Código INDEC de la provincia, o None si no se reconoce.
+    """
+    return _id_por_clave().get(normalizar_clave(nombre))
+
+
+def agregar_provincia_id(mapa: pd.DataFrame) -> pd.DataFrame:
+    """
+    Agrega 'provincia_id' y el nombre de los datasets a las provincias del shapefile.
+
+    Se usa 'GID_1' y, si falta o no se reconoce, 'NAME_1'.
+
+    Args:
+        mapa (pd.DataFrame): GeoDataFrame de provincias (GADM nivel 1).
+
+    Returns:
+        pd.DataFrame: Copia con 'provincia_id' (entero) y 'provincia_nombre'.
+    """
+    tabla = tabla_provincias()
+    ids = pd.Series(pd.NA, index=mapa.index, dtype='Int64')
+    if 'GID_1' in mapa.columns:
+        ids = mapa['GID_1'].map(tabla.set_index('GID_1')['provincia_id']).astype('Int64')
+    if 'NAME_1' in mapa.columns:
+        ids = ids.fillna(mapa['NAME_1'].map(provincia_id_de).astype('Int64'))
+    if ids.isna().any():
+        print(f"Advertencia: {int(ids.isna().sum())} provincias del mapa sin 'provincia_id'")
+    mapa = mapa.assign(provincia_id=ids)
+    return mapa.assign(provincia_nombre=mapa['provincia_id'].map(tabla.set_index('provincia_id')['provincia_nombre']))
@@ -1,77 +1,14 @@
 import pandas as pd
-from bokeh.plotting import figure, output_file, save
-from bokeh.models import (HoverTool, ColumnDataSource, Span, Label,
-                         LabelSet, ColorBar, LinearColorMapper,NumeralTickFormatter)
-from bokeh.layouts import column, row, gridplot
-from bokeh.transform import factor_cmap, transform, linear_cmap
-from bokeh.palettes import Viridis256, RdYlGn
-from bokeh.models import GeoJSONDataSource
 import warnings
 import os
-import geopandas as gpd
-from bokeh.io import export_png
+import sys
+# bokeh y geopandas se importan dentro del análisis (ver registro_analisis.py)
+from provincias import agregar_provincia_id
+from registro_analisis import RegistroAnalisis
 warnings.filterwarnings('ignore')
 
-# Verificar y crear el directorio
-if not os.path.exists("visualizaciones"):
-    os.makedirs("visualizaciones")
-    print("Directorio 'visualizaciones' creado.")
-
-# Cargar datos limpios
-print("Cargando datos limpios...")
-apellidos_provincia = pd.read_csv('docs/apellidos_cantidad_personas_provincia_clean.csv')
-apellidos_pais = pd.read_csv('docs/apellidos_mas_frecuentes_pais_clean.csv')
-apellidos_provincia_ranking = pd.read_csv('docs/apellidos_mas_frecuentes_provincia_clean.csv')
-historico_nombres = pd.read_csv('docs/historico-nombres_clean.csv')
-
-# Preparar datos relevantes para el análisis
-print("Preparando datasets específicos para el análisis...")
-
-# Buscar el apellido Rodríguez (probar con y sin tilde)
-rodriguez_pais = apellidos_pais[apellidos_pais['apellido'].str.lower() == 'rodriguez']
-if len(rodriguez_pais) == 0:
-    rodriguez_pais = apellidos_pais[apellidos_pais['apellido'].str.lower() == 'rodríguez']
-
-rodriguez_provincias = apellidos_provincia[apellidos_provincia['apellido'].str.lower() == 'rodriguez']
-if len(rodriguez_provincias) == 0:
-    rodriguez_provincias = apellidos_provincia[apellidos_provincia['apellido'].str.lower() == 'rodríguez']
-
-rodriguez_provincias = rodriguez_provincias.groupby('provincia_nombre').agg({'cantidad': 'sum'}).reset_index()
-
-rodriguez_ranking_provincias = apellidos_provincia_ranking[apellidos_provincia_ranking['apellido'].str.lower() == 'rodriguez']
-if len(rodriguez_ranking_provincias) == 0:
-    rodriguez_ranking_provincias = apellidos_provincia_ranking[apellidos_provincia_ranking['apellido'].str.lower() == 'rodríguez']
-
-# Buscar el nombre Joaquín (probar con y sin tilde)
-joaquin_historico = historico_nombres[historico_nombres['nombre'].str.lower() == 'joaquin']
-if len(joaquin_historico) == 0:
-    joaquin_historico = historico_nombres[historico_nombres['nombre'].str.lower() == 'joaquín']
-
-# Imprimir las columnas de joaquin_historico para verificar
-print("Columnas de joaquin_historico:", joaquin_historico.columns)
-
-# Asegúrate de que la columna 'provincia_nombre' existe
-if 'provincia_nombre' in joaquin_historico.columns:
-    # Crear un DataFrame que contenga la cantidad de Joaquín por provincia
-    joaquin_por_provincia = joaquin_historico.groupby('provincia_nombre')['cantidad'].sum().reset_index()
-    joaquin_por_provincia.rename(columns={'cantidad': 'cantidad_joaquin'}, inplace=True)
-else:
-    print("Error: 'provincia_nombre' no se encuentra en joaquin_historico.")
-    # Aquí puedes manejar el error como desees, por ejemplo, asignar un DataFrame vacío o lanzar una excepción.
-    joaquin_por_provincia = pd.DataFrame(columns=['provincia_nombre', 'cantidad_joaquin'])
-
-# Ahora, combinamos este DataFrame con rodriguez_provincias
-rodriguez_provincias = rodriguez_provincias.merge(joaquin_por_provincia, on='provincia_nombre', how='left')
-
-# Ordenar datos históricos por año
-if 'anio' in joaquin_historico.columns:
-    joaquin_historico = joaquin_historico.sort_values('anio')
-    
-# Imprimir información básica para verificar
-print(f"\nDatos de apellido Rodríguez a nivel país: {len(rodriguez_pais)} registros")
-print(f"Datos de apellido Rodríguez por provincia: {len(rodriguez_provincias)} registros")
-print(f"Datos de ranking de Rodríguez por provincia: {len(rodriguez_ranking_provincias)} registros")
-print(f"Datos históricos del nombre Joaquín: {len(joaquin_historico)} registros")
+# Análisis disponibles, con los paquetes pesados que cada uno necesita
+registro = RegistroAnalisis()
 
 # --------------------------------------
 # 9. Comparativa generacional del nombre Joaquín
@@ -79,6 +16,8 @@ print(f"Datos históricos del nombre Joaquín: {len(joaquin_historico)} registro
 
 estimacion_joaquin_rodriguez = 0
 
+@registro.registrar('mapa_argentina', dependencias=('bokeh', 'geopandas'),
+                    descripcion="Mapa de Rodríguez por provincia")
 def generar_mapa_distribucion_argentina():
     """
     Genera un mapa de calor de Argentina con la distribución de Rodríguez, Joaquín y la combinación.
@@ -91,6 +30,10 @@ def generar_mapa_distribucion_argentina():
     str
         Mensaje con la ruta de los archivos guardados
     """
+    import geopandas as gpd
+    from bokeh.models import ColorBar, GeoJSONDataSource, HoverTool, LinearColorMapper
+    from bokeh.palettes import RdYlGn
+    from bokeh.plotting import figure, output_file, save
     print("\nGenerando mapa de calor de distribución en Argentina...")
     
     # Usar los datasets globales ya cargados
@@ -103,12 +46,13 @@ def generar_mapa_distribucion_argentina():
     # Preparar datos de Joaquín por provincia
     if 'provincia_nombre' in joaquin_historico.columns:
         # Si ya tenemos los datos por provincia, los agrupamos
-        joaquin_por_provincia = joaquin_historico.groupby('provincia_nombre')['cantidad'].sum().reset_index()
+        joaquin_por_provincia = joaquin_historico.groupby('provincia_id')['cantidad'].sum().reset_index()
         joaquin_por_provincia.rename(columns={'cantidad': 'cantidad_joaquin'}, inplace=True)
     else:
         # Si no tenemos datos por provincia, creamos un DataFrame vacío con la estructura correcta
         print("No se encontraron datos del nombre Joaquín por provincia.")
-        joaquin_por_provincia = pd.DataFrame(columns=['provincia_nombre', 'cantidad_joaquin'])
+        joaquin_por_provincia = pd.DataFrame({'provincia_id': pd.Series(dtype='int64'),
+                                              'cantidad_joaquin': pd.Series(dtype='int64')})
     
     try:
         # Cargar el archivo de shapefile de Argentina
@@ -118,43 +62,17 @@ def generar_mapa_distribucion_argentina():
         print(f"Error al cargar el shapefile: {e}")
         return "Error al cargar el shapefile de Argentina."
     
-    # Renombrar columnas para facilitar la unión
-    if 'NAME_1' in argentina_map.columns:
-        argentina_map = argentina_map.rename(columns={'NAME_1': 'provincia_nombre'})
-    
-    # Normalizar nombres de provincias para unir correctamente los DataFrames
-    def normalizar_nombre(nombre):
-        if not isinstance(nombre, str):
-            return ""
-        
-        # Mapeo de nombres que podrían variar
-        mapeo = {
-            'Ciudad Autónoma de Buenos Aires': 'Ciudad de Buenos Aires',
-            'CABA': 'Ciudad de Buenos Aires',
-            'Tierra del Fuego': 'Tierra del Fuego, Antártida e Islas del Atlántico Sur',
-            'Santiago Del Estero': 'Santiago del Estero'
-        }
-        
-        if nombre in mapeo:
-            return mapeo[nombre]
-            
-        # Normalización general
-        return nombre.lower().strip().replace(' ', '_')
-    
-    # Aplicar normalización a todos los datasets
-    argentina_map['provincia_norm'] = argentina_map['provincia_nombre'].apply(normalizar_nombre)
-    rodriguez_provincias['provincia_norm'] = rodriguez_provincias['provincia_nombre'].apply(normalizar_nombre)
-    
-    if len(joaquin_por_provincia) > 0 and 'provincia_nombre' in joaquin_por_provincia.columns:
-        joaquin_por_provincia['provincia_norm'] = joaquin_por_provincia['provincia_nombre'].apply(normalizar_nombre)
+    # Clave entera de provincia (GID_1/NAME_1 -> provincia_id) y nombre de los datasets
+    argentina_map = agregar_provincia_id(argentina_map)
     
     # Unir datos de Rodríguez con el mapa
-    merged_rodriguez = argentina_map.merge(rodriguez_provincias, on='provincia_norm', how='left')
+    merged_rodriguez = argentina_map.merge(rodriguez_provincias.drop(columns='provincia_nombre'),
+                                           on='provincia_id', how='left')
     merged_rodriguez['cantidad'] = merged_rodriguez['cantidad'].fillna(0)
     
     # Unir datos de Joaquín con el mapa
-    if len(joaquin_por_provincia) > 0 and 'provincia_norm' in joaquin_por_provincia.columns:
-        merged_joaquin = argentina_map.merge(joaquin_por_provincia, on='provincia_norm', how='left')
+    if len(joaquin_por_provincia) > 0:
+        merged_joaquin = argentina_map.merge(joaquin_por_provincia, on='provincia_id', how='left')
         merged_joaquin['cantidad_joaquin'] = merged_joaquin['cantidad_joaquin'].fillna(0)
     else:
         # Si no hay datos de Joaquín por provincia, usar el mismo DataFrame de base
@@ -177,10 +95,6 @@ def generar_mapa_distribucion_argentina():
         # Si no tenemos estimación global, hacemos una aproximación basada en los datos disponibles
         merged_combinacion['estimacion_joaquin_rodriguez'] = merged_rodriguez['cantidad'] * 0.01
     
-    # Asegúrate de que la columna 'provincia_nombre' esté en merged_rodriguez
-    if 'provincia_nombre' not in merged_rodriguez.columns:
-        merged_rodriguez['provincia_nombre'] = merged_rodriguez['provincia_norm']  # O la columna que corresponda
-
     # Convertir a GeoJSON para Bokeh
     geo_source_rodriguez = GeoJSONDataSource(geojson=merged_rodriguez.to_json())
     geo_source_joaquin = GeoJSONDataSource(geojson=merged_joaquin.to_json())
@@ -258,4 +172,79 @@ def generar_mapa_distribucion_argentina():
     return "Mapa generado correctamente basado en datos reales."
 
 
-generar_mapa_distribucion_argentina()
\ No newline at end of file
+# --------------------------------------
+# Ejecución
+# --------------------------------------
+
+# Los argumentos se leen antes de cargar los datos: --help y --listar responden al instante
+parser = registro.crear_parser("Mapa de distribución del apellido Rodríguez")
+args = parser.parse_args()
+if args.listar:
+    print(registro.listar())
+    sys.exit(0)
+seleccion = registro.seleccionar(args.solo, args.omitir)
+
+# Verificar y crear el directorio
+if not os.path.exists("visualizaciones"):
+    os.makedirs("visualizaciones")
+    print("Directorio 'visualizaciones' creado.")
+
+# Cargar datos limpios
+print("Cargando datos limpios...")
+apellidos_provincia = pd.read_csv('docs/apellidos_cantidad_personas_provincia_clean.csv')
+apellidos_pais = pd.read_csv('docs/apellidos_mas_frecuentes_pais_clean.csv')
+apellidos_provincia_ranking = pd.read_csv('docs/apellidos_mas_frecuentes_provincia_clean.csv')
+historico_nombres = pd.read_csv('docs/historico-nombres_clean.csv')
+
+# Preparar datos relevantes para el análisis
+print("Preparando datasets específicos para el análisis...")
+
+# Buscar el apellido Rodríguez (probar con y sin tilde)
+rodriguez_pais = apellidos_pais[apellidos_pais['apellido'].str.lower() == 'rodriguez']
+if len(rodriguez_pais) == 0:
+    rodriguez_pais = apellidos_pais[apellidos_pais['apellido'].str.lower() == 'rodríguez']
+
+rodriguez_provincias = apellidos_provincia[apellidos_provincia['apellido'].str.lower() == 'rodriguez']
+if len(rodriguez_provincias) == 0:
+    rodriguez_provincias = apellidos_provincia[apellidos_provincia['apellido'].str.lower() == 'rodríguez']
+
+rodriguez_provincias = rodriguez_provincias.groupby(['provincia_id', 'provincia_nombre']).agg({'cantidad': 'sum'}).reset_index()
+
+rodriguez_ranking_provincias = apellidos_provincia_ranking[apellidos_provincia_ranking['apellido'].str.lower() == 'rodriguez']
+if len(rodriguez_ranking_provincias) == 0:
+    rodriguez_ranking_provincias = apellidos_provincia_ranking[apellidos_provincia_ranking['apellido'].str.lower() == 'rodríguez']
+
+# Buscar el nombre Joaquín (probar con y sin tilde)
+joaquin_historico = historico_nombres[historico_nombres['nombre'].str.lower() == 'joaquin']
+if len(joaquin_historico) == 0:
+    joaquin_historico = historico_nombres[historico_nombres['nombre'].str.lower() == 'joaquín']
+
+# Imprimir las columnas de joaquin_historico para verificar
+print("Columnas de joaquin_historico:", joaquin_historico.columns)
+
+# Asegúrate de que la columna 'provincia_nombre' existe
+if 'provincia_nombre' in joaquin_historico.columns:
+    # Crear un DataFrame que contenga la cantidad de Joaquín por provincia
+    joaquin_por_provincia = joaquin_historico.groupby('provincia_id')['cantidad'].sum().reset_index()
+    joaquin_por_provincia.rename(columns={'cantidad': 'cantidad_joaquin'}, inplace=True)
+else:
+    print("Error: 'provincia_nombre' no se encuentra en joaquin_historico.")
+    # Aquí puedes manejar el error como desees, por ejemplo, asignar un DataFrame vacío o lanzar una excepción.
+    joaquin_por_provincia = pd.DataFrame({'provincia_id': pd.Series(dtype='int64'),
+                                          'cantidad_joaquin': pd.Series(dtype='int64')})
+
+# Ahora, combinamos este DataFrame con rodriguez_provincias
+rodriguez_provincias = rodriguez_provincias.merge(joaquin_por_provincia, on='provincia_id', how='left')
+
+# Ordenar datos históricos por año
+if 'anio' in joaquin_historico.columns:
+    joaquin_historico = joaquin_historico.sort_values('anio')
+    
+# Imprimir información básica para verificar
+print(f"\nDatos de apellido Rodríguez a nivel país: {len(rodriguez_pais)} registros")
+print(f"Datos de apellido Rodríguez por provincia: {len(rodriguez_provincias)} registros")
+print(f"Datos de ranking de Rodríguez por provincia: {len(rodriguez_ranking_provincias)} registros")
+print(f"Datos históricos del nombre Joaquín: {len(joaquin_historico)} registros")
+
+# Ejecutar los análisis seleccionados
+registro.ejecutar(seleccion)
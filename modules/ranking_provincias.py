@@ -0,0 +1,136 @@
+"""Ranking de apellidos por provincia calculado desde las cantidades.
+
+apellidos_mas_frecuentes_provincia.csv es una foto fija de los primeros
+puestos de cada provincia. Este módulo calcula el top-k con cualquier k a
+partir de apellidos_cantidad_personas_provincia, leyendo por bloques y
+manteniendo un montículo de tamaño k por provincia: nunca se ordena la tabla
+completa. Cada bloque se recorta primero con el umbral vigente de su
+provincia (el menor valor del montículo lleno), de modo que casi ninguna fila
+llega al bucle de Python."""
+
+import heapq
+import sys
+
+import numpy as np
+import pandas as pd
+
+from indice_nombres import normalizar_clave
+
+# Filas por bloque al leer el CSV (o al recorrer un DataFrame ya cargado)
+TAMANO_BLOQUE = 200000
+
+
+def _bloques(fuente, tamano_bloque: int):
+    if isinstance(fuente, pd.DataFrame):
+        for inicio in range(0, len(fuente), tamano_bloque):
+            yield fuente.iloc[inicio:inicio + tamano_bloque]
+    else:
+        yield from pd.read_csv(fuente, chunksize=tamano_bloque)
+
+
+def ranking_por_provincia(fuente, k: int = 20, columna: str = 'apellido',
+                          tamano_bloque: int = TAMANO_BLOQUE) -> pd.DataFrame:
+    """
+    Calcula los k apellidos con más personas en cada provincia.
+
+    Se asume una fila por (provincia, apellido); si hay variantes sin agrupar,
+    pasar el resultado de agrupar_variantes.
+
+    Args:
+        fuente (str | pd.DataFrame): Ruta del CSV limpio o DataFrame con 'provincia_id',
+            'provincia_nombre', `columna` y 'cantidad'.
+        k (int): Puestos por provincia.
+        columna (str): Columna del apellido.
+        tamano_bloque (int): Filas por bloque.
+
+    Returns:
+        pd.DataFrame: Columnas 'provincia_id', 'provincia_nombre', `columna`, 'cantidad',
+        'ranking' y 'porcentaje_poblacion_portadora', ordenado por provincia y puesto.
+        A igual cantidad, gana el apellido que aparece primero en la fuente.
+    """
+    monticulos = {}
+    poblacion = {}
+    nombres_provincia = {}
+    posicion = 0
+    for bloque in _bloques(fuente, tamano_bloque):
+        provincias = bloque['provincia_id'].to_numpy()
+        cantidades = bloque['cantidad'].to_numpy()
+        for provincia_id, total in bloque.groupby('provincia_id')['cantidad'].sum().items():
+            poblacion[provincia_id] = poblacion.get(provincia_id, 0) + total
+        for provincia_id, nombre in bloque.drop_duplicates('provincia_id')[['provincia_id', 'provincia_nombre']].to_numpy():
+            nombres_provincia.setdefault(provincia_id, nombre)
+
+        # Umbral vectorizado: solo pasan las filas que pueden entrar en su montículo
+        umbrales = {p: m[0][0] for p, m in monticulos.items() if len(m) == k}
+        minimos = pd.Series(provincias).map(umbrales).fillna(-np.inf).to_numpy()
+        candidatas = np.flatnonzero(cantidades >= minimos)
+
+        apellidos = bloque[columna].to_numpy()
+        for i in candidatas:
+            # (cantidad, -posición): a igual cantidad se conserva el que apareció antes
+            elemento = (cantidades[i], -(posicion + i), apellidos[i])
+            monticulo = monticulos.setdefault(provincias[i], [])
+            if len(monticulo) < k:
+                heapq.heappush(monticulo, elemento)
+            elif elemento > monticulo[0]:
+                heapq.heapreplace(monticulo, elemento)
+        posicion += len(bloque)
+
+    filas = []
+    for provincia_id in sorted(monticulos):
+        for puesto, (cantidad, _, apellido) in enumerate(sorted(monticulos[provincia_id], reverse=True), 1):
+            filas.append({
+                'provincia_id': provincia_id,
+                'provincia_nombre': nombres_provincia[provincia_id],
+                columna: apellido,
+                'cantidad': int(cantidad),
+                'ranking': puesto,
+                'porcentaje_poblacion_portadora': round(cantidad / poblacion[provincia_id] * 100, 3)
+            })
+    return pd.DataFrame(filas, columns=['provincia_id', 'provincia_nombre', columna, 'cantidad',
+                                        'ranking', 'porcentaje_poblacion_portadora'])
+
+
+def validar_ranking(calculado: pd.DataFrame, oficial: pd.DataFrame, columna: str = 'apellido') -> pd.DataFrame:
+    """
+    Compara el ranking calculado con el archivo de ranking publicado.
+
+    Para cada provincia se toman tantos puestos calculados como filas tenga el
+    ranking oficial y se comparan los apellidos por su clave normalizada.
+
+    Args:
+        calculado (pd.DataFrame): Resultado de ranking_por_provincia.
+        oficial (pd.DataFrame): apellidos_mas_frecuentes_provincia (limpio).
+        columna (str): Columna del apellido.
+
+    Returns:
+        pd.DataFrame: Por provincia: 'puestos', 'coincidencias', 'orden_identico',
+        'faltantes' (oficiales que no aparecen) y 'sobrantes' (calculados que no figuran).
+    """
+    resultados = []
+    for provincia_id, grupo in oficial.sort_values(['provincia_id', 'ranking']).groupby('provincia_id'):
+        esperados = [normalizar_clave(v) for v in grupo[columna]]
+        propios = calculado[calculado['provincia_id'] == provincia_id].sort_values('ranking')
+        obtenidos = [normalizar_clave(v) for v in propios[columna].head(len(esperados))]
+        resultados.append({
+            'provincia_id': provincia_id,
+            'provincia_nombre': grupo['provincia_nombre'].iloc[0],
+            'puestos': len(esperados),
+            'coincidencias': len(set(esperados) & set(obtenidos)),
+            'orden_identico': esperados == obtenidos,
+            'faltantes': sorted(set(esperados) - set(obtenidos)),
+            'sobrantes': sorted(set(obtenidos) - set(esperados))
+        })
+    return pd.DataFrame(resultados)
+
+
+if __name__ == "__main__":
+    # Uso: python modules/ranking_provincias.py [k]
+    k = int(sys.argv[1]) if len(sys.argv) > 1 else 20
+    ranking = ranking_por_provincia('docs/apellidos_cantidad_personas_provincia_clean.csv', k)
+    ranking.to_csv(f'docs/ranking_apellidos_provincia_top{k}.csv', index=False)
+    print(f"Ranking guardado en docs/ranking_apellidos_provincia_top{k}.csv")
+
+    validacion = validar_ranking(ranking, pd.read_csv('docs/apellidos_mas_frecuentes_provincia_clean.csv'))
+    print(validacion[['provincia_nombre', 'puestos', 'coincidencias', 'orden_identico']].to_string(index=False))
+    print(f"Provincias con el mismo top: {int(validacion['orden_identico'].sum())}/{len(validacion)}")
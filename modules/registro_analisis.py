@@ -0,0 +1,307 @@
+"""Registro de análisis como plugins con dependencias declaradas.
+
+Los scripts de análisis (analisis_rodriguez.py, prueba.py) registran cada
+análisis con RegistroAnalisis.registrar e indican los paquetes pesados que
+necesita ('bokeh', 'geopandas'). Esos paquetes no se importan al cargar el
+script: cada análisis los importa dentro de su función, así que `--help`,
+`--listar` o una ejecución sin mapas no pagan la importación de geopandas (ni
+la de bokeh, si no se genera ningún gráfico).
+
+Antes de ejecutar un análisis se comprueba con importlib.util.find_spec, sin
+importar nada, que sus dependencias estén instaladas; si falta alguna, ese
+análisis se omite con un aviso y los demás se ejecutan igual.
+
+Un análisis también puede requerir otros análisis (`requiere`) cuando usa
+resultados que ellos dejan en variables globales: seleccionar los agrega aunque
+no se hayan pedido o se hayan omitido, y si uno requerido no se puede ejecutar,
+se omite también el que lo requiere.
+
+Los datos que usan los análisis (datasets, índices, tablas) se declaran como
+preparaciones (RegistroAnalisis.preparacion) y los análisis las nombran en el
+mismo `requiere`. Una preparación se calcula recién cuando la necesita el
+primer análisis que se ejecuta y una sola vez; su resultado se publica en
+`variables` (las globales del script) con su nombre. Así `--solo` con un
+análisis de apellidos no carga el histórico de nombres.
+
+Si un análisis o una preparación falla, se informa el error con su nombre, el
+análisis queda con resultado None (y en `fallidos`) y se omiten los que lo
+requieren; los demás se ejecutan igual."""
+
+import argparse
+import importlib.util
+import time
+import traceback
+
+
+class Analisis:
+    """
+    Un análisis registrado.
+
+    Args:
+        nombre (str): Identificador para la línea de comandos.
+        funcion (callable): Función sin argumentos obligatorios; devuelve un resumen.
+        dependencias (tuple): Paquetes que importa la función al ejecutarse.
+        descripcion (str): Texto para --listar.
+        requiere (tuple): Análisis que se tienen que ejecutar antes que este.
+    """
+
+    def __init__(self, nombre: str, funcion, dependencias: tuple = (), descripcion: str = '',
+                 requiere: tuple = ()):
+        self.nombre = nombre
+        self.funcion = funcion
+        self.dependencias = tuple(dependencias)
+        self.descripcion = descripcion
+        self.requiere = tuple(requiere)
+
+    def faltantes(self) -> list:
+        """
+        Dependencias que no están instaladas (se busca el paquete, no se importa).
+
+        Returns:
+            list: Nombres de los paquetes faltantes.
+        """
+        return [paquete for paquete in self.dependencias if importlib.util.find_spec(paquete) is None]
+
+
+class PreparacionFallida(RuntimeError):
+    """Una preparación (o una que requiere) falló antes; no se vuelve a intentar."""
+
+
+class Preparacion:
+    """
+    Un paso de preparación de datos registrado.
+
+    Args:
+        nombre (str): Nombre de la variable que publica.
+        funcion (callable): Función sin argumentos; devuelve el valor.
+        requiere (tuple): Preparaciones que se tienen que calcular antes que esta.
+    """
+
+    def __init__(self, nombre: str, funcion, requiere: tuple = ()):
+        self.nombre = nombre
+        self.funcion = funcion
+        self.requiere = tuple(requiere)
+
+
+class RegistroAnalisis:
+    """
+    Análisis y preparaciones registrados, en el orden en que se definen.
+
+    Args:
+        variables (dict): Dónde se publican los resultados de las preparaciones
+            (normalmente globals() del script); None = solo en `datos`.
+    """
+
+    def __init__(self, variables: dict = None):
+        self._analisis = {}
+        self._preparaciones = {}
+        self.variables = variables
+        self.datos = {}
+        self.fallidos = {}
+
+    def registrar(self, nombre: str, dependencias: tuple = (), descripcion: str = None,
+                  requiere: tuple = ()):
+        """
+        Decorador que registra una función de análisis.
+
+        Args:
+            nombre (str): Identificador para la línea de comandos.
+            dependencias (tuple): Paquetes pesados que la función importa al ejecutarse.
+            descripcion (str): Texto para --listar; por defecto, el comentario de la sección
+                o la primera línea del docstring.
+            requiere (tuple): Análisis o preparaciones ya registrados cuyos resultados usa
+                la función.
+
+        Returns:
+            callable: Decorador (devuelve la función sin cambios).
+        """
+        def decorador(funcion):
+            self._validar_nuevo(nombre, requiere)
+            texto = descripcion or (funcion.__doc__ or '').strip().split('\n')[0]
+            self._analisis[nombre] = Analisis(nombre, funcion, dependencias, texto, requiere)
+            return funcion
+
+        return decorador
+
+    def preparacion(self, nombre: str, requiere: tuple = ()):
+        """
+        Decorador que registra un paso de preparación de datos.
+
+        Args:
+            nombre (str): Nombre de la variable que publica el resultado de la función.
+            requiere (tuple): Preparaciones ya registradas que usa la función.
+
+        Returns:
+            callable: Decorador (devuelve la función sin cambios).
+        """
+        def decorador(funcion):
+            self._validar_nuevo(nombre, requiere)
+            no_preparaciones = [n for n in requiere if n not in self._preparaciones]
+            if no_preparaciones:
+                raise ValueError(f"La preparación '{nombre}' solo puede requerir preparaciones: "
+                                 f"{', '.join(no_preparaciones)}")
+            self._preparaciones[nombre] = Preparacion(nombre, funcion, requiere)
+            return funcion
+
+        return decorador
+
+    def _validar_nuevo(self, nombre: str, requiere: tuple) -> None:
+        if nombre in self._analisis or nombre in self._preparaciones:
+            raise ValueError(f"Ya hay un análisis o una preparación registrados como '{nombre}'")
+        # Los requeridos se registran antes: el orden de registro ya es un orden de ejecución válido
+        faltantes = [n for n in requiere if n not in self._analisis and n not in self._preparaciones]
+        if faltantes:
+            raise ValueError(f"'{nombre}' requiere análisis o preparaciones no registrados antes: "
+                             f"{', '.join(faltantes)}")
+
+    def nombres(self) -> list:
+        """Nombres de los análisis registrados, en orden."""
+        return list(self._analisis)
+
+    def listar(self) -> str:
+        """
+        Describe los análisis registrados y sus dependencias.
+
+        Returns:
+            str: Una línea por análisis.
+        """
+        lineas = []
+        for analisis in self._analisis.values():
+            requeridos = tuple(n for n in analisis.requiere if n in self._analisis)
+            dependencias = ', '.join(analisis.dependencias + requeridos) or '-'
+            faltantes = analisis.faltantes()
+            aviso = f"  [falta: {', '.join(faltantes)}]" if faltantes else ''
+            lineas.append(f"{analisis.nombre:<26} {analisis.descripcion} (requiere: {dependencias}){aviso}")
+        return "\n".join(lineas)
+
+    def crear_parser(self, descripcion: str) -> argparse.ArgumentParser:
+        """
+        Parser de línea de comandos con --listar, --solo y --omitir.
+
+        Args:
+            descripcion (str): Descripción del script.
+
+        Returns:
+            argparse.ArgumentParser: Parser listo para parse_args.
+        """
+        parser = argparse.ArgumentParser(description=descripcion)
+        parser.add_argument('--listar', action='store_true',
+                            help="Muestra los análisis disponibles y sus dependencias, sin cargar datos")
+        parser.add_argument('--solo', nargs='+', choices=self.nombres(), metavar='ANALISIS',
+                            help="Ejecuta solo estos análisis (ver --listar)")
+        parser.add_argument('--omitir', nargs='+', choices=self.nombres(), default=[], metavar='ANALISIS',
+                            help="Ejecuta todos los análisis salvo estos")
+        return parser
+
+    def seleccionar(self, solo: list = None, omitir: list = ()) -> list:
+        """
+        Análisis a ejecutar, en el orden de registro.
+
+        Los análisis requeridos por los seleccionados se agregan aunque no se hayan
+        pedido o se hayan omitido (con un aviso en ese caso).
+
+        Args:
+            solo (list): Nombres a ejecutar; None = todos.
+            omitir (list): Nombres a excluir.
+
+        Returns:
+            list: Nombres seleccionados.
+        """
+        desconocidos = [n for n in list(solo or []) + list(omitir) if n not in self._analisis]
+        if desconocidos:
+            raise ValueError(f"Análisis desconocidos: {', '.join(desconocidos)}")
+        seleccion = {n for n in self._analisis if (solo is None or n in solo) and n not in omitir}
+        # Cada requerido está registrado antes que quien lo requiere: un recorrido inverso basta
+        for nombre in reversed(self.nombres()):
+            if nombre in seleccion:
+                for requerido in self._analisis[nombre].requiere:
+                    if requerido in self._preparaciones:
+                        continue  # Se calcula al ejecutar, no se selecciona
+                    if requerido in omitir and requerido not in seleccion:
+                        print(f"Se ejecuta '{requerido}' aunque se omitió: lo requiere '{nombre}'")
+                    seleccion.add(requerido)
+        return [n for n in self._analisis if n in seleccion]
+
+    def preparar(self, nombre: str):
+        """
+        Calcula una preparación (y antes las que requiere), una sola vez.
+
+        Args:
+            nombre (str): Nombre de la preparación.
+
+        Returns:
+            El valor calculado, que también queda en `datos` y en `variables`.
+
+        Raises:
+            PreparacionFallida: Si falla la preparación o una que requiere (el error se
+            informa una sola vez, la primera).
+        """
+        if nombre in self.datos:
+            return self.datos[nombre]
+        if nombre in self.fallidos:
+            raise PreparacionFallida(f"falló la preparación '{nombre}'")
+        preparacion = self._preparaciones[nombre]
+        for requerida in preparacion.requiere:
+            self.preparar(requerida)
+        try:
+            valor = preparacion.funcion()
+        except Exception as e:
+            traceback.print_exc()
+            print(f"\nFalló la preparación '{nombre}': {type(e).__name__}: {e}")
+            self.fallidos[nombre] = e
+            raise PreparacionFallida(f"falló la preparación '{nombre}'") from e
+        self.datos[nombre] = valor
+        if self.variables is not None:
+            self.variables[nombre] = valor
+        return valor
+
+    def ejecutar(self, nombres: list = None) -> dict:
+        """
+        Ejecuta los análisis indicados e imprime su resumen.
+
+        Antes de cada análisis se calculan las preparaciones que requiere y que
+        todavía no se calcularon. Un error en una preparación o en el análisis se
+        informa con su nombre y no detiene a los demás.
+
+        Args:
+            nombres (list): Análisis a ejecutar (ver seleccionar); None = todos.
+
+        Returns:
+            dict: {nombre: resumen}; None para los que fallaron (ver `fallidos`), para los
+            omitidos por dependencias faltantes o porque no se ejecutó un análisis que requieren.
+        """
+        resultados = {}
+        omitidos = set()
+        for nombre in (self.nombres() if nombres is None else nombres):
+            analisis = self._analisis[nombre]
+            faltantes = analisis.faltantes()
+            sin_ejecutar = [n for n in analisis.requiere if n in omitidos]
+            if faltantes or sin_ejecutar:
+                motivo = (f"falta instalar {', '.join(faltantes)}" if faltantes
+                          else f"no se ejecutó {', '.join(sin_ejecutar)}")
+                print(f"\nSe omite '{nombre}': {motivo}")
+                resultados[nombre] = None
+                omitidos.add(nombre)
+                continue
+            inicio = time.perf_counter()
+            try:
+                for requerido in analisis.requiere:
+                    if requerido in self._preparaciones:
+                        self.preparar(requerido)
+            except PreparacionFallida as e:
+                print(f"\nSe omite '{nombre}': {e}")
+                resultados[nombre] = None
+                omitidos.add(nombre)
+                continue
+            try:
+                resultados[nombre] = analisis.funcion()
+            except Exception as e:
+                traceback.print_exc()
+                print(f"\nFalló '{nombre}': {type(e).__name__}: {e}")
+                resultados[nombre] = None
+                self.fallidos[nombre] = e
+                omitidos.add(nombre)
+                continue
+            print(resultados[nombre])
+            print(f"[{nombre}: {time.perf_counter() - inicio:.2f} s]")
+        return resultados
@@ -0,0 +1,420 @@
+"""Servicio local HTTP/JSON de estadísticas de nombres y apellidos.
+
+Carga una sola vez los datasets limpios, agrupa las variantes ortográficas y
+construye los índices; después responde desde memoria. Las respuestas quedan
+en un caché LRU acotado y el endpoint /metricas informa latencias y aciertos
+del caché. Escucha solo en 127.0.0.1 y no requiere conexión a internet.
+
+Uso:
+    python modules/servicio_nombres.py [--puerto 8765] [--cache 1024]
+
+Endpoints (GET, parámetros en la query string):
+    /ranking?nombre=Joaquín&anio=2000   cantidad y puesto del nombre en el año
+    /evolucion?nombre=Joaquín           cantidad y puesto por año
+    /generaciones?nombre=Joaquín        nacimientos por generación
+    /similares?nombre=Joaquín[&cantidad=10&metodo=correlacion]
+                                        nombres con una evolución anual parecida
+    /apellido?apellido=Rodríguez        distribución del apellido por provincia
+    /unicidad?nombre=Joaquín&apellido=Rodríguez[&provincia_id=14]
+                                        estimación de personas con la combinación
+    /metricas                           latencias por endpoint y estado del caché
+"""
+
+import argparse
+import json
+import os
+import threading
+import time
+import traceback
+from collections import defaultdict, deque
+from functools import lru_cache
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+import numpy as np
+import pandas as pd
+
+from carga_datos import cargar_agrupado
+from generaciones import AgregadorGeneraciones
+from indice_nombres import IndiceDifuso
+from tabla_rankings import RUTA_TABLA, TablaRankings, obtener_tabla_rankings
+from trayectorias import MatrizTrayectorias
+from unicidad import POBLACION_ARGENTINA, poblacion_por_provincia, proporciones_nombres
+from variantes import grafias_canonicas, resolver_clave
+
+HOST = '127.0.0.1'
+PUERTO = 8765
+TAMANO_CACHE = 1024
+# Latencias que se conservan por endpoint para calcular percentiles
+MUESTRAS_LATENCIA = 1000
+
+
+class EndpointDesconocido(LookupError):
+    """La ruta pedida no corresponde a ningún endpoint del servicio."""
+
+
+class ServicioNombres:
+    """
+    Consultas en memoria sobre los datasets limpios, con caché LRU de resultados.
+
+    Args:
+        historico (pd.DataFrame): historico-nombres con variantes ya agrupadas.
+        apellidos_provincia (pd.DataFrame): Cantidades por apellido y provincia, agrupadas.
+        tamano_cache (int): Cantidad máxima de respuestas en el caché.
+        rankings (TablaRankings): Puestos por año ya calculados; por defecto se calculan
+            desde `historico`.
+    """
+
+    def __init__(self, historico: pd.DataFrame, apellidos_provincia: pd.DataFrame,
+                 tamano_cache: int = TAMANO_CACHE, rankings: TablaRankings = None):
+        self.indice_nombres = IndiceDifuso(historico['nombre'], historico['cantidad'])
+        self.indice_apellidos = IndiceDifuso(apellidos_provincia['apellido'], apellidos_provincia['cantidad'])
+
+        # Puesto de cada nombre en su año, calculado una sola vez para toda la tabla
+        self.rankings = (TablaRankings.desde_historico(historico, columna='nombre_clave')
+                         if rankings is None else rankings)
+        self.trayectorias = MatrizTrayectorias.desde_tabla(self.rankings)
+        # Filas de cada nombre contiguas y ordenadas por año: una consulta es un corte
+        self._historico = historico.sort_values(['nombre_clave', 'anio'], kind='stable').reset_index(drop=True)
+        self._claves_nombre = self._historico['nombre_clave'].to_numpy(dtype=object)
+        self._nombres_por_anio = historico.groupby('anio').size()
+        self._canonico_nombre = grafias_canonicas(historico, 'nombre')
+        self._generaciones = AgregadorGeneraciones(historico)
+        self._proporcion_nombre = proporciones_nombres(historico, columna='nombre_clave')
+
+        self._apellidos = apellidos_provincia.sort_values(['apellido_clave', 'provincia_id'],
+                                                          kind='stable').reset_index(drop=True)
+        self._claves_apellido = self._apellidos['apellido_clave'].to_numpy(dtype=object)
+        self._poblacion_provincia = poblacion_por_provincia(apellidos_provincia)
+
+        self._consultar = lru_cache(maxsize=tamano_cache)(self._responder)
+        self._latencias = defaultdict(lambda: deque(maxlen=MUESTRAS_LATENCIA))
+        self._conteos = defaultdict(int)
+        self._errores = defaultdict(int)
+        self._candado = threading.Lock()
+
+    @classmethod
+    def desde_datasets(cls, tamano_cache: int = TAMANO_CACHE, raiz: str = '') -> 'ServicioNombres':
+        """
+        Carga los datasets limpios (ver carga_datos.py) y construye el servicio.
+
+        Args:
+            tamano_cache (int): Respuestas que conserva el caché LRU.
+            raiz (str): Raíz del repositorio; por defecto, el directorio de trabajo.
+
+        Returns:
+            ServicioNombres: Servicio listo para responder consultas.
+        """
+        historico = cargar_agrupado('historico-nombres', 'nombre', ['anio'], raiz=raiz)
+        apellidos = cargar_agrupado('apellidos_provincia', 'apellido', ['provincia_id', 'provincia_nombre'],
+                                    raiz=raiz)
+        # Tabla de puestos guardada si está al día con el histórico (ver tabla_rankings.py)
+        rankings = obtener_tabla_rankings(historico, 'nombre_clave', os.path.join(raiz, RUTA_TABLA))
+        return cls(historico, apellidos, tamano_cache, rankings)
+
+    # ------------------------------------------------------------------
+    # Consultas
+    # ------------------------------------------------------------------
+
+    def _filas(self, claves: np.ndarray, tabla: pd.DataFrame, clave: str) -> pd.DataFrame:
+        desde = np.searchsorted(claves, clave, side='left')
+        hasta = np.searchsorted(claves, clave, side='right')
+        return tabla.iloc[desde:hasta]
+
+    def _nombre(self, consulta: str) -> tuple:
+        clave = resolver_clave(consulta, self.indice_nombres)
+        return clave, self._filas(self._claves_nombre, self._historico, clave)
+
+    def _apellido(self, consulta: str) -> tuple:
+        clave = resolver_clave(consulta, self.indice_apellidos)
+        return clave, self._filas(self._claves_apellido, self._apellidos, clave)
+
+    def ranking(self, nombre: str, anio: int) -> dict:
+        """Cantidad y puesto de un nombre en un año (1 = el más frecuente)."""
+        clave, filas = self._nombre(nombre)
+        return {
+            'nombre': filas['nombre'].iloc[0] if len(filas) else nombre,
+            'clave': clave,
+            'anio': anio,
+            **self.rankings.puesto(clave, anio),
+            'nombres_en_anio': int(self._nombres_por_anio.get(anio, 0))
+        }
+
+    def evolucion(self, nombre: str) -> dict:
+        """Serie anual de cantidad, puesto y participación de un nombre."""
+        clave, filas = self._nombre(nombre)
+        return {
+            'nombre': filas['nombre'].iloc[0] if len(filas) else nombre,
+            'clave': clave,
+            'serie': self.rankings.historial(clave).to_dict('records')
+        }
+
+    def similares(self, nombre: str, cantidad: int = 10, metodo: str = 'correlacion') -> dict:
+        """Nombres cuya participación anual evolucionó de forma parecida (ver trayectorias.py)."""
+        clave = resolver_clave(nombre, self.indice_nombres)
+        if self.trayectorias.fila_de(clave) < 0:
+            raise ValueError(f"'{nombre}' tiene muy pocos nacimientos para comparar trayectorias")
+        tabla = self.trayectorias.similares(clave, cantidad, metodo)
+        # La matriz está indexada por clave: se muestra la grafía canónica de cada grupo
+        tabla.insert(1, 'clave', tabla['nombre'])
+        tabla['nombre'] = tabla['clave'].map(self._canonico_nombre).fillna(tabla['clave'])
+        return {'clave': clave, 'metodo': metodo, 'similares': tabla.to_dict('records')}
+
+    def generaciones(self, nombre: str) -> dict:
+        """Nacimientos de un nombre por generación (ver generaciones.py)."""
+        clave = resolver_clave(nombre, self.indice_nombres)
+        tabla = self._generaciones.por_nombre(clave)
+        return {'clave': clave, 'generaciones': tabla.to_dict('records')}
+
+    def apellido(self, apellido: str) -> dict:
+        """Distribución de un apellido por provincia, de mayor a menor concentración."""
+        clave, filas = self._apellido(apellido)
+        total = filas['cantidad'].sum()
+        provincias = filas[['provincia_id', 'provincia_nombre', 'cantidad']].assign(
+            porcentaje_apellido=(filas['cantidad'] / total * 100) if total else 0.0,
+            porcentaje_provincia=(filas['cantidad'] / filas['provincia_id'].map(self._poblacion_provincia) * 100)
+        ).sort_values('porcentaje_provincia', ascending=False)
+        return {
+            'apellido': filas['apellido'].iloc[0] if len(filas) else apellido,
+            'clave': clave,
+            'total': int(total),
+            'provincias': provincias.to_dict('records')
+        }
+
+    def unicidad(self, nombre: str, apellido: str, provincia_id: int = None) -> dict:
+        """Estimación de personas con un nombre y apellido, en el país o en una provincia."""
+        clave_nombre = resolver_clave(nombre, self.indice_nombres)
+        clave_apellido, filas = self._apellido(apellido)
+        if provincia_id is not None:
+            filas = filas[filas['provincia_id'] == provincia_id]
+            poblacion = float(self._poblacion_provincia.get(provincia_id, 0))
+        else:
+            poblacion = float(self._poblacion_provincia.sum())
+        proporcion_apellido = filas['cantidad'].sum() / poblacion if poblacion else 0.0
+        proporcion_nombre = float(self._proporcion_nombre.get(clave_nombre, 0.0))
+        probabilidad = proporcion_nombre * proporcion_apellido
+        return {
+            'nombre': clave_nombre,
+            'apellido': clave_apellido,
+            'provincia_id': provincia_id,
+            'proporcion_nombre': proporcion_nombre,
+            'proporcion_apellido': float(proporcion_apellido),
+            'probabilidad': probabilidad,
+            'estimacion': probabilidad * (poblacion if provincia_id is not None else POBLACION_ARGENTINA)
+        }
+
+    # ------------------------------------------------------------------
+    # Despacho, caché y métricas
+    # ------------------------------------------------------------------
+
+    def _responder(self, ruta: str, parametros: tuple) -> str:
+        argumentos = dict(parametros)
+
+        def requerido(nombre):
+            if not argumentos.get(nombre):
+                raise ValueError(f"Falta el parámetro '{nombre}'")
+            return argumentos[nombre]
+
+        def entero(nombre, obligatorio=True):
+            valor = requerido(nombre) if obligatorio else argumentos.get(nombre)
+            if valor is None:
+                return None
+            try:
+                return int(valor)
+            except ValueError:
+                raise ValueError(f"El parámetro '{nombre}' debe ser un entero") from None
+
+        if ruta == '/ranking':
+            resultado = self.ranking(requerido('nombre'), entero('anio'))
+        elif ruta == '/evolucion':
+            resultado = self.evolucion(requerido('nombre'))
+        elif ruta == '/similares':
+            resultado = self.similares(requerido('nombre'), entero('cantidad', obligatorio=False) or 10,
+                                       argumentos.get('metodo') or 'correlacion')
+        elif ruta == '/generaciones':
+            resultado = self.generaciones(requerido('nombre'))
+        elif ruta == '/apellido':
+            resultado = self.apellido(requerido('apellido'))
+        elif ruta == '/unicidad':
+            resultado = self.unicidad(requerido('nombre'), requerido('apellido'),
+                                      entero('provincia_id', obligatorio=False))
+        else:
+            raise EndpointDesconocido(f"Endpoint desconocido: {ruta}")
+        # Se guarda ya serializado: el caché no comparte objetos mutables
+        return a_json(resultado)
+
+    def consultar(self, ruta: str, parametros: dict) -> str:
+        """
+        Responde una consulta (desde el caché si ya se respondió) y registra su latencia.
+
+        Args:
+            ruta (str): Endpoint, por ejemplo '/ranking'.
+            parametros (dict): Parámetros de la consulta (un valor por nombre).
+
+        Returns:
+            str: Respuesta en JSON.
+        """
+        inicio = time.perf_counter()
+        try:
+            return self._consultar(ruta, tuple(sorted(parametros.items())))
+        except Exception:
+            with self._candado:
+                self._errores[ruta] += 1
+            raise
+        finally:
+            with self._candado:
+                self._conteos[ruta] += 1
+                self._latencias[ruta].append((time.perf_counter() - inicio) * 1000)
+
+    def metricas(self) -> dict:
+        """
+        Latencias por endpoint (ms) y estado del caché LRU.
+
+        Returns:
+            dict: Métricas listas para serializar.
+        """
+        info = self._consultar.cache_info()
+        consultas = info.hits + info.misses
+        with self._candado:
+            endpoints = {}
+            for ruta, latencias in self._latencias.items():
+                valores = np.array(latencias)
+                endpoints[ruta] = {
+                    'consultas': self._conteos[ruta],
+                    'errores': self._errores[ruta],
+                    'latencia_media_ms': float(valores.mean()),
+                    'latencia_p50_ms': float(np.percentile(valores, 50)),
+                    'latencia_p95_ms': float(np.percentile(valores, 95)),
+                    'latencia_max_ms': float(valores.max())
+                }
+        return {
+            'cache': {
+                'aciertos': info.hits,
+                'fallos': info.misses,
+                'tasa_aciertos': info.hits / consultas if consultas else 0.0,
+                'tamano': info.currsize,
+                'tamano_maximo': info.maxsize
+            },
+            'endpoints': endpoints
+        }
+
+
+@lru_cache(maxsize=1)
+def servicio_compartido(tamano_cache: int = TAMANO_CACHE, raiz: str = '') -> ServicioNombres:
+    """
+    Servicio único por proceso: los datasets se cargan la primera vez y después se reutilizan.
+
+    Sirve a las aplicaciones cuyo script se vuelve a ejecutar en el mismo intérprete,
+    como cada sesión de `bokeh serve` (ver app_nombres.py).
+
+    Args:
+        tamano_cache (int): Respuestas que conserva el caché LRU.
+        raiz (str): Raíz del repositorio contra la que se resuelven las rutas de los datasets.
+
+    Returns:
+        ServicioNombres: Servicio compartido.
+    """
+    return ServicioNombres.desde_datasets(tamano_cache, raiz)
+
+
+def _serializar(valor):
+    """Convierte tipos de numpy/pandas a tipos nativos para json.dumps."""
+    if isinstance(valor, np.integer):
+        return int(valor)
+    if isinstance(valor, np.floating):
+        return _sin_no_finitos(float(valor))
+    if valor is pd.NA:
+        return None
+    raise TypeError(f"Tipo no serializable: {type(valor)}")
+
+
+def _sin_no_finitos(valor):
+    # NaN e infinito no son JSON válido: se envían como null
+    if isinstance(valor, float):
+        return valor if np.isfinite(valor) else None
+    if isinstance(valor, dict):
+        return {clave: _sin_no_finitos(v) for clave, v in valor.items()}
+    if isinstance(valor, (list, tuple)):
+        return [_sin_no_finitos(v) for v in valor]
+    return valor
+
+
+def a_json(valor) -> str:
+    """
+    Serializa una respuesta del servicio a JSON estricto.
+
+    Args:
+        valor: Diccionario o lista con tipos nativos, de numpy o de pandas.
+
+    Returns:
+        str: JSON sin NaN ni infinitos (se reemplazan por null).
+    """
+    return json.dumps(_sin_no_finitos(valor), ensure_ascii=False, allow_nan=False, default=_serializar)
+
+
+def crear_manejador(servicio: ServicioNombres) -> type:
+    """
+    Crea la clase de manejador HTTP asociada a un servicio.
+
+    Args:
+        servicio (ServicioNombres): Servicio que responde las consultas.
+
+    Returns:
+        type: Subclase de BaseHTTPRequestHandler.
+    """
+
+    class ManejadorNombres(BaseHTTPRequestHandler):
+
+        def _enviar(self, estado: int, cuerpo: str) -> None:
+            datos = cuerpo.encode('utf-8')
+            self.send_response(estado)
+            self.send_header('Content-Type', 'application/json; charset=utf-8')
+            self.send_header('Content-Length', str(len(datos)))
+            self.end_headers()
+            self.wfile.write(datos)
+
+        def do_GET(self):
+            url = urlparse(self.path)
+            if url.path == '/metricas':
+                self._enviar(200, a_json(servicio.metricas()))
+                return
+            parametros = {clave: valores[0] for clave, valores in parse_qs(url.query).items()}
+            try:
+                cuerpo = servicio.consultar(url.path, parametros)
+            except EndpointDesconocido as e:
+                self._enviar(404, a_json({'error': str(e)}))
+            except ValueError as e:
+                self._enviar(400, a_json({'error': str(e)}))
+            except Exception as e:
+                # Un error inesperado no deja la conexión sin respuesta
+                traceback.print_exc()
+                self._enviar(500, a_json({'error': f"Error interno: {type(e).__name__}: {e}"}))
+            else:
+                self._enviar(200, cuerpo)
+
+        def log_message(self, formato, *args):
+            pass  # Las latencias se informan en /metricas
+
+    return ManejadorNombres
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Servicio local de estadísticas de nombres")
+    parser.add_argument('--puerto', type=int, default=PUERTO, help="Puerto en 127.0.0.1")
+    parser.add_argument('--cache', type=int, default=TAMANO_CACHE,
+                        help="Cantidad máxima de respuestas en el caché LRU")
+    args = parser.parse_args()
+
+    print("Cargando datasets e índices...")
+    inicio = time.perf_counter()
+    servicio = ServicioNombres.desde_datasets(args.cache)
+    print(f"Datos cargados en {time.perf_counter() - inicio:.1f} s")
+
+    servidor = ThreadingHTTPServer((HOST, args.puerto), crear_manejador(servicio))
+    print(f"Servicio escuchando en http://{HOST}:{args.puerto}")
+    try:
+        servidor.serve_forever()
+    except KeyboardInterrupt:
+        print("\nServicio detenido")
+    finally:
+        servidor.server_close()
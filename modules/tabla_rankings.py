@@ -0,0 +1,242 @@
+"""Tabla precalculada de puestos por año para todos los nombres.
+
+Para cada (año, nombre) guarda la cantidad, el puesto entre todos los nombres
+de ese año (1 = el más frecuente, empates con el mismo puesto) y la
+participación en los nacimientos del año. Se construye con un único rank
+agrupado por año sobre historico-nombres, sin recorrer nombre por nombre.
+
+Formato en disco (un solo .npz comprimido):
+    anio            int16, una posición por fila
+    cantidad        int32
+    ranking         int32
+    participacion   float32, porcentaje de los nacimientos del año
+    filas_nombre    int64, desplazamientos de las filas de cada nombre
+    nombres         nombres (o claves) en orden alfabético
+
+Las filas están ordenadas por (nombre, año), así que la historia de un nombre
+es un tramo contiguo que se ubica con búsqueda binaria.
+
+El .npz guarda además la huella de los datos con que se calculó. Los análisis y
+el servicio piden la tabla con obtener_tabla_rankings: si la huella coincide
+con el histórico cargado se lee el archivo en lugar de recalcular el rank."""
+
+import os
+import sys
+
+import numpy as np
+import pandas as pd
+
+from cache_graficos import huella
+
+RUTA_TABLA = 'docs/rankings_nombres.npz'
+
+
+def huella_historico(historico: pd.DataFrame, columna: str = 'nombre_clave') -> str:
+    """
+    Huella de las columnas del histórico que determinan la tabla.
+
+    Returns:
+        str: Hash SHA-256 (ver cache_graficos.huella).
+    """
+    return huella(historico[[columna, 'anio', 'cantidad']])
+
+
+def calcular_rankings(historico: pd.DataFrame, columna: str = 'nombre_clave') -> pd.DataFrame:
+    """
+    Calcula puesto y participación de cada nombre en cada año.
+
+    Args:
+        historico (pd.DataFrame): Datos con `columna`, 'anio' y 'cantidad', una fila
+            por (nombre, año); con variantes sin agrupar, pasar antes agrupar_variantes.
+        columna (str): Columna que identifica al nombre.
+
+    Returns:
+        pd.DataFrame: Columnas `columna`, 'anio', 'cantidad', 'ranking' y 'participacion'.
+    """
+    datos = historico[[columna, 'anio', 'cantidad']].dropna(subset=[columna])
+    por_anio = datos.groupby('anio')['cantidad']
+    return datos.assign(
+        ranking=por_anio.rank(method='min', ascending=False).astype(np.int32),
+        participacion=(datos['cantidad'] / por_anio.transform('sum') * 100).astype(np.float32)
+    )
+
+
+class TablaRankings:
+    """
+    Puestos por año de todos los nombres, en arreglos ordenados por (nombre, año).
+
+    Args:
+        nombres (np.ndarray): Nombres en orden alfabético.
+        filas_nombre (np.ndarray): Desplazamiento de las filas de cada nombre (largo n + 1).
+        anio, cantidad, ranking, participacion (np.ndarray): Una posición por fila.
+        columna (str): Columna que identifica al nombre.
+        huella_datos (str): Huella del histórico de origen (ver huella_historico), si se conoce.
+    """
+
+    def __init__(self, nombres, filas_nombre, anio, cantidad, ranking, participacion,
+                 columna: str = 'nombre_clave', huella_datos: str = None):
+        self.nombres = nombres
+        self._filas_nombre = filas_nombre
+        self.anio = anio
+        self.cantidad = cantidad
+        self.ranking = ranking
+        self.participacion = participacion
+        self.columna = columna
+        self.huella_datos = huella_datos
+
+    @classmethod
+    def desde_historico(cls, historico: pd.DataFrame, columna: str = 'nombre_clave') -> 'TablaRankings':
+        """
+        Construye la tabla a partir del histórico (ver calcular_rankings).
+
+        Returns:
+            TablaRankings: Tabla lista para consultar.
+        """
+        datos = calcular_rankings(historico, columna)
+        codigos, nombres = pd.factorize(datos[columna], sort=True)
+        orden = np.lexsort((datos['anio'].to_numpy(), codigos))
+        codigos = codigos[orden]
+        return cls(
+            nombres=np.asarray(nombres, dtype=str),
+            filas_nombre=np.searchsorted(codigos, np.arange(len(nombres) + 1)).astype(np.int64),
+            anio=datos['anio'].to_numpy()[orden].astype(np.int16),
+            cantidad=datos['cantidad'].to_numpy()[orden].astype(np.int32),
+            ranking=datos['ranking'].to_numpy()[orden],
+            participacion=datos['participacion'].to_numpy()[orden],
+            columna=columna
+        )
+
+    def __len__(self) -> int:
+        return len(self.anio)
+
+    def codigo_de(self, nombre: str) -> int:
+        """
+        Busca la posición de un nombre en el diccionario ordenado.
+
+        Returns:
+            int: Código del nombre, o -1 si no está en la tabla.
+        """
+        i = int(np.searchsorted(self.nombres, nombre))
+        return i if i < len(self.nombres) and self.nombres[i] == nombre else -1
+
+    def historial(self, nombre: str) -> pd.DataFrame:
+        """
+        Puestos de un nombre en cada año en que aparece (un corte, sin recorrer la tabla).
+
+        Args:
+            nombre (str): Valor exacto de la columna del nombre (p. ej. la clave normalizada).
+
+        Returns:
+            pd.DataFrame: Columnas 'anio', 'cantidad', 'ranking' y 'participacion', por año.
+        """
+        codigo = self.codigo_de(nombre)
+        desde, hasta = (self._filas_nombre[codigo], self._filas_nombre[codigo + 1]) if codigo >= 0 else (0, 0)
+        return pd.DataFrame({
+            'anio': self.anio[desde:hasta],
+            'cantidad': self.cantidad[desde:hasta],
+            'ranking': self.ranking[desde:hasta],
+            'participacion': self.participacion[desde:hasta]
+        })
+
+    def puesto(self, nombre: str, anio: int) -> dict:
+        """
+        Cantidad, puesto y participación de un nombre en un año.
+
+        Returns:
+            dict: Claves 'cantidad', 'ranking' y 'participacion'; ranking None si no aparece.
+        """
+        historial = self.historial(nombre)
+        fila = historial[historial['anio'] == anio]
+        if not len(fila):
+            return {'cantidad': 0, 'ranking': None, 'participacion': 0.0}
+        return {'cantidad': int(fila['cantidad'].iloc[0]), 'ranking': int(fila['ranking'].iloc[0]),
+                'participacion': float(fila['participacion'].iloc[0])}
+
+    def codigos(self) -> np.ndarray:
+        """
+        Código del nombre de cada fila (posición en `nombres`).
+
+        Returns:
+            np.ndarray: Un código por fila, no decreciente.
+        """
+        return np.repeat(np.arange(len(self.nombres)), np.diff(self._filas_nombre))
+
+    def a_dataframe(self) -> pd.DataFrame:
+        """
+        Materializa la tabla completa.
+
+        Returns:
+            pd.DataFrame: Columnas `columna`, 'anio', 'cantidad', 'ranking' y 'participacion'.
+        """
+        return pd.DataFrame({
+            self.columna: self.nombres[self.codigos()],
+            'anio': self.anio,
+            'cantidad': self.cantidad,
+            'ranking': self.ranking,
+            'participacion': self.participacion
+        })
+
+    def guardar(self, ruta: str = RUTA_TABLA) -> None:
+        """Guarda la tabla en un .npz comprimido."""
+        np.savez_compressed(ruta, nombres=self.nombres, filas_nombre=self._filas_nombre,
+                            anio=self.anio, cantidad=self.cantidad, ranking=self.ranking,
+                            participacion=self.participacion, columna=np.array(self.columna),
+                            huella=np.array(self.huella_datos or ''))
+
+
+def cargar_tabla_rankings(ruta: str = RUTA_TABLA) -> TablaRankings:
+    """
+    Lee una tabla guardada con TablaRankings.guardar.
+
+    Args:
+        ruta (str): Archivo .npz.
+
+    Returns:
+        TablaRankings: Tabla lista para consultar.
+    """
+    with np.load(ruta) as datos:
+        huella_datos = str(datos['huella']) if 'huella' in datos.files else ''
+        return TablaRankings(datos['nombres'], datos['filas_nombre'], datos['anio'], datos['cantidad'],
+                             datos['ranking'], datos['participacion'], columna=str(datos['columna']),
+                             huella_datos=huella_datos or None)
+
+
+def obtener_tabla_rankings(historico: pd.DataFrame, columna: str = 'nombre_clave',
+                           ruta: str = RUTA_TABLA) -> TablaRankings:
+    """
+    Devuelve la tabla guardada si se calculó con este mismo histórico; si no, la
+    calcula y la guarda para el próximo arranque.
+
+    Args:
+        historico (pd.DataFrame): Histórico con variantes agrupadas.
+        columna (str): Columna que identifica al nombre.
+        ruta (str): Archivo .npz de la tabla.
+
+    Returns:
+        TablaRankings: Tabla al día con `historico`.
+    """
+    actual = huella_historico(historico, columna)
+    if os.path.exists(ruta):
+        try:
+            guardada = cargar_tabla_rankings(ruta)
+        except (OSError, ValueError, KeyError) as e:
+            print(f"No se pudo leer {ruta} ({e}); se recalcula")
+        else:
+            if guardada.huella_datos == actual and guardada.columna == columna:
+                return guardada
+    tabla = TablaRankings.desde_historico(historico, columna)
+    tabla.huella_datos = actual
+    try:
+        tabla.guardar(ruta)
+    except OSError as e:
+        print(f"No se pudo guardar {ruta}: {e}")
+    return tabla
+
+
+if __name__ == "__main__":
+    # Uso: python modules/tabla_rankings.py [destino.npz]
+    from carga_datos import cargar_agrupado
+
+    destino = sys.argv[1] if len(sys.argv) > 1 else RUTA_TABLA
+    tabla = obtener_tabla_rankings(cargar_agrupado('historico-nombres', 'nombre', ['anio']), ruta=destino)
+    print(f"Tabla de {len(tabla)} puestos ({len(tabla.nombres)} nombres) guardada en {destino}")
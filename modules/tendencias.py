@@ -0,0 +1,215 @@
+"""Tendencia y años de cambio de todos los nombres, calculados en lote.
+
+Trabaja sobre la matriz nombres × años de trayectorias.py (participación anual
+en los nacimientos) y procesa todo el vocabulario con operaciones matriciales:
+
+- Tendencia: recta de mínimos cuadrados de la participación contra el año.
+  La pendiente de todas las filas sale de un único producto matriz-vector; la
+  tendencia se declara creciente o decreciente solo si el estadístico t de la
+  pendiente supera UMBRAL_T, lo que evita marcar como tendencia el ruido de
+  los nombres poco frecuentes.
+- Años de cambio: segmentación binaria con rectas por tramos. En cada segmento
+  se compara una sola recta contra dos rectas independientes a cada lado de
+  cada corte posible; el corte que más reduce la suma de cuadrados residual se
+  acepta si esa reducción, medida en varianzas del ruido del nombre, supera
+  UMBRAL_CAMBIO. Como la hipótesis nula es una recta y no un nivel constante,
+  una tendencia sostenida no se confunde con una sucesión de cambios. Las
+  sumas de cuadrados de cualquier tramo se leen de matrices de acumulados, así
+  que cada nivel de la segmentación evalúa todos los cortes de todos los
+  segmentos de todos los nombres a la vez."""
+
+import sys
+
+import numpy as np
+import pandas as pd
+
+from trayectorias import MatrizTrayectorias
+
+RUTA_TENDENCIAS = 'docs/tendencias_nombres.csv'
+
+# |t| mínimo de la pendiente para declarar una tendencia
+UMBRAL_T = 3.0
+
+# Valor crítico (5%) de la máxima reducción de la suma de cuadrados / sigma²
+# al partir una recta en dos (simulado con 94 años de ruido gaussiano y sigma
+# estimado con la MAD, como en _ruido)
+UMBRAL_CAMBIO = 14.3
+
+# Años mínimos a cada lado de un cambio
+MINIMO_SEGMENTO = 5
+
+# Niveles de segmentación binaria (hasta 2**niveles - 1 cambios por nombre)
+NIVELES_CAMBIO = 3
+
+
+def ajustar_pendientes(matriz: np.ndarray, anios: np.ndarray) -> pd.DataFrame:
+    """
+    Ajusta una recta de mínimos cuadrados a cada fila de la matriz.
+
+    Args:
+        matriz (np.ndarray): Una serie por fila, una columna por año.
+        anios (np.ndarray): Años de las columnas.
+
+    Returns:
+        pd.DataFrame: Por fila: 'pendiente' (unidades de la serie por año),
+        'pendiente_relativa' (% de la media por año), 'r2' y 't'.
+    """
+    x = anios.astype(np.float64) - anios.mean()
+    sxx = float(x @ x)
+    y = matriz.astype(np.float64, copy=False)
+    media = y.mean(axis=1)
+    pendiente = (y @ x) / sxx
+    # Suma de cuadrados total y residual, sin materializar los residuos
+    sst = np.einsum('ij,ij->i', y, y) - len(x) * media ** 2
+    sse = np.maximum(sst - pendiente ** 2 * sxx, 0)
+    grados = max(len(x) - 2, 1)
+    error = np.sqrt(sse / grados / sxx)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        t = np.where(error > 0, pendiente / error, np.where(pendiente != 0, np.inf * np.sign(pendiente), 0.0))
+        r2 = np.where(sst > 0, 1 - sse / sst, 0.0)
+        relativa = np.where(media > 0, pendiente / media * 100, 0.0)
+    return pd.DataFrame({'pendiente': pendiente, 'pendiente_relativa': relativa, 'r2': r2, 't': t})
+
+
+def _ruido(matriz: np.ndarray) -> np.ndarray:
+    # Desvío del ruido estimado con la MAD de las diferencias: no lo inflan los cambios de nivel
+    diferencias = np.diff(matriz, axis=1)
+    mad = np.median(np.abs(diferencias - np.median(diferencias, axis=1, keepdims=True)), axis=1)
+    return mad / 0.6745 / np.sqrt(2)
+
+
+def _sumas_tramo(acumulados: tuple, filas: np.ndarray, inicio: np.ndarray, fin: np.ndarray) -> tuple:
+    # Momentos centrados del tramo [inicio, fin) de cada fila, leídos de los acumulados
+    x1, x2, y1, xy, y2 = acumulados
+    n = (fin - inicio).astype(np.float64)
+    sx, sxx = x1[fin] - x1[inicio], x2[fin] - x2[inicio]
+    sy = y1[filas, fin] - y1[filas, inicio]
+    sxy = xy[filas, fin] - xy[filas, inicio]
+    syy = y2[filas, fin] - y2[filas, inicio]
+    with np.errstate(divide='ignore', invalid='ignore'):
+        cxx = sxx - sx * sx / n
+        cxy = sxy - sx * sy / n
+        cyy = syy - sy * sy / n
+        sse = np.maximum(cyy - np.where(cxx > 0, cxy * cxy / cxx, 0.0), 0)
+    return n, sx, sy, cxx, cxy, sse
+
+
+def _recta(n, sx, sy, cxx, cxy, x) -> np.ndarray:
+    # Valor en x de la recta de mínimos cuadrados de un tramo
+    return sy / n + cxy / cxx * (x - sx / n)
+
+
+def detectar_cambios(matriz: np.ndarray, umbral: float = UMBRAL_CAMBIO,
+                     minimo_segmento: int = MINIMO_SEGMENTO, niveles: int = NIVELES_CAMBIO) -> tuple:
+    """
+    Detecta cambios de nivel o de pendiente en cada fila con segmentación binaria
+    de rectas por tramos.
+
+    Args:
+        matriz (np.ndarray): Una serie por fila, una columna por año.
+        umbral (float): Reducción mínima de la suma de cuadrados (en varianzas del ruido)
+            para aceptar un cambio.
+        minimo_segmento (int): Largo mínimo de cada segmento.
+        niveles (int): Niveles de segmentación.
+
+    Returns:
+        tuple: (filas, posiciones, saltos): fila de cada cambio, columna donde empieza
+        el nuevo tramo y salto (recta nueva menos la prolongación de la anterior, promediado
+        en los primeros `minimo_segmento` años del tramo nuevo), ordenados por fila y posición.
+    """
+    n_filas, n = matriz.shape
+    y = matriz.astype(np.float64, copy=False)
+    x = np.arange(n, dtype=np.float64)
+    acumulados = [np.zeros(n + 1), np.zeros(n + 1)] + [np.zeros((n_filas, n + 1)) for _ in range(3)]
+    np.cumsum(x, out=acumulados[0][1:])
+    np.cumsum(x * x, out=acumulados[1][1:])
+    np.cumsum(y, axis=1, out=acumulados[2][:, 1:])
+    np.cumsum(y * x, axis=1, out=acumulados[3][:, 1:])
+    np.cumsum(y * y, axis=1, out=acumulados[4][:, 1:])
+    varianza = _ruido(y) ** 2
+
+    # Segmentos activos: (fila, inicio, fin), con fin excluido
+    filas = np.flatnonzero(varianza > 0)
+    inicios = np.zeros(len(filas), dtype=np.int64)
+    fines = np.full(len(filas), n, dtype=np.int64)
+    k = np.arange(n + 1)
+    encontrados = []
+    for _ in range(niveles):
+        if not len(filas):
+            break
+        # Suma de cuadrados con una recta y con dos, en todos los cortes posibles a la vez
+        sse_total = _sumas_tramo(acumulados, filas, inicios, fines)[-1]
+        cortes = np.clip(k[None, :], inicios[:, None], fines[:, None])
+        filas_2d = filas[:, None]
+        sse_izquierda = _sumas_tramo(acumulados, filas_2d, inicios[:, None], cortes)[-1]
+        sse_derecha = _sumas_tramo(acumulados, filas_2d, cortes, fines[:, None])[-1]
+        valido = ((k[None, :] >= inicios[:, None] + minimo_segmento) &
+                  (k[None, :] <= fines[:, None] - minimo_segmento))
+        estadistico = np.where(valido, sse_total[:, None] - sse_izquierda - sse_derecha, -1.0)
+        corte = estadistico.argmax(axis=1)
+        maximo = estadistico[np.arange(len(filas)), corte]
+        acepta = maximo / varianza[filas] > umbral
+
+        filas, inicios, fines, corte = filas[acepta], inicios[acepta], fines[acepta], corte[acepta]
+        centro = corte + (minimo_segmento - 1) / 2
+        antes = _recta(*_sumas_tramo(acumulados, filas, inicios, corte)[:-1], centro)
+        despues = _recta(*_sumas_tramo(acumulados, filas, corte, fines)[:-1], centro)
+        encontrados.append((filas, corte, despues - antes))
+
+        # Cada cambio aceptado parte su segmento en dos para el nivel siguiente
+        filas = np.concatenate([filas, filas])
+        inicios, fines = np.concatenate([inicios, corte]), np.concatenate([corte, fines])
+
+    if not encontrados:
+        return np.zeros(0, dtype=np.int64), np.zeros(0, dtype=np.int64), np.zeros(0)
+    filas, posiciones, saltos = (np.concatenate(partes) for partes in zip(*encontrados))
+    orden = np.lexsort((posiciones, filas))
+    return filas[orden], posiciones[orden], saltos[orden]
+
+
+def calcular_tendencias(trayectorias: MatrizTrayectorias, umbral_t: float = UMBRAL_T,
+                        umbral_cambio: float = UMBRAL_CAMBIO) -> pd.DataFrame:
+    """
+    Tendencia y años de cambio de todos los nombres de la matriz.
+
+    Args:
+        trayectorias (MatrizTrayectorias): Participación anual de cada nombre.
+        umbral_t (float): |t| mínimo de la pendiente para declarar una tendencia.
+        umbral_cambio (float): Umbral de aceptación de los cambios.
+
+    Returns:
+        pd.DataFrame: Por nombre: 'nombre', 'pendiente', 'pendiente_relativa', 'r2', 't',
+        'tendencia' ('creciente', 'decreciente' o 'estable'), 'cantidad_cambios',
+        'anios_cambio' y 'anios_alza' / 'anios_baja' (años separados por ';').
+    """
+    tabla = ajustar_pendientes(trayectorias.matriz, trayectorias.anios)
+    tabla.insert(0, 'nombre', trayectorias.nombres)
+    tabla['tendencia'] = np.select([tabla['t'] >= umbral_t, tabla['t'] <= -umbral_t],
+                                   ['creciente', 'decreciente'], default='estable')
+
+    filas, posiciones, saltos = detectar_cambios(trayectorias.matriz, umbral_cambio)
+    cambios = pd.DataFrame({'fila': filas, 'anio': trayectorias.anios[posiciones].astype(str), 'salto': saltos})
+
+    def unir(parte):
+        return parte.groupby('fila')['anio'].agg(';'.join).reindex(range(len(tabla)), fill_value='')
+
+    tabla['cantidad_cambios'] = np.bincount(filas, minlength=len(tabla))
+    tabla['anios_cambio'] = unir(cambios).to_numpy()
+    tabla['anios_alza'] = unir(cambios[cambios['salto'] > 0]).to_numpy()
+    tabla['anios_baja'] = unir(cambios[cambios['salto'] < 0]).to_numpy()
+    return tabla
+
+
+if __name__ == "__main__":
+    # Uso: python modules/tendencias.py [destino.csv]
+    import time
+
+    from tabla_rankings import RUTA_TABLA, cargar_tabla_rankings
+
+    destino = sys.argv[1] if len(sys.argv) > 1 else RUTA_TENDENCIAS
+    inicio = time.perf_counter()
+    tendencias = calcular_tendencias(MatrizTrayectorias.desde_tabla(cargar_tabla_rankings(RUTA_TABLA)))
+    tendencias.to_csv(destino, index=False)
+    print(f"Tendencias de {len(tendencias)} nombres en {time.perf_counter() - inicio:.1f} s, "
+          f"guardadas en {destino}")
+    print(tendencias['tendencia'].value_counts().to_string())
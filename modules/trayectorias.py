@@ -0,0 +1,163 @@
+"""Búsqueda de nombres con trayectorias de popularidad parecidas.
+
+Cada nombre se representa por su participación anual en los nacimientos (de
+la tabla de puestos, ver tabla_rankings.py), alineada en una matriz
+nombres × años con ceros en los años sin registros. La matriz se normaliza una
+sola vez por método y una consulta es un producto matriz-vector sobre todo el
+vocabulario más un argpartition para quedarse con los k mejores:
+
+    'correlacion'  filas centradas y de norma 1; el producto es la correlación
+                   de Pearson (misma forma de la curva, sin importar la escala).
+    'distancia'    filas divididas por su suma (reparto de los nacimientos del
+                   nombre entre los años); distancia euclídea entre repartos.
+
+Los nombres con muy pocos nacimientos tienen curvas dominadas por el ruido y
+multiplican el tamaño de la matriz, así que se excluyen por debajo de un mínimo."""
+
+import sys
+
+import numpy as np
+import pandas as pd
+
+from tabla_rankings import TablaRankings
+
+# Nacimientos totales mínimos para que un nombre entre en la matriz
+MINIMO_NACIMIENTOS = 500
+
+METODOS = ('correlacion', 'distancia')
+
+
+class MatrizTrayectorias:
+    """
+    Series anuales de todos los nombres alineadas en una matriz densa.
+
+    Args:
+        nombres (np.ndarray): Nombres de las filas, en orden alfabético.
+        anios (np.ndarray): Años de las columnas, consecutivos.
+        matriz (np.ndarray): Participación (%) de cada nombre en cada año, float32.
+    """
+
+    def __init__(self, nombres: np.ndarray, anios: np.ndarray, matriz: np.ndarray):
+        self.nombres = nombres
+        self.anios = anios
+        self.matriz = matriz
+        self._normalizadas = {}
+
+    @classmethod
+    def desde_tabla(cls, tabla: TablaRankings,
+                    minimo_nacimientos: int = MINIMO_NACIMIENTOS) -> 'MatrizTrayectorias':
+        """
+        Arma la matriz a partir de la tabla de puestos.
+
+        Args:
+            tabla (TablaRankings): Puestos y participación por (nombre, año).
+            minimo_nacimientos (int): Nacimientos totales mínimos de un nombre.
+
+        Returns:
+            MatrizTrayectorias: Matriz lista para consultar.
+        """
+        codigos = tabla.codigos()
+        totales = np.bincount(codigos, weights=tabla.cantidad, minlength=len(tabla.nombres))
+        incluidos = np.flatnonzero(totales >= minimo_nacimientos)
+        # Código original -> fila de la matriz (-1 si el nombre queda afuera)
+        filas = np.full(len(tabla.nombres), -1, dtype=np.int64)
+        filas[incluidos] = np.arange(len(incluidos))
+
+        anio_min, anio_max = int(tabla.anio.min()), int(tabla.anio.max())
+        seleccion = filas[codigos] >= 0
+        matriz = np.zeros((len(incluidos), anio_max - anio_min + 1), dtype=np.float32)
+        matriz[filas[codigos[seleccion]], tabla.anio[seleccion].astype(np.int64) - anio_min] = \
+            tabla.participacion[seleccion]
+        return cls(tabla.nombres[incluidos], np.arange(anio_min, anio_max + 1), matriz)
+
+    @classmethod
+    def desde_historico(cls, historico: pd.DataFrame, columna: str = 'nombre_clave',
+                        minimo_nacimientos: int = MINIMO_NACIMIENTOS) -> 'MatrizTrayectorias':
+        """Arma la matriz directamente desde historico-nombres (ver TablaRankings.desde_historico)."""
+        return cls.desde_tabla(TablaRankings.desde_historico(historico, columna), minimo_nacimientos)
+
+    def __len__(self) -> int:
+        return len(self.nombres)
+
+    def fila_de(self, nombre: str) -> int:
+        """
+        Busca la fila de un nombre.
+
+        Returns:
+            int: Fila en la matriz, o -1 si el nombre no está (o no llega al mínimo).
+        """
+        i = int(np.searchsorted(self.nombres, nombre))
+        return i if i < len(self.nombres) and self.nombres[i] == nombre else -1
+
+    def serie(self, nombre: str) -> pd.Series:
+        """
+        Participación anual de un nombre, con todos los años (ceros incluidos).
+
+        Returns:
+            pd.Series: Participación (%) indexada por año; vacía si el nombre no está.
+        """
+        fila = self.fila_de(nombre)
+        if fila < 0:
+            return pd.Series(dtype=np.float32, name=nombre)
+        return pd.Series(self.matriz[fila], index=pd.Index(self.anios, name='anio'), name=nombre)
+
+    def _normalizada(self, metodo: str) -> tuple:
+        # Se calcula una vez por método: las consultas solo hacen el producto
+        if metodo not in self._normalizadas:
+            if metodo == 'correlacion':
+                centrada = self.matriz - self.matriz.mean(axis=1, keepdims=True)
+                normas = np.linalg.norm(centrada, axis=1, keepdims=True)
+                # Series constantes: correlación 0 con todo
+                normalizada = np.divide(centrada, normas, out=np.zeros_like(centrada), where=normas > 0)
+                self._normalizadas[metodo] = (normalizada, None)
+            elif metodo == 'distancia':
+                sumas = self.matriz.sum(axis=1, keepdims=True)
+                normalizada = np.divide(self.matriz, sumas, out=np.zeros_like(self.matriz), where=sumas > 0)
+                self._normalizadas[metodo] = (normalizada, np.einsum('ij,ij->i', normalizada, normalizada))
+            else:
+                raise ValueError(f"Método desconocido: {metodo!r} (opciones: {', '.join(METODOS)})")
+        return self._normalizadas[metodo]
+
+    def similares(self, nombre: str, cantidad: int = 10, metodo: str = 'correlacion') -> pd.DataFrame:
+        """
+        Nombres cuya trayectoria más se parece a la de `nombre`.
+
+        Args:
+            nombre (str): Nombre de referencia (valor exacto de la columna, p. ej. la clave).
+            cantidad (int): Cantidad de nombres a devolver (sin contar el de referencia).
+            metodo (str): 'correlacion' (mayor es más parecido) o 'distancia' (menor es más parecido).
+
+        Returns:
+            pd.DataFrame: Columnas 'nombre' y `metodo`, del más al menos parecido.
+        """
+        normalizada, cuadrados = self._normalizada(metodo)
+        fila = self.fila_de(nombre)
+        if fila < 0:
+            raise KeyError(f"'{nombre}' no está en la matriz de trayectorias")
+
+        productos = normalizada @ normalizada[fila]
+        if metodo == 'correlacion':
+            puntaje = -productos
+        else:
+            puntaje = np.sqrt(np.maximum(cuadrados + cuadrados[fila] - 2 * productos, 0))
+        puntaje[fila] = np.inf
+
+        cantidad = min(cantidad, len(self) - 1)
+        if cantidad <= 0:
+            return pd.DataFrame({'nombre': pd.Series(dtype=str), metodo: pd.Series(dtype=np.float32)})
+        mejores = np.argpartition(puntaje, cantidad - 1)[:cantidad]
+        mejores = mejores[np.argsort(puntaje[mejores], kind='stable')]
+        valores = -puntaje[mejores] if metodo == 'correlacion' else puntaje[mejores]
+        return pd.DataFrame({'nombre': self.nombres[mejores], metodo: valores})
+
+
+if __name__ == "__main__":
+    # Uso: python modules/trayectorias.py nombre [cantidad] [correlacion|distancia]
+    from indice_nombres import normalizar_clave
+    from tabla_rankings import RUTA_TABLA, cargar_tabla_rankings
+
+    nombre = sys.argv[1] if len(sys.argv) > 1 else 'Joaquín'
+    cantidad = int(sys.argv[2]) if len(sys.argv) > 2 else 10
+    metodo = sys.argv[3] if len(sys.argv) > 3 else 'correlacion'
+    trayectorias = MatrizTrayectorias.desde_tabla(cargar_tabla_rankings(RUTA_TABLA))
+    print(trayectorias.similares(normalizar_clave(nombre), cantidad, metodo).to_string(index=False))
@@ -0,0 +1,190 @@
+"""Estimación de unicidad para todas las combinaciones nombre × apellido.
+
+La cantidad estimada de personas con un nombre y un apellido se modela como
+población × proporción del apellido × proporción del nombre. Para N apellidos
+y M nombres eso es un producto exterior de dos vectores; en vez de materializar
+la matriz densa N×M se generan solo las celdas candidatas a estar entre las k
+mayores (o por encima de un umbral) y se devuelve un resultado disperso en
+formato largo (una fila por celda conservada)."""
+
+import numpy as np
+import pandas as pd
+
+# Estimación de la población total de Argentina (aproximadamente 45 millones)
+POBLACION_ARGENTINA = 45000000
+
+
+def proporciones_nombres(historico: pd.DataFrame, anio_desde: int = None, anio_hasta: int = None,
+                         top_m: int = None, columna: str = 'nombre') -> pd.Series:
+    """
+    Calcula la proporción de nacimientos de cada nombre en un rango de años.
+
+    Args:
+        historico (pd.DataFrame): Datos con columnas 'anio', 'cantidad' y la columna de nombre.
+        anio_desde (int): Primer año incluido. Por defecto, el mínimo disponible.
+        anio_hasta (int): Último año incluido. Por defecto, el máximo disponible.
+        top_m (int): Si se indica, conserva solo los M nombres más frecuentes.
+        columna (str): Columna que identifica el nombre.
+
+    Returns:
+        pd.Series: Proporción (0-1) por nombre, ordenada de mayor a menor.
+    """
+    anios = historico['anio']
+    mascara = np.ones(len(historico), dtype=bool)
+    if anio_desde is not None:
+        mascara &= (anios >= anio_desde).to_numpy()
+    if anio_hasta is not None:
+        mascara &= (anios <= anio_hasta).to_numpy()
+    datos = historico.loc[mascara]
+    total = datos['cantidad'].sum()
+    if total == 0:
+        return pd.Series(dtype=float)
+    proporciones = datos.groupby(columna)['cantidad'].sum().sort_values(ascending=False) / total
+    return proporciones.head(top_m) if top_m is not None else proporciones
+
+
+def _celdas_top_k(a: np.ndarray, b: np.ndarray, k: int) -> tuple:
+    """
+    Índices (i, j) de las k mayores celdas de a[i] * b[j] sin construir la matriz.
+
+    Con a y b ordenados de mayor a menor, la celda (i, j) solo puede estar entre
+    las k mayores si (i + 1) * (j + 1) <= k, porque todas las celdas (i', j')
+    con i' <= i y j' <= j son al menos igual de grandes. Eso acota los
+    candidatos a O(k log k) celdas.
+    """
+    filas = np.arange(min(len(a), k))
+    limites = np.minimum(k // (filas + 1), len(b))
+    i = np.repeat(filas, limites)
+    # Posición de cada candidato dentro de su fila: 0..limite-1
+    j = np.arange(len(i)) - np.repeat(np.cumsum(limites) - limites, limites)
+    valores = a[i] * b[j]
+    if len(valores) > k:
+        seleccion = np.argpartition(-valores, k - 1)[:k]
+        i, j = i[seleccion], j[seleccion]
+    return i, j
+
+
+def _celdas_sobre_umbral(a: np.ndarray, b: np.ndarray, umbral: float) -> tuple:
+    """Índices (i, j) de las celdas con a[i] * b[j] >= umbral (a y b descendentes)."""
+    # Para cada fila, cuántos elementos de b superan umbral / a[i] (b está ordenado)
+    with np.errstate(divide='ignore'):
+        minimos = np.where(a > 0, umbral / a, np.inf)
+    limites = np.searchsorted(-b, -minimos, side='right')
+    i = np.repeat(np.arange(len(a)), limites)
+    j = np.arange(len(i)) - np.repeat(np.cumsum(limites) - limites, limites)
+    return i, j
+
+
+def producto_disperso(apellidos: pd.Series, nombres: pd.Series, poblacion: float,
+                      top_k: int = None, umbral: float = None) -> pd.DataFrame:
+    """
+    Estima personas por combinación conservando solo las celdas relevantes.
+
+    Args:
+        apellidos (pd.Series): Proporción (0-1) por apellido.
+        nombres (pd.Series): Proporción (0-1) por nombre.
+        poblacion (float): Población del ámbito estimado.
+        top_k (int): Conserva las k combinaciones más frecuentes.
+        umbral (float): Conserva las combinaciones con estimación >= umbral personas.
+            Si se indican ambos, se aplica primero el umbral y luego el top-k.
+
+    Returns:
+        pd.DataFrame: Columnas 'apellido', 'nombre', 'probabilidad' y 'estimacion',
+        ordenado por estimación descendente.
+    """
+    if top_k is None and umbral is None:
+        raise ValueError("Se debe indicar top_k, umbral o ambos para acotar el resultado")
+
+    apellidos = apellidos.sort_values(ascending=False)
+    nombres = nombres.sort_values(ascending=False)
+    a = apellidos.to_numpy(dtype=float)
+    b = nombres.to_numpy(dtype=float)
+
+    if umbral is not None:
+        i, j = _celdas_sobre_umbral(a, b, umbral / poblacion)
+        if top_k is not None and len(i) > top_k:
+            seleccion = np.argpartition(-(a[i] * b[j]), top_k - 1)[:top_k]
+            i, j = i[seleccion], j[seleccion]
+    else:
+        i, j = _celdas_top_k(a, b, top_k)
+
+    probabilidad = a[i] * b[j]
+    resultado = pd.DataFrame({
+        'apellido': apellidos.index.to_numpy()[i],
+        'nombre': nombres.index.to_numpy()[j],
+        'probabilidad': probabilidad,
+        'estimacion': probabilidad * poblacion
+    })
+    return resultado.sort_values('estimacion', ascending=False, kind='stable').reset_index(drop=True)
+
+
+def estimar_matriz_unicidad(apellidos_pais: pd.DataFrame, apellidos_provincia_ranking: pd.DataFrame,
+                            historico: pd.DataFrame, top_n: int = 20, top_m: int = 100,
+                            anio_desde: int = None, anio_hasta: int = None, top_k: int = 50,
+                            umbral: float = None, poblaciones_provincia: pd.Series = None,
+                            columna_nombre: str = 'nombre') -> pd.DataFrame:
+    """
+    Estima la unicidad de las combinaciones de los N apellidos y M nombres más frecuentes,
+    a nivel nacional y para cada provincia.
+
+    Args:
+        apellidos_pais (pd.DataFrame): Ranking nacional con 'apellido' y
+            'porcentaje_de_poblacion_portadora'.
+        apellidos_provincia_ranking (pd.DataFrame): Ranking provincial con 'provincia_id',
+            'provincia_nombre', 'apellido' y 'porcentaje_poblacion_portadora'.
+        historico (pd.DataFrame): Histórico de nombres con 'anio' y 'cantidad'.
+        top_n (int): Cantidad de apellidos considerados por ámbito.
+        top_m (int): Cantidad de nombres considerados.
+        anio_desde (int): Primer año del rango usado para la proporción de nombres.
+        anio_hasta (int): Último año del rango usado para la proporción de nombres.
+        top_k (int): Combinaciones conservadas por ámbito.
+        umbral (float): Estimación mínima (personas) para conservar una combinación.
+        poblaciones_provincia (pd.Series): Población por 'provincia_id' (ver
+            poblacion_por_provincia). Las provincias sin población conocida se
+            omiten; si es None solo se estima el ámbito nacional.
+        columna_nombre (str): Columna del histórico que identifica el nombre.
+
+    Returns:
+        pd.DataFrame: Formato largo con 'ambito', 'provincia_id', 'apellido', 'nombre',
+        'probabilidad' y 'estimacion'. El ámbito nacional usa provincia_id 0.
+    """
+    nombres = proporciones_nombres(historico, anio_desde, anio_hasta, top_m, columna_nombre)
+    if len(nombres) == 0:
+        return pd.DataFrame(columns=['ambito', 'provincia_id', 'apellido', 'nombre',
+                                     'probabilidad', 'estimacion'])
+
+    resultados = []
+
+    # Ámbito nacional
+    nacional = (apellidos_pais.sort_values('ranking').head(top_n)
+                .set_index('apellido')['porcentaje_de_poblacion_portadora'] / 100)
+    celdas = producto_disperso(nacional, nombres, POBLACION_ARGENTINA, top_k, umbral)
+    resultados.append(celdas.assign(ambito='Argentina', provincia_id=0))
+
+    # Ámbito provincial: un producto exterior acotado por provincia
+    for (provincia_id, provincia_nombre), grupo in apellidos_provincia_ranking.groupby(
+            ['provincia_id', 'provincia_nombre'], sort=True):
+        proporciones = (grupo.sort_values('ranking').head(top_n)
+                        .set_index('apellido')['porcentaje_poblacion_portadora'] / 100)
+        if poblaciones_provincia is None or provincia_id not in poblaciones_provincia.index:
+            continue
+        poblacion = poblaciones_provincia[provincia_id]
+        celdas = producto_disperso(proporciones, nombres, poblacion, top_k, umbral)
+        resultados.append(celdas.assign(ambito=provincia_nombre, provincia_id=provincia_id))
+
+    resultado = pd.concat(resultados, ignore_index=True)
+    return resultado[['ambito', 'provincia_id', 'apellido', 'nombre', 'probabilidad', 'estimacion']]
+
+
+def poblacion_por_provincia(apellidos_provincia: pd.DataFrame) -> pd.Series:
+    """
+    Aproxima la población de cada provincia sumando la cantidad de personas de
+    todos sus apellidos.
+
+    Args:
+        apellidos_provincia (pd.DataFrame): Datos con 'provincia_id' y 'cantidad'.
+
+    Returns:
+        pd.Series: Población aproximada indexada por 'provincia_id'.
+    """
+    return apellidos_provincia.groupby('provincia_id')['cantidad'].sum()
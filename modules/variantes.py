@@ -0,0 +1,169 @@
+"""Agrupamiento de variantes ortográficas de nombres y apellidos.
+
+Por daños de codificación, tildes y mayúsculas un mismo nombre aparece con
+varias grafías ('Rodriguez', 'Rodríguez', 'RODRIGUEZ'). Cada valor distinto
+recibe una clave de grupo (normalizar_clave) y una grafía canónica (la variante
+más frecuente), y las cantidades se suman por grupo con una sola operación
+agrupada. El mapeo variante -> canónico se guarda para reutilizarlo."""
+
+import pandas as pd
+
+from indice_nombres import IndiceDifuso, normalizar_clave
+from memoria import AcumuladorParcial, numerar_bloques
+
+
+def mapear_variantes(valores: pd.Series, pesos: pd.Series = None) -> pd.DataFrame:
+    """
+    Asigna a cada valor distinto su clave de grupo y su grafía canónica.
+
+    Args:
+        valores (pd.Series): Columna con nombres o apellidos.
+        pesos (pd.Series): Frecuencia de cada fila (por ejemplo 'cantidad').
+
+    Returns:
+        pd.DataFrame: Columnas 'variante', 'clave', 'canonico' y 'cantidad',
+        una fila por valor distinto.
+    """
+    if pesos is None:
+        pesos = pd.Series(1, index=valores.index)
+    return _mapeo_desde_frecuencias(pesos.groupby(valores).sum())
+
+
+def _mapeo_desde_frecuencias(frecuencias: pd.Series) -> pd.DataFrame:
+    # La normalización (costosa) se hace solo sobre los valores distintos
+    mapeo = pd.DataFrame({
+        'variante': frecuencias.index,
+        'clave': [normalizar_clave(v) for v in frecuencias.index],
+        'cantidad': frecuencias.to_numpy()
+    })
+    mapeo = mapeo[mapeo['clave'] != '']
+    canonicos = (mapeo.sort_values(['clave', 'cantidad'], ascending=[True, False], kind='stable')
+                 .drop_duplicates('clave')
+                 .set_index('clave')['variante'])
+    mapeo['canonico'] = mapeo['clave'].map(canonicos)
+    return mapeo[['variante', 'clave', 'canonico', 'cantidad']].reset_index(drop=True)
+
+
+def agrupar_variantes(df: pd.DataFrame, columna: str, por: list = None,
+                      ruta_mapeo: str = None) -> pd.DataFrame:
+    """
+    Suma 'cantidad' por grupo de variantes en una sola operación agrupada.
+
+    Args:
+        df (pd.DataFrame): Datos con la columna a agrupar y 'cantidad'.
+        columna (str): Columna de nombres o apellidos ('nombre', 'apellido').
+        por (list): Otras columnas que se conservan en la agrupación (por ejemplo
+            ['anio'] o ['provincia_id', 'provincia_nombre']).
+        ruta_mapeo (str): Si se indica, guarda allí el mapeo variante -> canónico.
+
+    Returns:
+        pd.DataFrame: Una fila por grupo y columnas de 'por', con la grafía canónica
+        en `columna`, la clave en `<columna>_clave` y la cantidad sumada.
+    """
+    por = list(por or [])
+    mapeo = mapear_variantes(df[columna], df['cantidad'])
+    if ruta_mapeo is not None:
+        mapeo.to_csv(ruta_mapeo, index=False)
+        print(f"Mapeo de variantes guardado en {ruta_mapeo}")
+
+    indice = mapeo.set_index('variante')
+    clave = f"{columna}_clave"
+    agrupado = (
+        df.assign(**{clave: df[columna].map(indice['clave'])})
+        .groupby([clave] + por, sort=False, observed=True)['cantidad']
+        .sum()
+        .reset_index()
+    )
+    agrupado.insert(0, columna, agrupado[clave].map(mapeo.drop_duplicates('clave').set_index('clave')['canonico']))
+    return agrupado
+
+
+def agregar_clave(df: pd.DataFrame, columna: str) -> pd.DataFrame:
+    """
+    Agrega la columna `<columna>_clave` sin agrupar filas (para rankings, donde las
+    cantidades no se pueden sumar).
+
+    Args:
+        df (pd.DataFrame): Datos con la columna de nombres o apellidos.
+        columna (str): Columna a normalizar.
+
+    Returns:
+        pd.DataFrame: Copia de df con la columna de clave agregada.
+    """
+    distintos = df[columna].dropna().unique()
+    return df.assign(**{f"{columna}_clave": df[columna].map(dict(zip(distintos, map(normalizar_clave, distintos))))})
+
+
+def grafias_canonicas(agrupado: pd.DataFrame, columna: str) -> pd.Series:
+    """
+    Grafía canónica de cada clave de grupo, para mostrar resultados indexados por clave.
+
+    Args:
+        agrupado (pd.DataFrame): Salida de agrupar_variantes (`columna` y `<columna>_clave`).
+        columna (str): Columna de nombres o apellidos.
+
+    Returns:
+        pd.Series: Grafía canónica indexada por clave.
+    """
+    clave = f"{columna}_clave"
+    return agrupado.drop_duplicates(clave).set_index(clave)[columna]
+
+
+def resolver_clave(consulta: str, indice: IndiceDifuso) -> str:
+    """
+    Devuelve la clave de grupo de la mejor coincidencia difusa de una consulta.
+
+    Args:
+        consulta (str): Nombre o apellido tal como lo escribe el usuario.
+        indice (IndiceDifuso): Índice sobre los valores canónicos.
+
+    Returns:
+        str: Clave para filtrar por la columna `<columna>_clave`.
+    """
+    coincidencias = indice.buscar(consulta, limite=1)
+    return normalizar_clave(coincidencias[0][0] if coincidencias else consulta)
+
+
+def agrupar_variantes_por_bloques(bloques, columna: str, por: list = None, ruta_mapeo: str = None,
+                                  presupuesto: int = None) -> pd.DataFrame:
+    """
+    Igual que agrupar_variantes, pero recorriendo el dataset por bloques.
+
+    Hace dos pasadas: la primera suma la cantidad por variante para elegir las
+    grafías canónicas y la segunda suma por grupo. Los parciales se vuelcan a disco
+    si superan el presupuesto. El resultado (incluido el orden de las filas) es
+    idéntico al de agrupar_variantes sobre el dataset completo.
+
+    Args:
+        bloques (callable): Función sin argumentos que devuelve un iterable de bloques
+            nuevo en cada llamada (se recorre dos veces).
+        columna (str): Columna de nombres o apellidos.
+        por (list): Otras columnas que se conservan en la agrupación.
+        ruta_mapeo (str): Si se indica, guarda allí el mapeo variante -> canónico.
+        presupuesto (int): Bytes de agregados parciales en memoria (ver memoria.py).
+
+    Returns:
+        pd.DataFrame: Mismo formato que agrupar_variantes.
+    """
+    por = list(por or [])
+    frecuencias = AcumuladorParcial([columna], {'cantidad': 'sum'}, presupuesto)
+    for bloque in bloques():
+        frecuencias.agregar(bloque)
+    frecuencias = frecuencias.resultado().set_index(columna)['cantidad'].sort_index()
+    mapeo = _mapeo_desde_frecuencias(frecuencias)
+    if ruta_mapeo is not None:
+        mapeo.to_csv(ruta_mapeo, index=False)
+        print(f"Mapeo de variantes guardado en {ruta_mapeo}")
+
+    claves = mapeo.set_index('variante')['clave']
+    clave = f"{columna}_clave"
+    grupos = AcumuladorParcial([clave] + por, {'cantidad': 'sum', '_orden': 'min'}, presupuesto)
+    for bloque in numerar_bloques(bloques()):
+        grupos.agregar(bloque.assign(**{clave: bloque[columna].map(claves)}))
+    # Orden de primera aparición, como groupby(sort=False) sobre el dataset completo
+    agrupado = (grupos.resultado()
+                .sort_values('_orden', kind='stable')
+                .drop(columns='_orden')
+                .reset_index(drop=True))
+    agrupado.insert(0, columna, agrupado[clave].map(mapeo.drop_duplicates('clave').set_index('clave')['canonico']))
+    return agrupado
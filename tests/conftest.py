@@ -0,0 +1,15 @@
+"""Configuración de pytest: los módulos se importan como en los scripts.
+
+Los scripts se ejecutan desde la raíz del repositorio con modules/ y
+data_cleaning/ en la ruta de importación (se importan entre sí por nombre),
+así que las pruebas agregan los dos directorios a sys.path."""
+
+import os
+import sys
+
+RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+for directorio in ('modules', 'data_cleaning'):
+    ruta = os.path.join(RAIZ, directorio)
+    if ruta not in sys.path:
+        sys.path.insert(0, ruta)
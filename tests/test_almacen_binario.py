@@ -0,0 +1,63 @@
+import numpy as np
+import pandas as pd
+
+from almacen_binario import abrir_almacen, ampliar_almacen, escribir_almacen
+
+
+def _historico():
+    return pd.DataFrame({'nombre': ['Zoe', 'Ana', 'Ana', 'Íñigo', 'Zoe'],
+                         'cantidad': [3, 10, 12, 1, 4],
+                         'anio': [2001, 2001, 2000, 1999, 2000]})
+
+
+def test_ida_y_vuelta(tmp_path):
+    escribir_almacen(_historico(), str(tmp_path))
+    almacen = abrir_almacen(str(tmp_path))
+
+    assert len(almacen) == 5
+    assert almacen.filas('Ana').to_dict('list') == {'anio': [2000, 2001], 'cantidad': [12, 10]}
+    assert almacen.filas('Íñigo')['cantidad'].tolist() == [1]
+    assert almacen.filas('Pedro').empty
+
+    df = almacen.a_dataframe()
+    esperado = _historico().sort_values(['nombre', 'anio']).reset_index(drop=True)
+    pd.testing.assert_frame_equal(
+        df.astype({'nombre': str, 'cantidad': 'int64', 'anio': 'int64'}),
+        esperado[['nombre', 'cantidad', 'anio']])
+
+
+def test_columnas_numericas_sin_copia(tmp_path):
+    escribir_almacen(_historico(), str(tmp_path))
+    almacen = abrir_almacen(str(tmp_path))
+    df = almacen.a_dataframe()
+
+    assert np.shares_memory(df['anio'].to_numpy(), almacen.columnas()['anio'])
+    assert np.shares_memory(df['cantidad'].to_numpy(), almacen.columnas()['cantidad'])
+
+
+def test_diccionario_decodificado_de_una_vez(tmp_path):
+    nombres = ['', 'Ana', 'José María', 'Ñandú', 'a\0b', 'Zoe']
+    historico = pd.DataFrame({'nombre': nombres, 'cantidad': range(len(nombres)), 'anio': 2000})
+    escribir_almacen(historico, str(tmp_path))
+    almacen = abrir_almacen(str(tmp_path))
+
+    diccionario = almacen.columnas()['nombres']
+    assert diccionario.todos() == [diccionario[i] for i in range(len(diccionario))] == sorted(nombres)
+    assert almacen.a_dataframe()['nombre'].cat.categories.tolist() == sorted(nombres)
+
+    escribir_almacen(historico.iloc[0:0], str(tmp_path / 'vacio'))
+    assert abrir_almacen(str(tmp_path / 'vacio')).a_dataframe().empty
+
+
+def test_ampliar_equivale_a_escribir_todo(tmp_path):
+    escribir_almacen(_historico(), str(tmp_path / 'base'))
+    nuevas = pd.DataFrame({'nombre': ['Ana', 'Bruno', 'Zoe', 'Íñigo'], 'cantidad': [7, 2, 5, 9],
+                           'anio': [2002, 2002, 1998, 2002]})
+    ampliar_almacen(abrir_almacen(str(tmp_path / 'base')), nuevas, str(tmp_path / 'ampliado'))
+    escribir_almacen(pd.concat([_historico(), nuevas], ignore_index=True), str(tmp_path / 'completo'))
+
+    for archivo in ('anio.npy', 'cantidad.npy', 'nombre_codigo.npy', 'filas_nombre.npy', 'dic_offsets.npy'):
+        np.testing.assert_array_equal(np.load(tmp_path / 'ampliado' / archivo), np.load(tmp_path / 'completo' / archivo))
+    for archivo in ('dic_datos.bin', 'meta.json'):
+        assert (tmp_path / 'ampliado' / archivo).read_bytes() == (tmp_path / 'completo' / archivo).read_bytes()
+    assert abrir_almacen(str(tmp_path / 'ampliado')).filas('Zoe')['anio'].tolist() == [1998, 2000, 2001]
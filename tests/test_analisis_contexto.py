@@ -0,0 +1,90 @@
+"""Pruebas del reporte de contextos de caracteres sospechosos."""
+import io
+import json
+import random
+import re
+
+import numpy as np
+import pandas as pd
+
+import AnalisisContexto as ac
+
+
+def _archivos(tmp_path):
+    pd.DataFrame({'apellido': ['PEÃ‘A', 'MUÃ‘OZ', 'GarcÃ­a', 'Perez'], 'cantidad': [1, 2, 3, 4]}) \
+        .to_csv(tmp_path / 'apellidos.csv', index=False)
+    pd.DataFrame({'nombre': ['JosÃ©', 'MarÃ­a JosÃ©', 'Ana'], 'falla': ['x', 'y', 'z']}) \
+        .to_csv(tmp_path / 'falla.csv', index=False)
+    pd.DataFrame({'nombre': ['Ã‘ando', 'Joaquín', 'Ana'], 'anio': [1990, 1991, 1992]}) \
+        .to_csv(tmp_path / 'nombres.csv', index=False)
+    return {'apellidos': str(tmp_path / 'apellidos.csv'),
+            'inexistente': str(tmp_path / 'no_existe.csv'),
+            'falla': str(tmp_path / 'falla.csv'),
+            'nombres': str(tmp_path / 'nombres.csv')}
+
+
+def test_secciones_en_streaming_igual_al_reporte_en_memoria(tmp_path, monkeypatch):
+    archivos = _archivos(tmp_path)
+    recolectar = ac.recolectar_contextos
+
+    def recolectar_o_fallar(df, caracteres, *args, **kwargs):
+        if 'falla' in df.columns:
+            raise RuntimeError("archivo roto")
+        return recolectar(df, caracteres, *args, **kwargs)
+
+    monkeypatch.setattr(ac, 'recolectar_contextos', recolectar_o_fallar)
+    ac.generar_reporte(archivos, str(tmp_path / 'reporte.txt'), str(tmp_path / 'reporte.jsonl'))
+
+    # Referencia: todo el reporte en memoria y escrito al final, como antes del streaming
+    reporte_completo = {}
+    for nombre_logico in ('apellidos', 'nombres'):
+        df = ac.leer_csv_con_reemplazo(archivos[nombre_logico])
+        reporte_completo[nombre_logico] = recolectar(df, ac.caracteres_no_ascii(df))
+    txt, jsonl = io.StringIO(), io.StringIO()
+    for nombre_logico, (contextos, totales) in reporte_completo.items():
+        ac.escribir_seccion(txt, jsonl, nombre_logico, contextos, totales)
+
+    assert (tmp_path / 'reporte.txt').read_text(encoding='utf-8') == txt.getvalue()
+    assert (tmp_path / 'reporte.jsonl').read_text(encoding='utf-8') == jsonl.getvalue()
+
+    registros = [json.loads(linea) for linea in jsonl.getvalue().splitlines()]
+    assert {r['archivo'] for r in registros} == {'apellidos', 'nombres'}
+    assert {(r['caracter'], r['total']) for r in registros if r['archivo'] == 'apellidos'} == \
+        {('Ã', 3), ('‘', 2), ('\xad', 1)}
+
+
+def test_totales_vectorizados_coinciden_con_el_conteo_por_fila(monkeypatch):
+    monkeypatch.setattr(ac, 'VALORES_POR_BLOQUE', 3)  # Varios bloques con pocos valores
+    valores = ['PEÃ‘A', 'Ana', 'MUÃ‘OZ', 'PEÃ‘A', 'JosÃ©', None, 'Ã‘Ã‘', 'MUÃ‘OZ', 'PEÃ‘A']
+    df = pd.DataFrame({'apellido': valores})
+    caracteres = ac.caracteres_no_ascii(df)
+
+    _, totales = ac.recolectar_contextos(df, caracteres)
+    esperado = {c: sum(v.count(c) for v in valores if v) for c in caracteres}
+    assert totales['apellido'] == esperado
+
+    # Secuencias de más de un carácter: mismo resultado por el camino del patrón combinado
+    distintos = ['PEÃ‘A', 'Ã‘Ã‘', 'Ana']
+    conteo = ac.contar_apariciones(distintos, np.array([3, 1, 5]), {'Ã‘', 'Ã'})
+    assert conteo == {'Ã‘': 5}
+    assert ac.contar_apariciones(distintos, np.array([3, 1, 5]), set()) == {}
+
+
+def _contextos_por_caracter(texto, char, ventana=10):
+    # Versión anterior: una búsqueda por carácter sospechoso
+    return [texto[max(m.start() - ventana, 0):min(m.start() + ventana + 1, len(texto))].replace('\n', ' ').strip()
+            for m in re.finditer(re.escape(char), texto)]
+
+
+def test_patron_combinado_igual_a_la_busqueda_por_caracter():
+    rng = random.Random(0)
+    caracteres = ['Ã', '‘', '©', '\xad', '.', '[']  # Incluye metacaracteres de regex
+    alfabeto = list('abc xyz\n') + caracteres
+    patron = ac.compilar_patron(caracteres)
+    for _ in range(300):
+        texto = ''.join(rng.choice(alfabeto) for _ in range(rng.randint(0, 60)))
+        combinados = ac.extraer_contextos_combinados(texto, patron)
+        for char in caracteres:
+            assert [ej for c, ej in combinados if c == char] == _contextos_por_caracter(texto, char)
+        # Orden de aparición en el texto
+        assert [c for c, _ in combinados] == [c for c in texto if c in caracteres]
@@ -0,0 +1,111 @@
+"""Pruebas de humo de analisis_rodriguez.py: preparaciones declaradas y ejecución completa."""
+import ast
+import os
+import subprocess
+import sys
+
+import numpy as np
+import pandas as pd
+
+RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+SCRIPT = os.path.join(RAIZ, 'modules', 'analisis_rodriguez.py')
+
+
+def _registrados(arbol: ast.Module, metodo: str) -> dict:
+    """{nombre: (requiere, nodos)} de las funciones decoradas con registro.<metodo>."""
+    registrados = {}
+    for nodo in arbol.body:
+        if not isinstance(nodo, ast.FunctionDef):
+            continue
+        for decorador in nodo.decorator_list:
+            if (isinstance(decorador, ast.Call) and isinstance(decorador.func, ast.Attribute)
+                    and decorador.func.attr == metodo):
+                requiere = next((ast.literal_eval(k.value) for k in decorador.keywords if k.arg == 'requiere'), ())
+                # La función y los demás decoradores (las entradas del caché de gráficos también leen datos)
+                registrados[ast.literal_eval(decorador.args[0])] = (set(requiere), [nodo] + nodo.decorator_list)
+    return registrados
+
+
+def test_cada_analisis_declara_las_preparaciones_que_usa():
+    with open(SCRIPT, encoding='utf-8') as f:
+        arbol = ast.parse(f.read())
+    preparaciones = _registrados(arbol, 'preparacion')
+    analisis = _registrados(arbol, 'registrar')
+    assert 'historico_nombres' in preparaciones and 'tendencias' in analisis
+
+    for nombre, (requiere, nodos) in {**preparaciones, **analisis}.items():
+        # Variables locales de la función con el mismo nombre que una preparación no cuentan
+        globales = {n for g in ast.walk(nodos[0]) if isinstance(g, ast.Global) for n in g.names}
+        locales = {n.id for n in ast.walk(nodos[0])
+                   if isinstance(n, ast.Name) and isinstance(n.ctx, ast.Store)} - globales
+        usadas = {n.id for nodo in nodos for n in ast.walk(nodo)
+                  if isinstance(n, ast.Name) and isinstance(n.ctx, ast.Load) and n.id in preparaciones} - locales
+        assert usadas <= requiere, f"'{nombre}' usa {sorted(usadas - requiere)} sin declararlas en requiere"
+
+
+def _datos_sinteticos(directorio):
+    """Datasets limpios mínimos con el formato de docs/."""
+    generador = np.random.default_rng(0)
+    os.makedirs(os.path.join(directorio, 'docs'))
+    anios = np.arange(1980, 2011)
+    nombres = ['Joaquín', 'Joaquin', 'Ana', 'María', 'Lucas', 'Sofía']
+    historico = pd.DataFrame([(nombre, int(generador.integers(50, 400)), anio)
+                              for nombre in nombres for anio in anios],
+                             columns=['nombre', 'cantidad', 'anio'])
+    historico.to_csv(os.path.join(directorio, 'docs', 'historico-nombres_clean.csv'), index=False)
+
+    provincias = [(6, 'Buenos Aires'), (14, 'Córdoba'), (82, 'Santa Fe'), (50, 'Mendoza'),
+                  (90, 'Tucumán'), (94, 'Tierra del Fuego')]
+    apellidos = ['Rodríguez', 'González', 'Gómez', 'Fernández']
+    por_provincia = pd.DataFrame([(pid, pnombre, apellido, int(generador.integers(100, 5000)))
+                                  for pid, pnombre in provincias for apellido in apellidos],
+                                 columns=['provincia_id', 'provincia_nombre', 'apellido', 'cantidad'])
+    por_provincia.to_csv(os.path.join(directorio, 'docs', 'apellidos_cantidad_personas_provincia_clean.csv'),
+                         index=False)
+    ranking = por_provincia.sort_values(['provincia_id', 'cantidad'], ascending=[True, False])
+    ranking['ranking'] = ranking.groupby('provincia_id').cumcount() + 1
+    ranking['porcentaje_poblacion_portadora'] = 1.0
+    ranking[['provincia_id', 'provincia_nombre', 'apellido', 'ranking', 'porcentaje_poblacion_portadora']].to_csv(
+        os.path.join(directorio, 'docs', 'apellidos_mas_frecuentes_provincia_clean.csv'), index=False)
+    pd.DataFrame({'apellido': apellidos, 'porcentaje_de_poblacion_portadora': [1.6, 1.3, 1.0, 0.9],
+                  'ranking': [2, 1, 3, 4]}).to_csv(
+        os.path.join(directorio, 'docs', 'apellidos_mas_frecuentes_pais_clean.csv'), index=False)
+
+
+def _ejecutar(directorio, *argumentos):
+    entorno = dict(os.environ, PYTHONPATH=os.path.join(RAIZ, 'modules'))
+    entorno.pop('PRESUPUESTO_MEMORIA_MB', None)
+    return subprocess.run([sys.executable, SCRIPT, *argumentos], cwd=directorio, env=entorno,
+                          capture_output=True, text=True, timeout=300)
+
+
+def test_todos_los_analisis_sobre_datos_sinteticos(tmp_path):
+    """Sin bokeh ni geopandas se omiten los gráficos; con ellos instalados se ejecuta todo."""
+    _datos_sinteticos(tmp_path)
+    proceso = _ejecutar(tmp_path)
+    assert proceso.returncode == 0, proceso.stdout[-3000:] + proceso.stderr[-3000:]
+    assert 'Falló' not in proceso.stdout
+
+    tendencias = pd.read_csv(tmp_path / 'docs' / 'tendencias_nombres.csv')
+    assert 'joaquin' in set(tendencias['nombre'])
+    combinaciones = pd.read_csv(tmp_path / 'visualizaciones' / 'unicidad_combinaciones.csv')
+    assert len(combinaciones) > 0
+
+
+def test_solo_carga_lo_que_requiere_la_seleccion(tmp_path):
+    _datos_sinteticos(tmp_path)
+    proceso = _ejecutar(tmp_path, '--solo', 'tendencias')
+    assert proceso.returncode == 0, proceso.stdout[-3000:] + proceso.stderr[-3000:]
+    assert 'Cargando historico-nombres' in proceso.stdout
+    assert 'Cargando apellidos' not in proceso.stdout
+
+
+def test_un_analisis_fallido_termina_con_error(tmp_path):
+    _datos_sinteticos(tmp_path)
+    os.remove(tmp_path / 'docs' / 'apellidos_mas_frecuentes_pais_clean.csv')
+    proceso = _ejecutar(tmp_path, '--solo', 'tendencias', 'unicidad_combinaciones')
+    assert proceso.returncode == 1
+    assert "Falló la preparación 'apellidos_pais'" in proceso.stdout
+    # El análisis que no usa ese dataset se ejecuta igual
+    assert (tmp_path / 'docs' / 'tendencias_nombres.csv').exists()
+
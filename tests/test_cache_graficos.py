@@ -0,0 +1,74 @@
+"""Pruebas del caché de gráficos por huella de datos, argumentos y código."""
+import numpy as np
+import pandas as pd
+
+from cache_graficos import CacheGraficos, huella
+
+# Global que asigna el análisis de prueba (como estimacion_joaquin_rodriguez)
+ESTIMACION = None
+
+
+def _analisis(cache, salida, datos, llamadas):
+    @cache.grafico(str(salida), entradas=lambda: (datos['df'],), globales=('ESTIMACION',))
+    def graficar(titulo='Joaquín'):
+        global ESTIMACION
+        llamadas.append(titulo)
+        ESTIMACION = int(datos['df']['cantidad'].sum())
+        salida.write_text(f"{titulo}: {ESTIMACION}")
+        return {'total': ESTIMACION}
+    return graficar
+
+
+def test_reutiliza_con_la_misma_huella_y_restaura_globales(tmp_path):
+    global ESTIMACION
+    manifiesto = tmp_path / 'manifiesto.json'
+    salida = tmp_path / 'grafico.html'
+    datos = {'df': pd.DataFrame({'cantidad': [1, 2, 3]})}
+    llamadas = []
+
+    graficar = _analisis(CacheGraficos(str(manifiesto), activo=True), salida, datos, llamadas)
+    assert graficar() == {'total': 6}
+
+    # Nueva ejecución (cache leído del manifiesto) con los mismos datos: no se reconstruye
+    ESTIMACION = None
+    cache = CacheGraficos(str(manifiesto), activo=True)
+    graficar = _analisis(cache, salida, datos, llamadas)
+    assert graficar() == {'total': 6}
+    assert llamadas == ['Joaquín']
+    assert ESTIMACION == 6
+    assert cache.reutilizados == [str(salida)] and cache.reconstruidos == []
+
+    # Cambian los datos o los argumentos: se reconstruye
+    datos['df'] = pd.DataFrame({'cantidad': [1, 2, 4]})
+    assert graficar() == {'total': 7}
+    assert graficar(titulo='Otro') == {'total': 7}
+    assert llamadas == ['Joaquín', 'Joaquín', 'Otro']
+
+    # Si se borra el archivo de salida también se reconstruye
+    salida.unlink()
+    graficar(titulo='Otro')
+    assert len(llamadas) == 4 and salida.exists()
+
+
+def test_desactivado_por_variable_de_entorno(tmp_path, monkeypatch):
+    manifiesto = tmp_path / 'manifiesto.json'
+    salida = tmp_path / 'grafico.html'
+    datos = {'df': pd.DataFrame({'cantidad': [5]})}
+    llamadas = []
+    _analisis(CacheGraficos(str(manifiesto)), salida, datos, llamadas)()
+
+    monkeypatch.setenv('CACHE_GRAFICOS', '0')
+    cache = CacheGraficos(str(manifiesto))
+    assert not cache.activo
+    _analisis(cache, salida, datos, llamadas)()
+    assert len(llamadas) == 2 and cache.reconstruidos == [str(salida)]
+
+
+def test_huella_distingue_contenido_y_tipo():
+    df = pd.DataFrame({'a': [1, 2], 'b': ['x', 'y']})
+    assert huella(df) == huella(df.copy())
+    assert huella(df) != huella(df.assign(a=[1, 3]))
+    assert huella(df) != huella(df.astype({'a': np.float64}))
+    assert huella(np.arange(3)) != huella(np.arange(3).astype(np.int32))
+    assert huella({'x': 1, 'y': 2}) == huella({'y': 2, 'x': 1})
+    assert huella([1, 2]) != huella([[1], 2])
@@ -0,0 +1,88 @@
+import os
+
+import pandas as pd
+
+import carga_datos
+from almacen_binario import escribir_almacen
+from Reemplazo_caracteres import escribir_particiones
+
+
+def _historico(cantidad):
+    return pd.DataFrame({'nombre': ['Ana', 'Luis', 'Ana'], 'cantidad': [cantidad, 2, 3],
+                         'anio': [1995, 2001, 2012]})
+
+
+def _envejecer(ruta, segundos=100):
+    instante = os.path.getmtime(ruta) - segundos
+    os.utime(ruta, (instante, instante))
+
+
+def test_usa_las_particiones_vigentes_y_descarta_las_viejas(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    os.makedirs('docs')
+    csv = carga_datos.ARCHIVOS_LIMPIOS['historico-nombres']
+    _historico(1).to_csv(csv, index=False)
+    _envejecer(csv)
+    escribir_particiones(_historico(1), 'historico-nombres')
+
+    assert carga_datos.fuente_dataset('historico-nombres') == 'particiones'
+    assert len(carga_datos.cargar_dataset('historico-nombres', anio_desde=2000)) == 2
+
+    # Se vuelve a limpiar sin --particionado: las particiones quedan viejas
+    _historico(99).to_csv(csv, index=False)
+    _envejecer(os.path.join(carga_datos.DIRECTORIO_PARTICIONES, 'historico-nombres', 'indice.json'))
+    assert carga_datos.fuente_dataset('historico-nombres') == 'csv'
+    assert carga_datos.cargar_dataset('historico-nombres')['cantidad'].tolist() == [99, 2, 3]
+
+
+def test_descarta_el_almacen_viejo(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    os.makedirs('docs')
+    csv = carga_datos.ARCHIVOS_LIMPIOS['historico-nombres']
+    _historico(1).to_csv(csv, index=False)
+    _envejecer(csv)
+    escribir_almacen(_historico(1), carga_datos.DIRECTORIO_ALMACEN)
+    assert carga_datos.fuente_dataset('historico-nombres') == 'almacen'
+
+    _envejecer(os.path.join(carga_datos.DIRECTORIO_ALMACEN, 'meta.json'), 200)
+    assert carga_datos.fuente_dataset('historico-nombres') == 'csv'
+
+
+VALORES_PREFILTRO = ['Joaquín', 'JOAQUIN', 'JoaquÃ\xadn', 'Joaquin Pedro', 'Joaquina', 'Maria-Jose',
+                     'María José', 'MARIA  JOSE', "D´Angelo", "D'ANGELO", 'Dangelo', 'Peña', 'Pena',
+                     'Maria, Jose', 'O_Brien', 'Obrien']
+
+
+def test_filtrar_nombre_csv_coincide_con_la_carga_completa(tmp_path):
+    historico = pd.DataFrame({'nombre': VALORES_PREFILTRO * 3,
+                              'cantidad': range(len(VALORES_PREFILTRO) * 3),
+                              'anio': [1990 + i % 20 for i in range(len(VALORES_PREFILTRO) * 3)]})
+    ruta = str(tmp_path / 'historico.csv')
+    historico.to_csv(ruta, index=False)
+    historico.to_csv(ruta + '.gz', index=False, compression='gzip')
+
+    for consulta in VALORES_PREFILTRO + ['joaquín', 'Maríajosé', 'Inexistente']:
+        clave = carga_datos.normalizar_clave(consulta)
+        esperado = historico[historico['nombre'].map(carga_datos.normalizar_clave) == clave]
+        for origen in (ruta, ruta + '.gz'):
+            # Bloques chicos para que las líneas crucen los bordes de bloque
+            obtenido = carga_datos.filtrar_nombre_csv(origen, consulta, tamano_bloque=64)
+            assert sorted(obtenido['cantidad']) == sorted(esperado['cantidad']), (consulta, origen)
+
+
+def test_cargar_nombre_lee_particiones_o_csv_desde_la_raiz(tmp_path):
+    os.makedirs(tmp_path / 'docs')
+    historico = pd.DataFrame({'nombre': ['Joaquín', 'Ana', 'JOAQUIN', 'Joaquina'], 'cantidad': [5, 7, 3, 1],
+                              'anio': [1990, 1995, 2005, 2005]})
+    csv = tmp_path / carga_datos.ARCHIVOS_LIMPIOS['historico-nombres']
+    historico.to_csv(csv, index=False)
+
+    filas = carga_datos.cargar_nombre('joaquin', raiz=str(tmp_path))
+    assert sorted(filas['cantidad']) == [3, 5]
+    assert carga_datos.cargar_nombre('Joaquín', anio_desde=2000, raiz=str(tmp_path))['cantidad'].tolist() == [3]
+
+    # Con particiones vigentes se recorren ellas en lugar del CSV
+    _envejecer(csv)
+    escribir_particiones(historico.assign(cantidad=historico['cantidad'] * 10), 'historico-nombres',
+                         str(tmp_path / carga_datos.DIRECTORIO_PARTICIONES))
+    assert sorted(carga_datos.cargar_nombre('Joaquín', raiz=str(tmp_path))['cantidad']) == [30, 50]
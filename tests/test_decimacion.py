@@ -0,0 +1,55 @@
+"""Pruebas de la reducción de puntos y categorías para los gráficos."""
+import numpy as np
+import pandas as pd
+
+from decimacion import ETIQUETA_OTROS, agrupar_otros, decimar_serie, lttb
+
+
+def test_lttb_respeta_presupuesto_y_extremos():
+    generador = np.random.default_rng(0)
+    x = np.arange(10000, dtype=np.float64)
+    y = np.cumsum(generador.normal(size=len(x)))
+    y[6543] = y.max() + 100  # Pico aislado: LTTB lo tiene que conservar
+
+    elegidos = lttb(x, y, 200)
+    assert len(elegidos) == 200
+    assert elegidos[0] == 0 and elegidos[-1] == len(x) - 1
+    assert np.all(np.diff(elegidos) > 0)
+    assert 6543 in elegidos
+
+
+def test_lttb_sin_reduccion():
+    x = np.arange(10)
+    assert np.array_equal(lttb(x, x, 10), x)
+    assert np.array_equal(lttb(x, x, 50), x)
+    assert np.array_equal(lttb(x, x, 2), x)
+
+
+def test_decimar_serie():
+    df = pd.DataFrame({'anio': np.arange(5000), 'cantidad': np.sin(np.arange(5000) / 50)})
+    assert decimar_serie(df, 'anio', 'cantidad', presupuesto=5000) is df
+    reducida = decimar_serie(df, 'anio', 'cantidad', presupuesto=300)
+    assert len(reducida) == 300
+    assert reducida['anio'].iloc[0] == 0 and reducida['anio'].iloc[-1] == 4999
+
+
+def test_agrupar_otros_conserva_totales():
+    generador = np.random.default_rng(1)
+    df = pd.DataFrame({'provincia': [f'p{i}' for i in range(40)],
+                       'cantidad': generador.integers(1, 1000, 40),
+                       'porcentaje': generador.random(40)})
+    menor = df.loc[df['cantidad'].idxmin(), 'provincia']
+
+    resultado = agrupar_otros(df, 'provincia', ['cantidad', 'porcentaje'], presupuesto=10, conservar=[menor])
+    assert len(resultado) == 10
+    assert resultado['provincia'].iloc[-1] == ETIQUETA_OTROS
+    assert menor in set(resultado['provincia'])
+    assert resultado['cantidad'].sum() == df['cantidad'].sum()
+    assert np.isclose(resultado['porcentaje'].sum(), df['porcentaje'].sum())
+
+    # Las 8 mayores (sin contar la forzada) quedan, en su orden original
+    mayores = df[df['provincia'] != menor].nlargest(8, 'cantidad')
+    esperadas = df[df['provincia'].isin(set(mayores['provincia']) | {menor})]['provincia']
+    assert list(resultado['provincia'].iloc[:-1]) == list(esperadas)
+
+    assert agrupar_otros(df, 'provincia', 'cantidad', presupuesto=40) is df
@@ -0,0 +1,53 @@
+"""Pruebas de la agregación generacional con un único binning."""
+import numpy as np
+import pandas as pd
+import pytest
+
+from generaciones import GENERACIONES, AgregadorGeneraciones, generaciones_desde_cortes
+
+
+def _historico(filas=3000):
+    generador = np.random.default_rng(0)
+    nombres = np.array(['Ana', 'ana', 'Luis', 'Joaquín', 'Sofía', 'Mateo'])
+    historico = pd.DataFrame({'nombre': nombres[generador.integers(0, len(nombres), filas)],
+                              'anio': generador.integers(1915, 2031, filas),
+                              'cantidad': generador.integers(1, 500, filas)})
+    historico['nombre_clave'] = historico['nombre'].str.lower()
+    return historico
+
+
+def _por_filas(historico, generaciones):
+    # Referencia: una máscara por generación y nombre, fila a fila
+    totales = {}
+    for _, fila in historico.iterrows():
+        for etiqueta, (inicio, fin) in generaciones.items():
+            if inicio <= fila['anio'] <= fin:
+                clave = (fila['nombre_clave'], etiqueta)
+                totales[clave] = totales.get(clave, 0) + fila['cantidad']
+    return totales
+
+
+@pytest.mark.parametrize('generaciones', [GENERACIONES, generaciones_desde_cortes([1920, 1950, 1951, 2000])])
+def test_tabla_coincide_con_el_recorrido_por_filas(generaciones):
+    historico = _historico()
+    tabla = AgregadorGeneraciones(historico).tabla(generaciones)
+
+    obtenido = {(fila.nombre, fila.generacion): fila.total for fila in tabla.itertuples()}
+    assert obtenido == _por_filas(historico, generaciones)
+    anios = (tabla['fin'] - tabla['inicio'] + 1)
+    np.testing.assert_allclose(tabla['promedio_anual'], tabla['total'] / anios)
+
+
+def test_por_nombre_y_esquemas_invalidos():
+    historico = _historico()
+    agregador = AgregadorGeneraciones(historico)
+    joaquin = agregador.por_nombre('joaquín')
+    esperado = _por_filas(historico[historico['nombre_clave'] == 'joaquín'], GENERACIONES)
+    assert dict(zip(joaquin['generacion'], joaquin['total'])) == {g: t for (_, g), t in esperado.items()}
+    assert list(joaquin['periodo']) == [f"{i}-{f}" for i, f in zip(joaquin['inicio'], joaquin['fin'])]
+    assert agregador.por_nombre('inexistente').empty
+
+    with pytest.raises(ValueError):
+        agregador.tabla({'a': (1950, 1970), 'b': (1960, 1980)})
+    with pytest.raises(ValueError):
+        generaciones_desde_cortes([1950])
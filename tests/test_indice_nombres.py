@@ -0,0 +1,89 @@
+import random
+import time
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from indice_nombres import IndiceDifuso, distancia_edicion, distancias_lote, normalizar_clave
+
+
+def _perturbar(texto, rng, letras):
+    caracteres = list(texto)
+    for _ in range(rng.randint(1, 2)):
+        posicion = rng.randrange(len(caracteres))
+        operacion = rng.randrange(3)
+        if operacion == 0:
+            caracteres.insert(posicion, rng.choice(letras))
+        elif operacion == 1:
+            caracteres[posicion] = rng.choice(letras)
+        elif len(caracteres) > 1:
+            del caracteres[posicion]
+    return ''.join(caracteres)
+
+
+@pytest.mark.parametrize('max_distancia', [1, 2, 3])
+def test_buscar_no_pierde_coincidencias_dentro_de_la_distancia(max_distancia):
+    rng = random.Random(max_distancia)
+    letras = 'abcdeilmnorstu'
+    vocabulario = sorted({''.join(rng.choice(letras) for _ in range(rng.randint(1, 10)))
+                          for _ in range(1500)})
+    indice = IndiceDifuso(pd.Series(vocabulario))
+
+    for _ in range(300):
+        consulta = _perturbar(rng.choice(vocabulario), rng, letras)
+        esperado = {v for v in vocabulario if distancia_edicion(consulta, v, max_distancia) <= max_distancia}
+        obtenido = {valor for valor, _ in indice.buscar(consulta, limite=len(vocabulario),
+                                                        max_distancia=max_distancia)}
+        assert obtenido == esperado, consulta
+
+
+def test_distancias_lote_coincide_con_distancia_edicion():
+    rng = random.Random(1)
+    claves = [''.join(rng.choice('abcñ ') for _ in range(rng.randint(0, 12))) for _ in range(400)]
+    longitudes = np.array([len(c) for c in claves])
+    matriz = np.zeros((len(claves), longitudes.max()), dtype=np.uint32)
+    for i, clave in enumerate(claves):
+        matriz[i, :len(clave)] = [ord(c) for c in clave]
+    for consulta in ['', 'a', 'ñab', 'cabacab ab']:
+        esperado = [distancia_edicion(consulta, clave) for clave in claves]
+        assert distancias_lote(consulta, matriz, longitudes).tolist() == esperado
+
+
+def test_consultas_en_menos_de_unos_milisegundos_con_vocabulario_grande():
+    # ~100.000 claves distintas con la distribución de largos de nombres simples y compuestos
+    rng = np.random.default_rng(2)
+    letras = np.array(list('aaaeeeiioouubcdfgjlmnprrsstvyzñ'))
+    largos = rng.integers(2, 9, 100000)
+    simples = [''.join(letras[rng.integers(0, len(letras), n)]) for n in largos]
+    vocabulario = pd.Series([s + ' ' + simples[-1 - i] if i % 3 == 0 else s for i, s in enumerate(simples)])
+    indice = IndiceDifuso(vocabulario)
+    consultas = ['ana', 'jo', 'lua', 'eva', 'mari', 'sofi', 'joaquin', 'valentina', 'maria jose', 'juan carlos']
+    for consulta in consultas:
+        indice.buscar(consulta)  # Primer uso: arma el índice de borrados y la matriz de claves
+
+    tiempos = []
+    for consulta in consultas * 3:
+        inicio = time.perf_counter()
+        indice.buscar(consulta)
+        tiempos.append(time.perf_counter() - inicio)
+    # Mediana por debajo de 1 ms en una máquina normal; el margen evita falsos rojos en CI
+    assert np.median(tiempos) < 0.005
+
+
+def test_buscar_tolera_tildes_y_prefiere_la_grafia_mas_frecuente():
+    valores = pd.Series(['JOAQUIN', 'Joaquín', 'Joaquin', 'Juan'])
+    pesos = pd.Series([1, 50, 5, 10])
+    indice = IndiceDifuso(valores, pesos)
+
+    assert indice.buscar('joaquin', limite=1) == [('Joaquín', 0)]
+    assert indice.buscar('Joaqin', limite=1) == [('Joaquín', 1)]
+    assert sorted(indice.variantes('Joaquín')) == ['JOAQUIN', 'Joaquin', 'Joaquín']
+
+
+def test_normalizar_clave():
+    assert normalizar_clave('  MARÍA   José ') == 'maria jose'
+    assert normalizar_clave("D´Angelo") == 'dangelo'
+    assert normalizar_clave('Peña') == 'peña'
+    assert normalizar_clave('JoaquÃ­n') == 'joaquin'
+    assert normalizar_clave(None) == ''
@@ -0,0 +1,44 @@
+import numpy as np
+import pandas as pd
+
+from memoria import AcumuladorParcial, filas_si_no_entra
+from variantes import agrupar_variantes, agrupar_variantes_por_bloques
+
+
+def _datos(n=20000):
+    rng = np.random.default_rng(0)
+    grafias = ['Rodríguez', 'RODRIGUEZ', 'Rodriguez', 'Pérez', 'PEREZ', 'Gómez'] + [f"Ap{i}" for i in range(500)]
+    return pd.DataFrame({'apellido': rng.choice(grafias, n),
+                         'provincia_id': rng.choice([2, 6, 14], n),
+                         'cantidad': rng.integers(1, 100, n)})
+
+
+def _bloques(df, tamano=1000):
+    return lambda: (df.iloc[i:i + tamano] for i in range(0, len(df), tamano))
+
+
+def test_acumulador_con_volcado_a_disco_da_lo_mismo_que_groupby():
+    datos = _datos()
+    acumulador = AcumuladorParcial(['apellido', 'provincia_id'], {'cantidad': 'sum'}, presupuesto=1)
+    for bloque in _bloques(datos)():
+        acumulador.agregar(bloque)
+    resultado = acumulador.resultado().sort_values(['apellido', 'provincia_id']).reset_index(drop=True)
+
+    esperado = (datos.groupby(['apellido', 'provincia_id'], as_index=False)['cantidad'].sum()
+                .sort_values(['apellido', 'provincia_id']).reset_index(drop=True))
+    pd.testing.assert_frame_equal(resultado, esperado, check_dtype=False)
+
+
+def test_agrupar_variantes_por_bloques_es_identico():
+    datos = _datos()
+    completo = agrupar_variantes(datos, 'apellido', ['provincia_id'])
+    por_bloques = agrupar_variantes_por_bloques(_bloques(datos), 'apellido', ['provincia_id'], presupuesto=1)
+    pd.testing.assert_frame_equal(por_bloques, completo, check_dtype=False)
+
+
+def test_filas_si_no_entra(tmp_path):
+    ruta = tmp_path / 'datos.csv'
+    _datos(5000).to_csv(ruta, index=False)
+    assert filas_si_no_entra(str(ruta), None) is None
+    assert filas_si_no_entra(str(ruta), 10 ** 9) is None
+    assert filas_si_no_entra(str(ruta), 10 ** 5) >= 1000
@@ -0,0 +1,84 @@
+"""Pruebas de la dimensión de provincias contra el shapefile y los datasets del repositorio."""
+import os
+import struct
+
+import pandas as pd
+import pytest
+
+from provincias import PROVINCIAS, agregar_provincia_id, provincia_id_de, tabla_provincias
+
+RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+RUTA_DBF = os.path.join(RAIZ, 'shapefiles', 'gadm41_ARG_1.dbf')
+RUTA_RANKING = os.path.join(RAIZ, 'docs', 'apellidos_mas_frecuentes_provincia_clean.csv')
+
+
+def _leer_dbf(ruta: str) -> pd.DataFrame:
+    """Tabla de atributos del shapefile (campos de texto dBase), sin geopandas."""
+    with open(ruta, 'rb') as f:
+        datos = f.read()
+    registros, largo_encabezado, largo_registro = struct.unpack('<IHH', datos[4:12])
+    campos, posicion = [], 32
+    while datos[posicion] != 0x0D:
+        descriptor = datos[posicion:posicion + 32]
+        campos.append((descriptor[:11].split(b'\0')[0].decode('ascii'), descriptor[16]))
+        posicion += 32
+    filas = []
+    for i in range(registros):
+        registro = datos[largo_encabezado + i * largo_registro:largo_encabezado + (i + 1) * largo_registro]
+        inicio, fila = 1, {}  # El primer byte marca los registros borrados
+        for nombre, largo in campos:
+            fila[nombre] = registro[inicio:inicio + largo].decode('utf-8').strip()
+            inicio += largo
+        filas.append(fila)
+    return pd.DataFrame(filas)
+
+
+@pytest.fixture(scope='module')
+def mapa():
+    if not os.path.exists(RUTA_DBF):
+        pytest.skip("No está el shapefile de provincias")
+    return _leer_dbf(RUTA_DBF)[['GID_1', 'NAME_1']]
+
+
+@pytest.fixture(scope='module')
+def provincias_datasets():
+    if not os.path.exists(RUTA_RANKING):
+        pytest.skip("No está el ranking de apellidos por provincia")
+    return pd.read_csv(RUTA_RANKING)[['provincia_id', 'provincia_nombre']].drop_duplicates()
+
+
+def test_tabla_tiene_las_24_provincias():
+    tabla = tabla_provincias()
+    assert len(tabla) == 24
+    for columna in tabla.columns:
+        assert tabla[columna].is_unique
+
+
+def test_ids_de_los_datasets_coinciden_con_la_tabla(provincias_datasets):
+    assert len(provincias_datasets) == 24
+    tabla = tabla_provincias().set_index('provincia_id')['provincia_nombre']
+    for provincia_id, nombre in provincias_datasets.itertuples(index=False):
+        assert tabla[provincia_id] == nombre
+        assert provincia_id_de(nombre) == provincia_id
+
+
+@pytest.mark.parametrize('columnas', [['GID_1', 'NAME_1'], ['GID_1'], ['NAME_1']])
+def test_union_del_mapa_con_los_datasets(mapa, provincias_datasets, columnas):
+    """Cada provincia del shapefile recibe su id por GID_1, por NAME_1 o por ambos."""
+    con_id = agregar_provincia_id(mapa[columnas])
+    assert con_id['provincia_id'].notna().all()
+    assert sorted(con_id['provincia_id']) == sorted(p[0] for p in PROVINCIAS)
+
+    # La unión por entero empareja las 24 provincias con el nombre de los datasets
+    unidas = con_id.merge(provincias_datasets, on='provincia_id', how='inner', suffixes=('', '_dataset'))
+    assert len(unidas) == 24
+    assert (unidas['provincia_nombre'] == unidas['provincia_nombre_dataset']).all()
+    nombres_gadm = dict(zip(mapa['NAME_1'], con_id['provincia_id']))
+    assert nombres_gadm['Ciudad de Buenos Aires'] == provincia_id_de('CABA') == 2
+    assert nombres_gadm['Tierra del Fuego'] == 94
+
+
+def test_gid_desconocido_se_resuelve_por_nombre(mapa):
+    alterado = mapa.assign(GID_1=mapa['GID_1'].where(mapa['NAME_1'] != 'Córdoba', 'ARG.99_1'))
+    con_id = agregar_provincia_id(alterado)
+    assert con_id.loc[alterado['NAME_1'] == 'Córdoba', 'provincia_id'].tolist() == [14]
@@ -0,0 +1,28 @@
+"""Nombres sin definir en el código (p. ej. una clase de bokeh usada sin importarla).
+
+Los análisis importan bokeh y geopandas dentro de cada función, así que un
+import faltante solo aparece al ejecutar ese análisis con el paquete instalado;
+pyflakes lo detecta sin ejecutar nada."""
+import ast
+import glob
+import os
+
+import pytest
+
+checker = pytest.importorskip('pyflakes.checker')
+from pyflakes import messages  # noqa: E402
+
+RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+ERRORES = (messages.UndefinedName, messages.UndefinedLocal, messages.UndefinedExport)
+
+
+ARCHIVOS = sorted(ruta for directorio in ('modules', 'data_cleaning', 'tests')
+                  for ruta in glob.glob(os.path.join(RAIZ, directorio, '*.py')))
+
+
+@pytest.mark.parametrize('ruta', ARCHIVOS, ids=lambda ruta: os.path.relpath(ruta, RAIZ))
+def test_sin_nombres_indefinidos(ruta):
+    with open(ruta, encoding='utf-8') as f:
+        arbol = ast.parse(f.read(), filename=ruta)
+    errores = [str(m) for m in checker.Checker(arbol, filename=ruta).messages if isinstance(m, ERRORES)]
+    assert not errores, "\n".join(errores)
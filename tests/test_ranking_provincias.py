@@ -0,0 +1,26 @@
+import numpy as np
+import pandas as pd
+
+from ranking_provincias import ranking_por_provincia
+
+
+def test_top_k_por_bloques_coincide_con_ordenar_todo():
+    rng = np.random.default_rng(0)
+    n = 5000
+    datos = pd.DataFrame({'provincia_id': rng.choice([2, 6, 14, 94], n),
+                          'apellido': [f"a{i}" for i in range(n)],
+                          # Pocos valores distintos: muchos empates
+                          'cantidad': rng.integers(1, 50, n)})
+    datos['provincia_nombre'] = 'P' + datos['provincia_id'].astype(str)
+
+    ranking = ranking_por_provincia(datos, k=7, tamano_bloque=300)
+
+    # A igual cantidad gana el que aparece primero (orden estable)
+    esperado = (datos.sort_values(['provincia_id', 'cantidad'], ascending=[True, False], kind='stable')
+                .groupby('provincia_id').head(7))
+    assert ranking['apellido'].tolist() == esperado['apellido'].tolist()
+    assert ranking.groupby('provincia_id')['ranking'].apply(list).map(lambda r: r == list(range(1, 8))).all()
+
+    poblacion = datos.groupby('provincia_id')['cantidad'].sum()
+    porcentajes = (ranking['cantidad'] / ranking['provincia_id'].map(poblacion) * 100).round(3)
+    assert np.allclose(ranking['porcentaje_poblacion_portadora'], porcentajes)
@@ -0,0 +1,152 @@
+import os
+
+import numpy as np
+import pandas as pd
+import pytest
+
+import Reemplazo_caracteres as rc
+from almacen_binario import abrir_almacen, escribir_almacen
+
+
+def _filas(anio, nombres=('Ana', 'Luis')):
+    return pd.DataFrame({'nombre': list(nombres), 'cantidad': [10, 20], 'anio': [anio, anio]})
+
+
+@pytest.fixture
+def solo_particiones(tmp_path, monkeypatch):
+    """Histórico limpiado con --particionado: no hay _clean.csv ni docs/agregados."""
+    monkeypatch.chdir(tmp_path)
+    os.makedirs('docs')
+    historico = pd.concat([_filas(1999), _filas(2000)], ignore_index=True)
+    rc.escribir_particiones(historico, 'historico-nombres')
+    _filas(2001, ('Ana', 'Zoe')).to_csv('docs/nuevos.csv', index=False)
+    return historico
+
+
+def test_agregar_anios_con_solo_particiones(solo_particiones):
+    rc.agregar_anios('docs/nuevos.csv')
+
+    assert not os.path.exists('docs/historico-nombres_clean.csv')
+    por_anio, por_nombre = (pd.read_csv(ruta) for ruta in rc.rutas_agregados())
+    assert por_anio.set_index('anio')['cantidad'].to_dict() == {1999: 30, 2000: 30, 2001: 30}
+    assert por_nombre.set_index('nombre')['cantidad'].to_dict() == {'Ana': 30, 'Luis': 40, 'Zoe': 20}
+    particion = pd.read_csv('docs/particiones/historico-nombres/anio_2000-2009.csv.gz')
+    assert sorted(particion['anio']) == [2000, 2000, 2001, 2001]
+
+    # El mismo año otra vez se rechaza sin tocar las particiones
+    with pytest.raises(ValueError, match='2001'):
+        rc.agregar_anios('docs/nuevos.csv')
+    particion = pd.read_csv('docs/particiones/historico-nombres/anio_2000-2009.csv.gz')
+    assert len(particion) == 4
+
+
+def test_agregar_anios_actualiza_el_almacen(solo_particiones):
+    escribir_almacen(solo_particiones, 'docs/historico-nombres_bin')
+    rc.agregar_anios('docs/nuevos.csv')
+
+    almacen = abrir_almacen('docs/historico-nombres_bin')
+    assert len(almacen) == 6
+    assert almacen.filas('Zoe').to_dict('list') == {'anio': [2001], 'cantidad': [20]}
+
+
+def test_agregar_anios_sin_historico_se_rechaza(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    os.makedirs('docs')
+    _filas(2001).to_csv('docs/nuevos.csv', index=False)
+    with pytest.raises(ValueError, match='limpiar primero'):
+        rc.agregar_anios('docs/nuevos.csv')
+    assert not os.path.exists('docs/historico-nombres_clean.csv')
+
+
+def test_limpiar_por_bloques_da_el_mismo_resultado(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    os.makedirs('docs')
+    original = pd.DataFrame({'nombre': [f"Nombre{i % 97}" for i in range(30000)],
+                             'cantidad': range(30000), 'anio': [1950 + i % 60 for i in range(30000)]})
+    original.to_csv('docs/historico-nombres.csv', index=False)
+
+    monkeypatch.delenv('PRESUPUESTO_MEMORIA_MB', raising=False)
+    salida = rc.limpiar_archivo('historico-nombres', 'docs/historico-nombres.csv')
+    completo = pd.read_csv(salida)
+
+    # 0.5 MB: el archivo (~0.6 MB en disco) no entra y se procesa por bloques
+    monkeypatch.setenv('PRESUPUESTO_MEMORIA_MB', '0.5')
+    assert rc.filas_si_no_entra('docs/historico-nombres.csv', rc.presupuesto_memoria()) is not None
+    assert rc.limpiar_archivo('historico-nombres', 'docs/historico-nombres.csv') == salida
+    pd.testing.assert_frame_equal(pd.read_csv(salida), completo)
+
+    destino = rc.limpiar_archivo('historico-nombres', 'docs/historico-nombres.csv', particionado=True)
+    assert os.path.exists(os.path.join(destino, 'indice.json'))
+
+
+def test_aplicar_reglas_corrige_columnas_str():
+    """Con pandas 3 el texto se lee como dtype str, no object: la regla comodín también lo alcanza."""
+    df = pd.DataFrame({'nombre': pd.array(['Mu\xa4oz', 'Ana'], dtype='string'), 'cantidad': [1, 2]})
+    reglas = {'historico-nombres': {rc.TODAS_LAS_COLUMNAS: {'\xa4': 'ñ'}}}
+    impacto = rc.calcular_impacto(df, 'historico-nombres', reglas)
+    assert list(impacto['celdas']) == [1]
+    assert list(rc.aplicar_reglas(df, 'historico-nombres', reglas)['nombre']) == ['Muñoz', 'Ana']
+
+
+def test_compilar_reglas_una_vez_por_conjunto():
+    reemplazos = {'\xa4': 'ñ'}
+    assert rc.compilar_reglas(reemplazos) is rc.compilar_reglas(reemplazos)
+    assert rc.compilar_reglas(dict(reemplazos)) is not rc.compilar_reglas(reemplazos)
+
+
+def test_impacto_del_dry_run_coincide_con_lo_aplicado():
+    """Las celdas y apariciones que informa el dry-run son las que después cambia aplicar_reglas."""
+    reglas = {'historico-nombres': {'nombre': rc.REEMPLAZOS['historico-nombres']['nombre']}}
+    claves = list(reglas['historico-nombres']['nombre'])
+    generador = np.random.default_rng(7)
+
+    # Cada celda lleva a lo sumo un tipo de regla, repetido `veces` veces
+    filas = []
+    for i in range(3000):
+        mal, veces = claves[generador.integers(len(claves))], int(generador.integers(0, 3))
+        filas.append((f"Nom{i % 50}" + mal * veces + "bre", mal, veces))
+    df = pd.DataFrame({'nombre': [valor for valor, _, _ in filas], 'cantidad': 1})
+
+    impacto = rc.calcular_impacto(df, 'historico-nombres', reglas).set_index('regla')
+    aplicado = rc.aplicar_reglas(df.copy(), 'historico-nombres', reglas)
+    cambiadas = aplicado['nombre'] != df['nombre']
+
+    for mal in claves:
+        tocadas = [i for i, (_, regla, veces) in enumerate(filas) if regla == mal and veces]
+        assert impacto.loc[mal, 'celdas'] == len(tocadas) == cambiadas.iloc[tocadas].sum()
+        assert impacto.loc[mal, 'apariciones'] == sum(filas[i][2] for i in tocadas)
+        corregidos = dict(zip(df['nombre'], aplicado['nombre']))
+        assert all(corregidos[antes] == despues for antes, despues in impacto.loc[mal, 'muestras'])
+    assert impacto['celdas'].sum() == cambiadas.sum()
+
+
+def test_agregar_anios_fallido_no_modifica_nada(tmp_path, monkeypatch):
+    """Si falla a mitad de camino, ni el CSV ni los agregados ni el almacén cambian y se puede reintentar."""
+    monkeypatch.chdir(tmp_path)
+    os.makedirs('docs')
+    historico = pd.concat([_filas(1999), _filas(2000)], ignore_index=True)
+    historico.to_csv('docs/historico-nombres_clean.csv', index=False)
+    escribir_almacen(historico, 'docs/historico-nombres_bin')
+    _filas(2001, ('Ana', 'Zoe')).to_csv('docs/nuevos.csv', index=False)
+
+    def falla(*args, **kwargs):
+        raise OSError("disco lleno")
+
+    monkeypatch.setattr(rc, 'ampliar_almacen', falla)
+    with pytest.raises(OSError):
+        rc.agregar_anios('docs/nuevos.csv')
+    assert sorted(os.listdir('docs')) == ['agregados', 'historico-nombres_bin', 'historico-nombres_clean.csv', 'nuevos.csv']
+    assert os.listdir('docs/agregados') == []
+    pd.testing.assert_frame_equal(pd.read_csv('docs/historico-nombres_clean.csv'), historico)
+    assert len(abrir_almacen('docs/historico-nombres_bin')) == 4
+
+    monkeypatch.undo()
+    monkeypatch.chdir(tmp_path)
+    rc.agregar_anios('docs/nuevos.csv')
+    assert len(pd.read_csv('docs/historico-nombres_clean.csv')) == 6
+    assert len(abrir_almacen('docs/historico-nombres_bin')) == 6
+    por_anio = pd.read_csv(rc.rutas_agregados()[0])
+    assert por_anio.set_index('anio')['cantidad'].to_dict() == {1999: 30, 2000: 30, 2001: 30}
+    with pytest.raises(ValueError, match='2001'):
+        rc.agregar_anios('docs/nuevos.csv')
+    assert len(pd.read_csv('docs/historico-nombres_clean.csv')) == 6
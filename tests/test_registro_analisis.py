@@ -0,0 +1,135 @@
+"""Pruebas del registro de análisis: selección, requeridos y dependencias faltantes."""
+import pytest
+
+from registro_analisis import RegistroAnalisis
+
+
+def _registro(llamadas):
+    registro = RegistroAnalisis()
+
+    @registro.registrar('carga', descripcion="Carga")
+    def carga():
+        llamadas.append('carga')
+        return 'carga'
+
+    @registro.registrar('unicidad', requiere=('carga',))
+    def unicidad():
+        """Estimación global."""
+        llamadas.append('unicidad')
+        return 'unicidad'
+
+    @registro.registrar('tabla')
+    def tabla():
+        llamadas.append('tabla')
+        return 'tabla'
+
+    @registro.registrar('mapa', requiere=('unicidad',))
+    def mapa():
+        llamadas.append('mapa')
+        return 'mapa'
+
+    return registro
+
+
+def test_seleccion_agrega_requeridos_en_orden_de_registro():
+    registro = _registro([])
+    assert registro.seleccionar() == ['carga', 'unicidad', 'tabla', 'mapa']
+    assert registro.seleccionar(['mapa']) == ['carga', 'unicidad', 'mapa']
+    assert registro.seleccionar(['tabla', 'mapa'], ['unicidad']) == ['carga', 'unicidad', 'tabla', 'mapa']
+    assert registro.seleccionar(omitir=['mapa', 'unicidad']) == ['carga', 'tabla']
+    with pytest.raises(ValueError):
+        registro.seleccionar(['inexistente'])
+
+
+def test_requeridos_se_registran_antes():
+    registro = RegistroAnalisis()
+    with pytest.raises(ValueError):
+        registro.registrar('mapa', requiere=('unicidad',))(lambda: None)
+    registro.registrar('unicidad')(lambda: None)
+    with pytest.raises(ValueError):
+        registro.registrar('unicidad')(lambda: None)
+
+
+def test_ejecucion_omite_dependencias_faltantes_en_cadena():
+    llamadas = []
+    registro = _registro(llamadas)
+    registro._analisis['carga'].dependencias = ('paquete_que_no_existe_xyz',)
+
+    resultados = registro.ejecutar(registro.seleccionar(['mapa', 'tabla']))
+    assert resultados == {'carga': None, 'unicidad': None, 'tabla': 'tabla', 'mapa': None}
+    assert llamadas == ['tabla']
+    assert 'paquete_que_no_existe_xyz' in registro.listar()
+
+
+def test_parser_y_listado():
+    registro = _registro([])
+    args = registro.crear_parser("prueba").parse_args(['--solo', 'mapa', '--omitir', 'tabla'])
+    assert args.solo == ['mapa'] and args.omitir == ['tabla']
+    lineas = registro.listar().split('\n')
+    assert lineas[1].startswith('unicidad') and 'Estimación global.' in lineas[1] and 'carga' in lineas[1]
+
+
+def test_preparaciones_se_calculan_una_vez_y_solo_si_se_requieren():
+    variables, llamadas = {}, []
+    registro = RegistroAnalisis(variables=variables)
+
+    @registro.preparacion('historico')
+    def historico():
+        llamadas.append('historico')
+        return [1, 2, 3]
+
+    @registro.preparacion('total', requiere=('historico',))
+    def total():
+        llamadas.append('total')
+        return sum(variables['historico'])
+
+    @registro.preparacion('apellidos')
+    def apellidos():
+        llamadas.append('apellidos')
+        return []
+
+    registro.registrar('suma', requiere=('total',))(lambda: variables['total'])
+    registro.registrar('doble', requiere=('total', 'historico'))(lambda: 2 * variables['total'])
+    registro.registrar('apellidos_vacios', requiere=('apellidos',))(lambda: len(variables['apellidos']))
+
+    assert registro.ejecutar(['suma', 'doble']) == {'suma': 6, 'doble': 12}
+    assert llamadas == ['historico', 'total']
+    assert variables == {'historico': [1, 2, 3], 'total': 6} == registro.datos
+    # Las preparaciones no se seleccionan ni se listan como análisis requeridos
+    assert registro.seleccionar(['doble']) == ['doble']
+    assert 'historico' not in registro.listar()
+    with pytest.raises(ValueError):
+        registro.preparacion('otra', requiere=('suma',))(lambda: None)
+
+
+def test_un_fallo_no_detiene_a_los_demas(capsys):
+    llamadas = []
+    registro = RegistroAnalisis()
+
+    @registro.preparacion('datos')
+    def datos():
+        raise FileNotFoundError("docs/historico.csv")
+
+    @registro.preparacion('derivados', requiere=('datos',))
+    def derivados():
+        llamadas.append('derivados')
+
+    registro.registrar('usa_datos', requiere=('datos',))(lambda: llamadas.append('usa_datos'))
+    registro.registrar('usa_derivados', requiere=('derivados',))(lambda: llamadas.append('usa_derivados'))
+
+    @registro.registrar('roto')
+    def roto():
+        raise NameError("name 'LabelSet' is not defined")
+
+    registro.registrar('dependiente', requiere=('roto',))(lambda: llamadas.append('dependiente'))
+    registro.registrar('sano')(lambda: 'ok')
+
+    resultados = registro.ejecutar()
+    assert resultados == {'usa_datos': None, 'usa_derivados': None, 'roto': None, 'dependiente': None,
+                          'sano': 'ok'}
+    assert llamadas == []
+    assert set(registro.fallidos) == {'datos', 'roto'}
+    salida = capsys.readouterr().out
+    assert "Falló la preparación 'datos'" in salida and "Falló 'roto': NameError" in salida
+    assert "Se omite 'usa_derivados': falló la preparación 'datos'" in salida
+    assert "Se omite 'dependiente': no se ejecutó roto" in salida
@@ -0,0 +1,23 @@
+from Reparacion_bytes import decodificar, reparar_archivo, reparar_bytes, tabla_desde_reglas
+
+
+def test_conserva_el_utf8_valido_y_repara_los_bytes_sueltos():
+    tabla = tabla_desde_reglas({'¤': 'ñ', 'xx': 'yy', 'œ': 'oe'})
+    # Solo las reglas de un byte alto leído como latin1 ('œ' no existe en latin1)
+    assert tabla == {b'\xa4': 'ñ'.encode('utf-8')}
+
+    datos = 'Muñoz,'.encode('utf-8') + b'Pe\xa4a,' + b'Jos\x82'
+    # 0xA4 tiene regla; 0x82 se interpreta con el respaldo (cp850: 'é')
+    assert decodificar(datos, tabla) == 'Muñoz,Peña,José'
+    assert decodificar(datos, tabla, respaldo='latin1') == 'Muñoz,Peña,Jos\x82'
+
+
+def test_reparar_archivo_por_bloques(tmp_path):
+    contenido = b''.join('Muñoz,'.encode('utf-8') + b'Pe\xa4a\n' for _ in range(500))
+    origen, destino = tmp_path / 'origen.csv', tmp_path / 'destino.csv'
+    origen.write_bytes(contenido)
+
+    # Bloques de 7 bytes: los cortes caen dentro de secuencias de varios bytes
+    reparar_archivo(str(origen), str(destino), {b'\xa4': 'ñ'.encode('utf-8')}, tamano_bloque=7)
+    assert destino.read_bytes() == reparar_bytes(contenido, {b'\xa4': 'ñ'.encode('utf-8')})
+    assert destino.read_text(encoding='utf-8') == 'Muñoz,Peña\n' * 500
@@ -0,0 +1,93 @@
+import json
+import os
+import threading
+import urllib.error
+import urllib.request
+from http.server import ThreadingHTTPServer
+
+import pandas as pd
+import pytest
+
+from servicio_nombres import HOST, ServicioNombres, a_json, crear_manejador
+
+
+@pytest.fixture(scope='module')
+def servicio():
+    historico = pd.DataFrame({'nombre': ['Joaquín', 'Joaquín', 'Ana', 'Ana'],
+                              'nombre_clave': ['joaquin', 'joaquin', 'ana', 'ana'],
+                              'anio': [2000, 2001, 2000, 2001],
+                              'cantidad': [300, 400, 500, 100]})
+    apellidos = pd.DataFrame({'apellido': ['Rodríguez', 'Rodríguez', 'Pérez'],
+                              'apellido_clave': ['rodriguez', 'rodriguez', 'perez'],
+                              'provincia_id': [6, 94, 6],
+                              'provincia_nombre': ['Buenos Aires', 'Tierra del Fuego', 'Buenos Aires'],
+                              # Tierra del Fuego sin población: porcentaje_provincia da 0 / 0
+                              'cantidad': [1000, 0, 500]})
+    return ServicioNombres(historico, apellidos)
+
+
+@pytest.fixture(scope='module')
+def url_base(servicio):
+    servidor = ThreadingHTTPServer((HOST, 0), crear_manejador(servicio))
+    hilo = threading.Thread(target=servidor.serve_forever, daemon=True)
+    hilo.start()
+    yield f"http://{HOST}:{servidor.server_address[1]}"
+    servidor.shutdown()
+    servidor.server_close()
+
+
+def _get(url):
+    try:
+        with urllib.request.urlopen(url, timeout=5) as respuesta:
+            return respuesta.status, json.loads(respuesta.read())
+    except urllib.error.HTTPError as e:
+        return e.code, json.loads(e.read())
+
+
+def test_provincia_sin_poblacion_se_serializa_como_null(servicio):
+    respuesta = json.loads(servicio.consultar('/apellido', {'apellido': 'Rodriguez'}))
+    porcentajes = {p['provincia_id']: p['porcentaje_provincia'] for p in respuesta['provincias']}
+    assert porcentajes[94] is None
+    assert a_json({'x': float('inf'), 'y': [float('nan'), 1.5]}) == '{"x": null, "y": [null, 1.5]}'
+
+
+def test_codigos_de_estado(url_base, servicio, monkeypatch):
+    assert _get(f"{url_base}/ranking?nombre=joaquin&anio=2001")[0] == 200
+    assert _get(f"{url_base}/no-existe")[0] == 404
+    assert _get(f"{url_base}/ranking?nombre=joaquin")[0] == 400
+
+    def falla(nombre):
+        raise KeyError('columna')
+
+    # Un KeyError dentro de un endpoint es un error interno, no un endpoint desconocido
+    monkeypatch.setattr(servicio, 'generaciones', falla)
+    estado, cuerpo = _get(f"{url_base}/generaciones?nombre=ana")
+    assert estado == 500
+    assert 'KeyError' in cuerpo['error']
+
+
+def test_desde_datasets_resuelve_las_rutas_contra_la_raiz(tmp_path, monkeypatch):
+    import carga_datos
+    from tabla_rankings import RUTA_TABLA
+
+    raiz = tmp_path / 'repositorio'
+    (raiz / 'docs').mkdir(parents=True)
+    pd.DataFrame({'nombre': ['Joaquín', 'Ana'], 'anio': [2000, 2000], 'cantidad': [300, 500]}) \
+        .to_csv(raiz / carga_datos.ARCHIVOS_LIMPIOS['historico-nombres'], index=False)
+    pd.DataFrame({'provincia_id': [6], 'provincia_nombre': ['Buenos Aires'], 'apellido': ['Rodríguez'],
+                  'cantidad': [1000]}) \
+        .to_csv(raiz / carga_datos.ARCHIVOS_LIMPIOS['apellidos_provincia'], index=False)
+    otro = tmp_path / 'otro'
+    otro.mkdir()
+    monkeypatch.chdir(otro)
+
+    servicio = ServicioNombres.desde_datasets(raiz=str(raiz))
+    respuesta = json.loads(servicio.consultar('/ranking', {'nombre': 'joaquin', 'anio': '2000'}))
+    assert respuesta['ranking'] == 2
+    assert os.getcwd() == str(otro)
+    assert (raiz / RUTA_TABLA).exists() and not os.listdir(otro)
+
+
+def test_similares_con_grafia_canonica(servicio):
+    respuesta = json.loads(servicio.consultar('/similares', {'nombre': 'joaquin'}))
+    assert [(fila['nombre'], fila['clave']) for fila in respuesta['similares']] == [('Ana', 'ana')]
@@ -0,0 +1,48 @@
+import numpy as np
+import pandas as pd
+
+import tabla_rankings
+from tabla_rankings import TablaRankings, obtener_tabla_rankings
+
+
+def _historico():
+    rng = np.random.default_rng(0)
+    claves = [f"n{i}" for i in range(40)]
+    filas = [(clave, anio, int(rng.integers(1, 30))) for clave in claves for anio in range(1990, 2000)
+             if rng.random() < 0.8]
+    return pd.DataFrame(filas, columns=['nombre_clave', 'anio', 'cantidad'])
+
+
+def test_puestos_coinciden_con_un_ranking_por_anio():
+    historico = _historico()
+    tabla = TablaRankings.desde_historico(historico)
+
+    for anio, grupo in historico.groupby('anio'):
+        # Empates con el mismo puesto (1 = el más frecuente)
+        esperado = grupo.set_index('nombre_clave')['cantidad'].rank(method='min', ascending=False)
+        for clave, puesto in esperado.items():
+            assert tabla.puesto(clave, anio)['ranking'] == puesto
+    assert tabla.puesto('inexistente', 1995)['ranking'] is None
+    historial = tabla.historial('n3')
+    assert historial['anio'].is_monotonic_increasing
+    assert np.isclose(tabla.a_dataframe().groupby('anio')['participacion'].sum(), 100).all()
+
+
+def test_obtener_reutiliza_la_tabla_solo_si_el_historico_no_cambio(tmp_path, monkeypatch):
+    ruta = str(tmp_path / 'rankings.npz')
+    historico = _historico()
+    primera = obtener_tabla_rankings(historico, ruta=ruta)
+
+    calculos = []
+    original = TablaRankings.desde_historico.__func__
+    monkeypatch.setattr(TablaRankings, 'desde_historico',
+                        classmethod(lambda cls, *a, **k: calculos.append(1) or original(cls, *a, **k)))
+
+    reutilizada = obtener_tabla_rankings(historico, ruta=ruta)
+    assert calculos == []
+    assert np.array_equal(reutilizada.ranking, primera.ranking)
+
+    cambiado = historico.assign(cantidad=historico['cantidad'] + (historico.index == 0))
+    nueva = obtener_tabla_rankings(cambiado, ruta=ruta)
+    assert calculos == [1]
+    assert nueva.huella_datos == tabla_rankings.huella_historico(cambiado)
@@ -0,0 +1,50 @@
+"""Pruebas del ajuste de pendientes y la detección de cambios en lote."""
+import numpy as np
+
+from tendencias import ajustar_pendientes, detectar_cambios
+
+ANIOS = np.arange(1922, 2016)
+
+
+def test_pendientes_coinciden_con_polyfit():
+    generador = np.random.default_rng(0)
+    matriz = generador.random((50, len(ANIOS))) + np.linspace(0, 1, 50)[:, None] * (ANIOS - ANIOS[0])
+    tabla = ajustar_pendientes(matriz, ANIOS)
+    for fila in (0, 17, 49):
+        pendiente, _ = np.polyfit(ANIOS, matriz[fila], 1)
+        assert np.isclose(tabla['pendiente'][fila], pendiente)
+        assert np.isclose(tabla['r2'][fila], np.corrcoef(ANIOS, matriz[fila])[0, 1] ** 2)
+
+
+def test_tendencia_pura_sin_cambios():
+    generador = np.random.default_rng(1)
+    x = np.arange(len(ANIOS))
+    rampa = 0.05 * x + generador.normal(0, 0.3, len(ANIOS))
+    filas, _, _ = detectar_cambios(rampa[None, :])
+    assert len(filas) == 0
+
+    # Sobre muchas rampas de pendiente distinta, la tasa de falsos cambios queda cerca del 5%
+    rampas = generador.normal(0, 1, (2000, len(ANIOS))) + generador.normal(0, 0.1, (2000, 1)) * x
+    filas, _, _ = detectar_cambios(rampas)
+    assert len(np.unique(filas)) / len(rampas) < 0.08
+
+
+def test_un_escalon_da_un_cambio():
+    generador = np.random.default_rng(2)
+    x = np.arange(len(ANIOS))
+    escalon = np.where(x >= 40, 2.0, 0.0) + generador.normal(0, 0.3, len(ANIOS))
+    filas, posiciones, saltos = detectar_cambios(escalon[None, :])
+    assert list(filas) == [0]
+    assert list(posiciones) == [40]
+    assert abs(saltos[0] - 2.0) < 0.5
+
+    # Un escalón hacia abajo sobre una tendencia también es un único cambio, con salto negativo
+    serie = 0.05 * x - np.where(x >= 60, 2.0, 0.0) + generador.normal(0, 0.3, len(ANIOS))
+    filas, posiciones, saltos = detectar_cambios(serie[None, :])
+    assert list(posiciones) == [60]
+    assert saltos[0] < 0
+
+
+def test_series_constantes_sin_cambios():
+    filas, posiciones, saltos = detectar_cambios(np.ones((3, len(ANIOS))))
+    assert len(filas) == len(posiciones) == len(saltos) == 0
@@ -0,0 +1,48 @@
+"""Pruebas de la búsqueda de trayectorias similares."""
+import numpy as np
+import pytest
+
+from trayectorias import MatrizTrayectorias
+
+
+def _matriz_aleatoria(filas: int = 200, anios: int = 40) -> MatrizTrayectorias:
+    generador = np.random.default_rng(3)
+    matriz = generador.random((filas, anios)).astype(np.float32)
+    matriz[5] = 0  # Serie constante: correlación 0 con todo
+    nombres = np.array([f'nombre{i:04d}' for i in range(filas)])
+    return MatrizTrayectorias(nombres, np.arange(1950, 1950 + anios), matriz)
+
+
+def test_correlacion_coincide_con_corrcoef():
+    trayectorias = _matriz_aleatoria()
+    resultado = trayectorias.similares('nombre0010', cantidad=15)
+
+    with np.errstate(invalid='ignore', divide='ignore'):
+        esperado = np.corrcoef(trayectorias.matriz.astype(np.float64))[10]
+    esperado[5] = 0
+    esperado[10] = -np.inf
+    orden = np.argsort(-esperado, kind='stable')[:15]
+    assert list(resultado['nombre']) == list(trayectorias.nombres[orden])
+    np.testing.assert_allclose(resultado['correlacion'], esperado[orden], atol=1e-5)
+
+
+def test_distancia_coincide_con_fuerza_bruta():
+    trayectorias = _matriz_aleatoria()
+    resultado = trayectorias.similares('nombre0020', cantidad=10, metodo='distancia')
+
+    matriz = trayectorias.matriz.astype(np.float64)
+    sumas = matriz.sum(axis=1, keepdims=True)
+    normalizada = np.divide(matriz, sumas, out=np.zeros_like(matriz), where=sumas > 0)
+    esperado = np.linalg.norm(normalizada - normalizada[20], axis=1)
+    esperado[20] = np.inf
+    orden = np.argsort(esperado, kind='stable')[:10]
+    assert list(resultado['nombre']) == list(trayectorias.nombres[orden])
+    np.testing.assert_allclose(resultado['distancia'], esperado[orden], atol=1e-5)
+
+
+def test_nombre_ausente_y_metodo_desconocido():
+    trayectorias = _matriz_aleatoria()
+    with pytest.raises(KeyError):
+        trayectorias.similares('inexistente')
+    with pytest.raises(ValueError):
+        trayectorias.similares('nombre0001', metodo='coseno')
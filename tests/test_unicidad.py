@@ -0,0 +1,36 @@
+import numpy as np
+import pandas as pd
+
+from unicidad import producto_disperso, proporciones_nombres
+
+
+def _proporciones(n, semilla):
+    rng = np.random.default_rng(semilla)
+    valores = rng.dirichlet(np.ones(n))
+    return pd.Series(valores, index=[f"v{semilla}_{i}" for i in range(n)])
+
+
+def test_top_k_coincide_con_la_matriz_densa():
+    apellidos, nombres = _proporciones(40, 1), _proporciones(60, 2)
+    resultado = producto_disperso(apellidos, nombres, 1000, top_k=25)
+
+    densa = np.outer(apellidos.to_numpy(), nombres.to_numpy()).ravel() * 1000
+    esperado = np.sort(densa)[::-1][:25]
+    np.testing.assert_allclose(resultado['estimacion'].to_numpy(), esperado)
+
+
+def test_umbral_conserva_todas_las_celdas_por_encima():
+    apellidos, nombres = _proporciones(30, 3), _proporciones(50, 4)
+    resultado = producto_disperso(apellidos, nombres, 10000, umbral=5)
+
+    densa = np.outer(apellidos.to_numpy(), nombres.to_numpy()) * 10000
+    assert len(resultado) == int((densa >= 5).sum())
+    assert (resultado['estimacion'] >= 5).all()
+
+
+def test_proporciones_respetan_el_rango_de_anios():
+    historico = pd.DataFrame({'nombre': ['Ana', 'Ana', 'Luis'],
+                              'anio': [1990, 2000, 2000],
+                              'cantidad': [10, 30, 10]})
+    proporciones = proporciones_nombres(historico, anio_desde=2000)
+    assert proporciones.to_dict() == {'Ana': 0.75, 'Luis': 0.25}
@@ -0,0 +1,25 @@
+import pandas as pd
+
+from variantes import agrupar_variantes, mapear_variantes
+
+
+def _datos():
+    return pd.DataFrame({
+        'apellido': ['Rodríguez', 'RODRIGUEZ', 'Rodriguez', 'Pérez', 'PEREZ', 'Rodríguez'],
+        'provincia_id': [6, 6, 14, 6, 6, 14],
+        'cantidad': [100, 5, 20, 40, 2, 30]
+    })
+
+
+def test_la_grafia_canonica_es_la_mas_frecuente():
+    mapeo = mapear_variantes(_datos()['apellido'], _datos()['cantidad'])
+    canonicos = dict(zip(mapeo['variante'], mapeo['canonico']))
+    assert canonicos == {'Rodríguez': 'Rodríguez', 'RODRIGUEZ': 'Rodríguez', 'Rodriguez': 'Rodríguez',
+                         'Pérez': 'Pérez', 'PEREZ': 'Pérez'}
+
+
+def test_agrupar_suma_las_variantes_por_grupo():
+    agrupado = agrupar_variantes(_datos(), 'apellido', por=['provincia_id'])
+    totales = agrupado.set_index(['apellido', 'provincia_id'])['cantidad'].to_dict()
+    assert totales == {('Rodríguez', 6): 105, ('Rodríguez', 14): 50, ('Pérez', 6): 42}
+    assert set(agrupado['apellido_clave']) == {'rodriguez', 'perez'}